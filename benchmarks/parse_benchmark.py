@@ -0,0 +1,102 @@
+"""
+공지/비교과 프로그램 페이지 파서 벤치마크.
+benchmarks/fixtures 의 저장된 페이지를 BeautifulSoup(html.parser) 경로와 lxml 경로로 각각 파싱하여
+페이지별 평균 파싱 시간과 최대 RSS 증가량을 비교하고, 두 경로의 결과가 같은지 확인합니다.
+메모리는 lxml(libxml2)의 C 할당까지 잡히도록 tracemalloc 대신 (페이지, 파서)마다 별도 프로세스를 띄워
+한 번 파싱하기 전후의 ru_maxrss 차이로 잽니다. (import 등으로 이미 올라간 최대치보다 작게 쓰면 0 으로 나옵니다.)
+
+사용법: python benchmarks/parse_benchmark.py [반복 횟수]
+"""
+import gc
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# script.py 는 import 시 봇 객체를 만들므로 형식만 맞는 토큰을 넣어 둡니다. (네트워크 호출 없음)
+os.environ.setdefault("TELEGRAM_TOKEN", "123456:benchmark-token-not-used")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+sys.path.insert(0, ROOT_DIR)
+
+import script  # noqa: E402
+
+NOTICE_DETAIL_URL = "https://www.pknu.ac.kr/main/163?action=view&no=720000"
+
+# (픽스처 파일, 파싱 함수)
+CASES = [
+    ("notice_list.html", lambda html_content: script.parse_school_notices(html_content)),
+    ("notice_detail.html", lambda html_content: script.parse_notice_body(html_content, NOTICE_DETAIL_URL)),
+    ("program_list.html", lambda html_content: script.parse_program_list(html_content)),
+    ("program_detail.html", lambda html_content: script.parse_program_detail(html_content)),
+]
+
+
+def _read_fixture(fixture: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, fixture), encoding="utf-8") as f:
+        return f.read()
+
+
+def _max_rss_kib() -> float:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 1024 if sys.platform == "darwin" else max_rss  # macOS 는 바이트, Linux 는 KiB
+
+
+def measure(parse, html_content: str, repeat: int) -> tuple:
+    """(평균 ms, 파싱 결과)"""
+    result = parse(html_content)  # 워밍업
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(html_content)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.mean(timings), result
+
+
+def measure_rss(fixture: str, backend: str) -> float:
+    """새 프로세스에서 fixture 를 backend 로 한 번 파싱할 때 늘어난 최대 RSS (KiB)"""
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--rss", fixture, backend],
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.split()[-1])
+
+
+def _rss_worker(fixture: str, backend: str) -> None:
+    html_content = _read_fixture(fixture)
+    parse = dict(CASES)[fixture]
+    script.HTML_PARSER_BACKEND = backend
+    gc.collect()
+    before = _max_rss_kib()
+    parse(html_content)
+    print(_max_rss_kib() - before)
+
+
+def main() -> int:
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"{'페이지':<22}{'크기(KiB)':>10}{'bs4 ms':>10}{'lxml ms':>10}{'배속':>8}"
+          f"{'bs4 RSS+KiB':>13}{'lxml RSS+KiB':>14}  결과")
+    mismatches = 0
+    for fixture, parse in CASES:
+        html_content = _read_fixture(fixture)
+        measured = {}
+        for backend in ("bs4", "lxml"):
+            script.HTML_PARSER_BACKEND = backend
+            measured[backend] = (*measure(parse, html_content, repeat), measure_rss(fixture, backend))
+        (bs4_ms, bs4_result, bs4_kib), (lxml_ms, lxml_result, lxml_kib) = measured["bs4"], measured["lxml"]
+        same = bs4_result == lxml_result
+        mismatches += not same
+        print(f"{fixture:<22}{len(html_content.encode('utf-8')) / 1024:>10.1f}{bs4_ms:>10.2f}{lxml_ms:>10.2f}"
+              f"{bs4_ms / lxml_ms:>7.1f}x{bs4_kib:>13.0f}{lxml_kib:>14.0f}  {'일치' if same else '불일치'}")
+        if not same:
+            print(f"  bs4 : {bs4_result}\n  lxml: {lxml_result}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--rss"]:
+        _rss_worker(*sys.argv[2:4])
+        sys.exit(0)
+    sys.exit(main())
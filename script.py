@@ -1,37 +1,59 @@
 ################################################################################
 #                               필요한 라이브러리 Import                             #
 ################################################################################
+import argparse
 import asyncio
+import gc
 import hashlib
 import html
 import json
 import logging
+import multiprocessing
 import os
+import random
 import subprocess
 import sys
 import re
+import tempfile
+import sqlite3
+import time
 import urllib.parse
-import easyocr
 import io
-from datetime import datetime
+import itertools
+import heapq
+import math
+import unicodedata
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from logging.handlers import RotatingFileHandler
 
+# ▼ 시작 시간 측정 기준 (외부 라이브러리 import 와 모듈 초기화에 걸린 시간을 기록)
+_STARTUP_STARTED = time.perf_counter()
+
 import aiohttp
 from aiogram import Bot, Dispatcher, types
 from aiogram.client.bot import DefaultBotProperties
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from aiogram.methods import (EditMessageCaption, EditMessageReplyMarkup, EditMessageText, SendMediaGroup,
+                             SendMessage, SendPhoto)
 from aiogram.types import BufferedInputFile, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto
 from bs4 import BeautifulSoup
-from openai import AsyncOpenAI
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+import lxml.html
 from urllib.parse import quote
+import yarl
 
 ################################################################################
 #                               환경 변수 / 토큰 / 상수 설정                   #
 ################################################################################
-aclient = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 TOKEN = os.environ.get('TELEGRAM_TOKEN')
 CHAT_ID = os.environ.get('CHAT_ID')
 GROUP_CHAT_ID = os.environ.get('GROUP_CHAT_ID')
@@ -48,15 +70,125 @@ WHITELIST_FILE = "whitelist.json"
 # ▼ PKNU AI 비교과 시스템
 PKNUAI_BASE_URL = "https://pknuai.pknu.ac.kr"
 PKNUAI_PROGRAM_CACHE_FILE = "programs_seen.json"
-
-logging.info("EasyOCR 리더를 로딩합니다... (최초 실행 시 시간이 걸릴 수 있습니다)")
-try:
-    # verbose=False 옵션을 추가하여 불필요한 로그 출력을 비활성화합니다.
-    ocr_reader = easyocr.Reader(["ko", "en"], gpu=False, verbose=False)
-    logging.info("✅ EasyOCR 로딩 완료!")
-except Exception as e:
-    logging.error(f"❌ EasyOCR 로딩 실패: {e}", exc_info=True)
-    ocr_reader = None  # 로딩 실패 시 ocr_reader를 None으로 설정
+# ▼ 이미 본 공지/프로그램 저장소 (SQLite). 기존 JSON 캐시는 최초 실행 시 한 번 이관합니다.
+SEEN_DB_FILE = "seen.db"
+SEEN_RETENTION_DAYS = int(os.environ.get("SEEN_RETENTION_DAYS", "365"))
+# ▼ 공지 아카이브 (게시일/카테고리 인덱스). 날짜·카테고리 조회는 아카이브에서 응답하고,
+#   마지막 갱신 후 STALE_SECONDS 가 지난 경우에만 게시판 1페이지를 다시 읽어 갱신합니다.
+NOTICE_ARCHIVE_STALE_SECONDS = int(os.environ.get("NOTICE_ARCHIVE_STALE_SECONDS", "600"))
+NOTICE_ARCHIVE_QUERY_LIMIT = int(os.environ.get("NOTICE_ARCHIVE_QUERY_LIMIT", "10"))
+NOTICE_CATEGORY_REFRESH_PAGES = int(os.environ.get("NOTICE_CATEGORY_REFRESH_PAGES", "1"))
+# ▼ 아카이브/본문/검색 색인은 git 에 올리지 않는 별도 로컬 DB 에 두고, 비어 있으면 SEED_PAGES 페이지를 읽어 채웁니다.
+#   (게시일 기준 RETENTION_DAYS, 본문·요약은 저장 후 CONTENT_RETENTION_DAYS 가 지나면 정리)
+ARCHIVE_DB_FILE = "archive.db"
+NOTICE_ARCHIVE_SEED_PAGES = int(os.environ.get("NOTICE_ARCHIVE_SEED_PAGES", "10"))
+NOTICE_ARCHIVE_RETENTION_DAYS = int(os.environ.get("NOTICE_ARCHIVE_RETENTION_DAYS", "365"))
+NOTICE_CONTENT_RETENTION_DAYS = int(os.environ.get("NOTICE_CONTENT_RETENTION_DAYS", "90"))
+# ▼ 로컬 전문 검색: 공지/비교과 프로그램을 한글 2글자(bigram) 역색인 + BM25 로 검색합니다.
+#   제목 토큰은 TITLE_WEIGHT 배로 계산하고, 검색어 토큰의 MIN_MATCH 비율 이상이 들어 있는 문서만 결과에 포함
+SEARCH_RESULT_LIMIT = int(os.environ.get("SEARCH_RESULT_LIMIT", "10"))
+SEARCH_TITLE_WEIGHT = int(os.environ.get("SEARCH_TITLE_WEIGHT", "3"))
+SEARCH_MIN_MATCH = float(os.environ.get("SEARCH_MIN_MATCH", "0.75"))
+# ▼ 파일 저장 / git 푸시를 모아서 처리하는 대기 시간(초)
+PERSIST_WRITE_DELAY = float(os.environ.get("PERSIST_WRITE_DELAY", "2"))
+PERSIST_PUSH_DELAY = float(os.environ.get("PERSIST_PUSH_DELAY", "60"))
+
+# ▼ 스케줄러: 소스별 확인 주기(초). 평일 업무시간(KST)에는 BUSY, 야간/주말에는 QUIET 주기를 쓰고,
+#   새 글을 발견한 직후 BOOST_CYCLES 회는 BOOST 주기로 더 자주 확인합니다. (JITTER 비율만큼 무작위로 흔듦)
+SCHEDULE_TIMEZONE = ZoneInfo("Asia/Seoul")
+SCHEDULE_OFFICE_HOURS = (int(os.environ.get("SCHEDULE_OFFICE_START", "9")), int(os.environ.get("SCHEDULE_OFFICE_END", "18")))
+NOTICE_BUSY_INTERVAL = float(os.environ.get("NOTICE_BUSY_INTERVAL", "300"))
+NOTICE_QUIET_INTERVAL = float(os.environ.get("NOTICE_QUIET_INTERVAL", "1800"))
+PROGRAM_BUSY_INTERVAL = float(os.environ.get("PROGRAM_BUSY_INTERVAL", "600"))
+PROGRAM_QUIET_INTERVAL = float(os.environ.get("PROGRAM_QUIET_INTERVAL", "3600"))
+CATEGORY_BUSY_INTERVAL = float(os.environ.get("CATEGORY_BUSY_INTERVAL", "1800"))
+CATEGORY_QUIET_INTERVAL = float(os.environ.get("CATEGORY_QUIET_INTERVAL", str(6 * 3600)))
+SCHEDULE_BOOST_INTERVAL = float(os.environ.get("SCHEDULE_BOOST_INTERVAL", "120"))
+SCHEDULE_BOOST_CYCLES = int(os.environ.get("SCHEDULE_BOOST_CYCLES", "3"))
+SCHEDULE_JITTER = float(os.environ.get("SCHEDULE_JITTER", "0.15"))
+PKNUAI_PROGRAM_LIST_URL = f"{PKNUAI_BASE_URL}/web/nonSbjt/program.do?mId=216&order=3"
+PKNUAI_LOGIN_BRIDGE_URL = f"{PKNUAI_BASE_URL}/web/login/pknuLoginProc.do?mId=3&userId={{user_id}}"
+
+# ▼ Playwright 브라우저 풀 설정 (동시 페이지 수 / 컨텍스트 재활용 기준)
+PKNUAI_BROWSER_MAX_PAGES = int(os.environ.get("PKNUAI_BROWSER_MAX_PAGES", "3"))
+PKNUAI_CONTEXT_MAX_USES = int(os.environ.get("PKNUAI_CONTEXT_MAX_USES", "30"))
+PKNUAI_SESSION_TTL = int(os.environ.get("PKNUAI_SESSION_TTL", "1200"))  # 초 단위
+PKNUAI_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+# ▼ 로그인 쿠키를 재사용해 브라우저 없이 aiohttp로 페이지를 가져오는 모드 (0이면 항상 Playwright 사용)
+PKNUAI_HTTP_FASTPATH = os.environ.get("PKNUAI_HTTP_FASTPATH", "1") == "1"
+
+# ▼ HTML 파서: "lxml" 은 필요한 영역만 lxml 로 파싱하는 빠른 경로, "bs4" 는 기존 BeautifulSoup(html.parser) 경로
+HTML_PARSER_BACKEND = os.environ.get("HTML_PARSER_BACKEND", "lxml").lower()
+
+# ▼ 공용 HTTP 세션 설정 (타임아웃 / 호스트별 연결 수 / 재시도)
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_LIMIT_PER_HOST = int(os.environ.get("HTTP_LIMIT_PER_HOST", "8"))
+HTTP_DNS_CACHE_TTL = int(os.environ.get("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", "30"))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+HTTP_RETRY_BACKOFF = float(os.environ.get("HTTP_RETRY_BACKOFF", "0.5"))
+
+# ▼ EasyOCR은 처음 필요할 때 로딩하고, 이 시간(초) 동안 사용하지 않으면 메모리에서 내립니다.
+OCR_IDLE_UNLOAD_SECONDS = int(os.environ.get("OCR_IDLE_UNLOAD_SECONDS", "900"))
+OCR_LOAD_RETRY_SECONDS = int(os.environ.get("OCR_LOAD_RETRY_SECONDS", "600"))
+# ▼ OCR 전용 프로세스 풀 설정 (워커 수 / 대기열 크기 / 이미지 전처리 기준)
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", str(min(2, os.cpu_count() or 1))))
+OCR_QUEUE_SIZE = int(os.environ.get("OCR_QUEUE_SIZE", "8"))
+OCR_MAX_WIDTH = int(os.environ.get("OCR_MAX_WIDTH", "1600"))
+OCR_TILE_HEIGHT = int(os.environ.get("OCR_TILE_HEIGHT", "2000"))
+OCR_TILE_OVERLAP = int(os.environ.get("OCR_TILE_OVERLAP", "100"))
+# ▼ OCR 결과 캐시 (이미지 SHA-256 정확 일치 + 크기가 같고 퍼셉추얼 해시 거리가 MAX_DISTANCE 이하인 유사 일치)
+OCR_CACHE_FILE = "ocr_cache.json"
+OCR_CACHE_MAX_ENTRIES = int(os.environ.get("OCR_CACHE_MAX_ENTRIES", "1000"))
+OCR_PHASH_MAX_DISTANCE = int(os.environ.get("OCR_PHASH_MAX_DISTANCE", "2"))
+
+# ▼ AI 요약 모델 및 요약 캐시 설정
+SUMMARY_MODEL = "gpt-4o"
+SUMMARY_CACHE_FILE = "summary_cache.json"
+SUMMARY_CACHE_MAX_ENTRIES = int(os.environ.get("SUMMARY_CACHE_MAX_ENTRIES", "2000"))
+SUMMARY_CACHE_TTL = int(os.environ.get("SUMMARY_CACHE_TTL", str(14 * 24 * 3600)))  # 초 단위
+
+# ▼ 요약 방식: "compact" 는 일정/대상/문의처/태그를 규칙으로 추출하고 AI는 제목·별점·한 줄 요약만 작성,
+#   "full" 은 기존처럼 AI가 요약 전체를 작성. SUMMARY_SKIP_LOW_VALUE 이면 저가치 공지는 AI 호출을 생략 (compact 전용)
+SUMMARY_MODE = os.environ.get("SUMMARY_MODE", "compact").lower()
+SUMMARY_SKIP_LOW_VALUE = os.environ.get("SUMMARY_SKIP_LOW_VALUE", "false").lower() in ("1", "true", "yes")
+
+# ▼ 요약 입력 토큰 예산: 본문을 BUDGET 토큰 안으로 줄이고, 정리 후에도 THRESHOLD 를 넘으면
+#   CHUNK_TOKENS 크기 조각(최대 MAX_CHUNKS 개)으로 나눠 핵심 사실을 먼저 뽑는 map-reduce 요약
+SUMMARY_INPUT_TOKEN_BUDGET = int(os.environ.get("SUMMARY_INPUT_TOKEN_BUDGET", "3000"))
+SUMMARY_MAP_REDUCE_THRESHOLD = int(os.environ.get("SUMMARY_MAP_REDUCE_THRESHOLD", "9000"))
+SUMMARY_CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", "2500"))
+SUMMARY_MAP_MAX_CHUNKS = int(os.environ.get("SUMMARY_MAP_MAX_CHUNKS", "6"))
+
+# ▼ 배치 요약: 한 번에 처리할 새 항목이 THRESHOLD 개 이상이면 SIZE 개씩 묶어 한 요청으로 요약
+#   (원문이 MAX_INPUT_CHARS 보다 긴 항목은 묶지 않고 단건으로 요약)
+SUMMARY_BATCH_THRESHOLD = int(os.environ.get("SUMMARY_BATCH_THRESHOLD", "6"))
+SUMMARY_BATCH_SIZE = int(os.environ.get("SUMMARY_BATCH_SIZE", "5"))
+SUMMARY_BATCH_MAX_INPUT_CHARS = int(os.environ.get("SUMMARY_BATCH_MAX_INPUT_CHARS", "6000"))
+
+# ▼ 새 공지 처리 파이프라인의 단계별 동시 실행 수
+NOTICE_EXTRACT_CONCURRENCY = int(os.environ.get("NOTICE_EXTRACT_CONCURRENCY", "4"))
+NOTICE_SUMMARY_CONCURRENCY = int(os.environ.get("NOTICE_SUMMARY_CONCURRENCY", "3"))
+
+# ▼ 비교과 프로그램 상세 페이지 동시 처리 수 / 검색 1회당 시간 예산(초)
+PROGRAM_DETAIL_CONCURRENCY = int(os.environ.get("PROGRAM_DETAIL_CONCURRENCY", "4"))
+PROGRAM_SEARCH_TIMEOUT = float(os.environ.get("PROGRAM_SEARCH_TIMEOUT", "60"))
+
+# ▼ 공지사항 게시판 다중 페이지 크롤링 설정
+NOTICE_PAGE_PARAM = "pageIndex"
+NOTICE_MAX_PAGES = int(os.environ.get("NOTICE_MAX_PAGES", "5"))
+NOTICE_BACKFILL_PAGES = int(os.environ.get("NOTICE_BACKFILL_PAGES", "30"))
+NOTICE_SEEN_RUN_STOP = int(os.environ.get("NOTICE_SEEN_RUN_STOP", "5"))
+NOTICE_CRAWL_PREFETCH = int(os.environ.get("NOTICE_CRAWL_PREFETCH", "3"))
+NOTICE_BACKFILL = os.environ.get("NOTICE_BACKFILL", "0") == "1"
+
+# ▼ 텔레그램 전송 속도 제한 (초당 메시지 수). 텔레그램 한도(전체 약 30/s, 채팅별 약 1/s, 그룹 20/min)보다 약간 낮게 설정
+TELEGRAM_GLOBAL_RATE = float(os.environ.get("TELEGRAM_GLOBAL_RATE", "25"))
+TELEGRAM_CHAT_RATE = float(os.environ.get("TELEGRAM_CHAT_RATE", "1"))
+TELEGRAM_GROUP_RATE = float(os.environ.get("TELEGRAM_GROUP_RATE", str(20 / 60)))
+TELEGRAM_DELIVERY_WORKERS = int(os.environ.get("TELEGRAM_DELIVERY_WORKERS", "4"))
+TELEGRAM_MAX_RETRIES = int(os.environ.get("TELEGRAM_MAX_RETRIES", "5"))
 
 CATEGORY_CODES = {
     "전체": "", "공지사항": "10001", "비교과 안내": "10002", "학사 안내": "10003",
@@ -108,19 +240,29 @@ def load_whitelist() -> dict:
             logging.error(f"Whitelist 로드 오류: {e}", exc_info=True)
     return {}
 
-def save_whitelist(whitelist: dict) -> None:
+def atomic_write_text(file_path: str, text: str) -> None:
+    """임시 파일에 먼저 쓴 뒤 rename 하여, 저장 도중 중단되어도 파일이 깨지지 않게 합니다."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(file_path))
     try:
-        with open(WHITELIST_FILE, "w", encoding="utf-8") as f:
-            json.dump({"users": whitelist}, f, ensure_ascii=False, indent=4)
-    except Exception as e:
-        logging.error(f"Whitelist 저장 오류: {e}", exc_info=True)
-
-def push_file_changes(file_path: str, commit_message: str) -> None:
-    """Git 저장소에 지정된 파일을 추가, 커밋, 푸시하는 범용 함수"""
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def push_file_changes(file_path: str | list, commit_message: str) -> None:
+    """Git 저장소에 지정된 파일(또는 파일 목록)을 추가, 커밋, 푸시하는 범용 함수"""
+    file_paths = [file_path] if isinstance(file_path, str) else list(file_path)
+    file_path = ", ".join(file_paths)
     try:
         subprocess.run(["git", "config", "user.email", "bot@example.com"], check=True)
         subprocess.run(["git", "config", "user.name", "공지봇"], check=True)
-        subprocess.run(["git", "add", file_path], check=True)
+        subprocess.run(["git", "add", *file_paths], check=True)
         
         result = subprocess.run(["git", "commit", "--allow-empty", "-m", commit_message], capture_output=True, text=True)
         if "nothing to commit" in result.stdout:
@@ -141,9 +283,89 @@ def push_file_changes(file_path: str, commit_message: str) -> None:
         logging.error(f"❌ 파일 푸시 중 알 수 없는 오류 발생: {e}", exc_info=True)
 
 
+
+class WriteBehindPersister:
+    """
+    파일 저장과 git 커밋/푸시를 이벤트 루프 밖(스레드)에서 모아서 처리하는 write-behind 저장소.
+    - 저장: 같은 파일에 대한 요청은 PERSIST_WRITE_DELAY 동안 모아 마지막 내용만 원자적으로 기록합니다.
+    - 푸시: PERSIST_PUSH_DELAY 동안 쌓인 파일들을 한 번의 커밋/푸시로 묶습니다.
+    종료 시 flush() 로 남은 저장/푸시를 모두 처리합니다.
+    """
+    def __init__(self, write_delay: float = PERSIST_WRITE_DELAY, push_delay: float = PERSIST_PUSH_DELAY):
+        self.write_delay = write_delay
+        self.push_delay = push_delay
+        self._pending_writes = {}   # 파일 경로 -> 저장할 텍스트
+        self._pending_pushes = {}   # 파일 경로 -> [커밋 메시지, ...]
+        self._before_push = {}      # 파일 경로 -> 푸시 직전에 실행할 함수 (예: SQLite 체크포인트)
+        self._write_task = None
+        self._push_task = None
+        self._git_lock = asyncio.Lock()
+
+    def save_json(self, file_path: str, data: dict) -> None:
+        """data를 지금 시점의 내용으로 직렬화해 두고, 실제 파일 기록은 뒤로 미룹니다."""
+        self._pending_writes[file_path] = json.dumps(data, ensure_ascii=False, indent=4)
+        if self._write_task is None or self._write_task.done():
+            self._write_task = asyncio.create_task(self._write_later())
+
+    def request_push(self, file_path: str, commit_message: str, before_push=None) -> None:
+        self._pending_pushes.setdefault(file_path, []).append(commit_message)
+        if before_push:
+            self._before_push[file_path] = before_push
+        if self._push_task is None or self._push_task.done():
+            self._push_task = asyncio.create_task(self._push_later())
+
+    async def _write_later(self) -> None:
+        await asyncio.sleep(self.write_delay)
+        await self._flush_writes()
+
+    async def _push_later(self) -> None:
+        await asyncio.sleep(self.push_delay)
+        await self._flush_pushes()
+
+    async def _flush_writes(self) -> None:
+        writes, self._pending_writes = self._pending_writes, {}
+        for file_path, text in writes.items():
+            try:
+                await asyncio.to_thread(atomic_write_text, file_path, text)
+            except Exception as e:
+                logging.error(f"❌ {file_path} 파일 저장 오류: {e}", exc_info=True)
+
+    async def _flush_pushes(self) -> None:
+        async with self._git_lock:
+            # 푸시할 파일이 아직 디스크에 기록되지 않았다면 먼저 기록합니다.
+            if any(path in self._pending_writes for path in self._pending_pushes):
+                await self._flush_writes()
+            pushes, self._pending_pushes = self._pending_pushes, {}
+            if not pushes:
+                return
+            for file_path in pushes:
+                prepare = self._before_push.pop(file_path, None)
+                if prepare:
+                    prepare()
+            messages = [message for file_messages in pushes.values() for message in file_messages]
+            commit_message = messages[0] if len(messages) == 1 else f"{messages[0]} (+{len(messages) - 1} more)"
+            await asyncio.to_thread(push_file_changes, list(pushes), commit_message)
+
+    async def flush(self) -> None:
+        """대기 중인 저장과 푸시를 즉시 처리합니다. (종료 시 호출)"""
+        for task in (self._write_task, self._push_task):
+            if task and not task.done():
+                task.cancel()
+        await self._flush_writes()
+        await self._flush_pushes()
+
+
+persister = WriteBehindPersister()
+
 ALLOWED_USERS = load_whitelist()
 logging.info(f"현재 화이트리스트: {list(ALLOWED_USERS.keys())}")
 
+def persist_whitelist(commit_message: str = None) -> None:
+    """화이트리스트를 비동기로 저장하고, commit_message가 있으면 git 푸시도 예약합니다."""
+    persister.save_json(WHITELIST_FILE, {"users": ALLOWED_USERS})
+    if commit_message:
+        persister.request_push(WHITELIST_FILE, commit_message)
+
 ################################################################################
 #                             공지사항 / 프로그램 캐시 관련 함수                        #
 ################################################################################
@@ -151,6 +373,58 @@ def generate_cache_key(title: str, href: str) -> str:
     normalized = f"{title.strip().lower()}::{href.strip()}"
     return hashlib.md5(normalized.encode('utf-8')).hexdigest()
 
+def notice_archive_key(notice: tuple) -> str:
+    """
+    공지 캐시/아카이브/검색 색인용 키. 게시글 번호(no=)로 만들어, 같은 공지가 페이지나 카테고리 게시판마다
+    다른 링크(pageIndex, cd 등)로 보여도 같은 공지로 취급합니다. 번호가 없으면 제목+링크 해시를 씁니다.
+    """
+    title, href = notice[0], notice[1]
+    number = urllib.parse.parse_qs(urllib.parse.urlsplit(href).query).get("no", [None])[0]
+    return f"no:{number}" if number else generate_cache_key(title, href)
+
+def region_fingerprint(html_content: str, start_marker: str, end_marker: str) -> str:
+    """HTML 전체를 파싱하지 않고, 관심 영역(start_marker ~ 마지막 end_marker)만 잘라 해시합니다."""
+    start = html_content.find(start_marker)
+    end = html_content.rfind(end_marker)
+    region = html_content[start:end + len(end_marker)] if 0 <= start < end else html_content
+    return hashlib.sha1(region.encode("utf-8")).hexdigest()
+
+
+class ListChangeDetector:
+    """
+    소스별로 마지막으로 처리한 목록 페이지의 ETag / Last-Modified / 영역 지문을 기억합니다.
+    상태는 처리가 끝까지 성공했을 때만 commit() 하므로, 전송에 실패한 항목은 다음 주기에 다시 확인됩니다.
+    """
+    def __init__(self):
+        self._state = {}
+
+    def request_headers(self, source: str) -> dict:
+        state = self._state.get(source, {})
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+        return headers
+
+    @staticmethod
+    def snapshot(fingerprint: str, response_headers=None) -> dict:
+        response_headers = response_headers or {}
+        return {
+            "fingerprint": fingerprint,
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+        }
+
+    def is_unchanged(self, source: str, snapshot: dict) -> bool:
+        return self._state.get(source, {}).get("fingerprint") == snapshot["fingerprint"]
+
+    def commit(self, source: str, snapshot: dict) -> None:
+        self._state[source] = snapshot
+
+
+list_change_detector = ListChangeDetector()
+
 def load_json_file(file_path: str) -> dict:
     """범용 JSON 로더"""
     if os.path.exists(file_path):
@@ -162,64 +436,989 @@ def load_json_file(file_path: str) -> dict:
     return {}
 
 def save_json_file(data: dict, file_path: str) -> None:
-    """범용 JSON 저장"""
+    """범용 JSON 저장 (원자적 기록)"""
     try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        atomic_write_text(file_path, json.dumps(data, ensure_ascii=False, indent=4))
     except Exception as e:
         logging.error(f"❌ {file_path} 파일 저장 오류: {e}", exc_info=True)
 
-# 각 캐시 파일에 대한 별도의 로드/저장/푸시 함수
-load_cache = lambda: load_json_file(CACHE_FILE)
-save_cache = lambda data: save_json_file(data, CACHE_FILE)
-push_cache_changes = lambda: push_file_changes(CACHE_FILE, "Update announcements_seen.json")
+class SeenView:
+    """SeenStore의 한 소스를 `key in view` 형태로 조회할 수 있게 해 주는 뷰 (키 하나당 인덱스 조회 1회)"""
+    def __init__(self, store: "SeenStore", source: str):
+        self._store = store
+        self._source = source
+
+    def __contains__(self, key: str) -> bool:
+        return self._store.contains(self._source, key)
+
+
+class SeenStore:
+    """
+    이미 본 공지/프로그램 키를 저장하는 SQLite 저장소 (WAL 모드).
+    (source, key) 기본키 인덱스로 조회하고, 새 항목은 한 트랜잭션으로 일괄 저장하며,
+    최초 발견 시각(first_seen)을 기준으로 SEEN_RETENTION_DAYS 가 지난 항목을 정리합니다.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS seen_items (
+            source TEXT NOT NULL,
+            key TEXT NOT NULL,
+            title TEXT,
+            first_seen REAL NOT NULL,
+            PRIMARY KEY (source, key)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_seen_items_first_seen ON seen_items (source, first_seen);
+        CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+    """
+    # 최초 실행 시 이관할 기존 JSON 캐시 파일
+    LEGACY_JSON_FILES = {"notices": CACHE_FILE, "programs": PKNUAI_PROGRAM_CACHE_FILE}
+
+    def __init__(self, db_path: str, retention_days: int = SEEN_RETENTION_DAYS):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._conn = None
+        self._last_prune = 0.0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # isolation_level=None: 자동 커밋 모드, 일괄 저장은 BEGIN/COMMIT 으로 직접 묶습니다.
+            self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+            for source, json_path in self.LEGACY_JSON_FILES.items():
+                self._migrate_from_json(source, json_path)
+        return self._conn
+
+    def _migrate_from_json(self, source: str, json_path: str) -> None:
+        """기존 {md5: true} JSON 캐시를 한 번만 이관합니다. (최초 발견 시각은 이관 시각으로 기록)"""
+        marker = f"migrated:{json_path}"
+        if self._conn.execute("SELECT 1 FROM meta WHERE name = ?", (marker,)).fetchone():
+            return
+        legacy = load_json_file(json_path)
+        now = time.time()
+        with _SqliteTransaction(self._conn):
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_items (source, key, title, first_seen) VALUES (?, ?, NULL, ?)",
+                [(source, key, now) for key in legacy],
+            )
+            self._conn.execute("INSERT INTO meta (name, value) VALUES (?, ?)", (marker, str(now)))
+        logging.info(f"✅ {json_path} 의 {len(legacy)}개 항목을 {self.db_path} 로 이관했습니다.")
+
+    def contains(self, source: str, key: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM seen_items WHERE source = ? AND key = ?", (source, key)).fetchone()
+        return row is not None
+
+    def view(self, source: str) -> SeenView:
+        return SeenView(self, source)
+
+    def add_many(self, source: str, items: list) -> None:
+        """[(key, title), ...] 을 한 트랜잭션으로 저장합니다."""
+        if not items:
+            return
+        now = time.time()
+        with _SqliteTransaction(self.conn):
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen_items (source, key, title, first_seen) VALUES (?, ?, ?, ?)",
+                [(source, key, title, now) for key, title in items],
+            )
+        self.maybe_prune()
+
+    def maybe_prune(self) -> int:
+        """하루에 한 번, 보존 기간이 지난 항목을 삭제합니다."""
+        if time.time() - self._last_prune < 24 * 3600:
+            return 0
+        self._last_prune = time.time()
+        cutoff = time.time() - self.retention_days * 24 * 3600
+        deleted = self.conn.execute("DELETE FROM seen_items WHERE first_seen < ?", (cutoff,)).rowcount
+        if deleted:
+            logging.info(f"보존 기간({self.retention_days}일)이 지난 항목 {deleted}개를 정리했습니다.")
+        return deleted
+
+    def checkpoint(self) -> None:
+        """WAL 내용을 본 DB 파일에 반영합니다. (git 커밋 전에 호출)"""
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self.checkpoint()
+            self._conn.close()
+            self._conn = None
+
+
+class _SqliteTransaction:
+    """자동 커밋 모드의 연결에서 BEGIN ~ COMMIT/ROLLBACK 을 묶어 주는 컨텍스트 매니저"""
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+seen_store = SeenStore(SEEN_DB_FILE)
+
+def push_seen_changes() -> None:
+    persister.request_push(SEEN_DB_FILE, f"Update {SEEN_DB_FILE}", before_push=seen_store.checkpoint)
+
+
+class NoticeArchive:
+    """
+    크롤링한 모든 공지(이미 본 공지 포함)를 보관하는 아카이브 (SQLite, WAL 모드).
+    seen.db 와 달리 git 에 올리지 않는 로컬 파일이며, 비어 있으면 게시판을 다시 읽어 채웁니다.
+    - 게시일은 'YYYY.MM.DD' 문자열과 월·일(MMDD 정수) 두 가지로 저장하여
+      날짜(MM/DD) 조회와 최신순 조회를 모두 인덱스 범위 검색으로 처리합니다.
+    - 카테고리는 게시판을 cd=코드 로 조회했을 때만 알 수 있으므로 (카테고리, 게시일, 키) 별도 테이블에 기록합니다.
+    - 카테고리별 마지막 갱신 시각을 기억해 두고, 오래된 경우에만 게시판을 다시 읽습니다.
+    - 스케줄러가 처리한 공지의 추출 본문/이미지 목록과 기본(비개인화) 요약을 notice_content 에 저장하여
+      대화형 조회는 다시 크롤링/OCR/요약하지 않고 바로 보여 줍니다.
+    - 게시일이 NOTICE_ARCHIVE_RETENTION_DAYS, 본문 저장 후 NOTICE_CONTENT_RETENTION_DAYS 가 지난 항목은 하루에 한 번 정리합니다.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS notice_archive (
+            key TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            department TEXT,
+            posted TEXT NOT NULL,
+            month_day INTEGER,
+            archived_at REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_notice_archive_month_day ON notice_archive (month_day, posted);
+        CREATE INDEX IF NOT EXISTS idx_notice_archive_posted ON notice_archive (posted);
+        CREATE TABLE IF NOT EXISTS notice_archive_categories (
+            category TEXT NOT NULL,
+            posted TEXT NOT NULL,
+            key TEXT NOT NULL,
+            PRIMARY KEY (category, posted, key)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS notice_content (
+            key TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            images TEXT NOT NULL,
+            summary TEXT,
+            summary_version TEXT,
+            stored_at REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_notice_content_stored_at ON notice_content (stored_at);
+    """
+
+    def __init__(self, db_path: str, retention_days: int = NOTICE_ARCHIVE_RETENTION_DAYS,
+                 content_retention_days: int = NOTICE_CONTENT_RETENTION_DAYS):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.content_retention_days = content_retention_days
+        self._conn = None
+        self._last_prune = 0.0
+        self._refreshed = {}   # {카테고리 코드: 마지막 갱신 time.monotonic()}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM notice_archive LIMIT 1").fetchone() is None
+
+    @staticmethod
+    def _month_day(posted: str) -> int | None:
+        match = re.fullmatch(r'\d{4}\.(\d{2})\.(\d{2})', posted)
+        return int(match.group(1)) * 100 + int(match.group(2)) if match else None
+
+    def add_many(self, notices: list, category: str = "") -> int:
+        """(제목, 링크, 부서, 날짜) 튜플을 한 트랜잭션으로 저장하고, 아카이브에 새로 추가된 공지 수를 반환합니다."""
+        if not notices:
+            return 0
+        now = time.time()
+        rows = [(notice_archive_key(notice), *notice, self._month_day(notice[3]), now) for notice in notices]
+        with _SqliteTransaction(self.conn):
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO notice_archive (key, title, url, department, posted, month_day, archived_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            added = self.conn.total_changes - before
+            if category:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO notice_archive_categories (category, posted, key) VALUES (?, ?, ?)",
+                    [(category, row[4], row[0]) for row in rows])
+        self.maybe_prune()
+        return added
+
+    def maybe_prune(self, force: bool = False) -> int:
+        """하루에 한 번, 보존 기간이 지난 공지와 본문/요약을 삭제합니다. 삭제한 행 수를 반환합니다."""
+        if not force and time.time() - self._last_prune < 24 * 3600:
+            return 0
+        self._last_prune = time.time()
+        posted_cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y.%m.%d")
+        content_cutoff = time.time() - self.content_retention_days * 24 * 3600
+        with _SqliteTransaction(self.conn):
+            deleted = self.conn.execute("DELETE FROM notice_archive WHERE posted < ?", (posted_cutoff,)).rowcount
+            deleted += self.conn.execute("DELETE FROM notice_archive_categories WHERE posted < ?",
+                                         (posted_cutoff,)).rowcount
+            deleted += self.conn.execute(
+                "DELETE FROM notice_content WHERE stored_at < ? OR key NOT IN (SELECT key FROM notice_archive)",
+                (content_cutoff,)).rowcount
+        if deleted:
+            logging.info(f"공지 아카이브에서 보존 기간이 지난 항목 {deleted}개를 정리했습니다.")
+        return deleted
+
+    def by_date(self, month: int, day: int, limit: int = NOTICE_ARCHIVE_QUERY_LIMIT) -> list:
+        """게시일의 월/일이 일치하는 공지 (연도 무관, 최신순)"""
+        rows = self.conn.execute(
+            "SELECT title, url, department, posted FROM notice_archive WHERE month_day = ? "
+            "ORDER BY posted DESC LIMIT ?", (month * 100 + day, limit)).fetchall()
+        return [tuple(row) for row in rows]
+
+    def by_category(self, category: str, limit: int = NOTICE_ARCHIVE_QUERY_LIMIT) -> list:
+        """카테고리의 최신 공지 (category 가 빈 문자열이면 전체)"""
+        if not category:
+            rows = self.conn.execute(
+                "SELECT title, url, department, posted FROM notice_archive ORDER BY posted DESC LIMIT ?",
+                (limit,)).fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT a.title, a.url, a.department, a.posted FROM notice_archive_categories c "
+                "JOIN notice_archive a ON a.key = c.key WHERE c.category = ? "
+                "ORDER BY c.posted DESC LIMIT ?", (category, limit)).fetchall()
+        return [tuple(row) for row in rows]
+
+    def store_content(self, key: str, content: dict) -> None:
+        """fetch_notice_content 결과를 저장합니다. (추출에 실패한 결과는 다음에 다시 시도하도록 저장하지 않음)"""
+        if content.get("error"):
+            return
+        self.conn.execute(
+            "INSERT INTO notice_content (key, text, images, stored_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET text = excluded.text, images = excluded.images, stored_at = excluded.stored_at",
+            (key, content["text"], json.dumps(content.get("images", []), ensure_ascii=False), time.time()))
+
+    def get_content(self, key: str) -> dict | None:
+        row = self.conn.execute("SELECT text, images FROM notice_content WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return {"text": row[0], "images": json.loads(row[1]), "error": None}
+
+    def store_summary(self, key: str, summary: dict, version: str) -> None:
+        """기본 요약(이미지 목록 제외)을 저장합니다. 본문이 먼저 저장된 공지에만 기록됩니다."""
+        summary = {name: value for name, value in summary.items() if name != "images"}
+        self.conn.execute("UPDATE notice_content SET summary = ?, summary_version = ? WHERE key = ?",
+                          (json.dumps(summary, ensure_ascii=False), version, key))
+
+    def get_summary(self, key: str, version: str) -> dict | None:
+        """저장된 기본 요약. 요약 모델/방식(version)이 바뀌었으면 None"""
+        row = self.conn.execute("SELECT summary, summary_version FROM notice_content WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] is None or row[1] != version:
+            return None
+        return json.loads(row[0])
+
+    def is_stale(self, category: str, max_age: float = NOTICE_ARCHIVE_STALE_SECONDS) -> bool:
+        refreshed = self._refreshed.get(category)
+        return refreshed is None or time.monotonic() - refreshed >= max_age
+
+    def mark_refreshed(self, category: str) -> None:
+        self._refreshed[category] = time.monotonic()
+
+    def stats(self) -> str:
+        total = self.conn.execute("SELECT COUNT(*) FROM notice_archive").fetchone()[0]
+        return f"공지 아카이브 {total}건"
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.close()
+            self._conn = None
+
+
+notice_archive = NoticeArchive(ARCHIVE_DB_FILE)
+
+################################################################################
+#                            로컬 전문 검색 (bigram 역색인)                          #
+################################################################################
+_SEARCH_TOKEN = re.compile(r'[가-힣]+|[a-z0-9]+')
+
+def search_tokens(text: str) -> list:
+    """
+    한글은 띄어쓰기/조사와 무관하게 찾을 수 있도록 2글자씩 겹쳐 자르고(한 글자 단어는 그대로),
+    영문/숫자는 단어 단위로 자릅니다. 예) '장학금 신청' → ['장학', '학금', '신청']
+    """
+    tokens = []
+    for run in _SEARCH_TOKEN.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        if "가" <= run[0] <= "힣" and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+class SearchIndex:
+    """
+    공지/비교과 프로그램을 함께 검색하는 역색인 (NoticeArchive 와 같은 로컬 SQLite 파일).
+    (term, doc_id) 포스팅을 기본키 인덱스로 조회하고 BM25 로 순위를 매깁니다.
+    문서는 크롤링/처리 시점에 한 트랜잭션으로 추가·갱신되며, 본문 없이 제목만 색인된 문서는
+    나중에 본문이 준비되면 다시 색인됩니다.
+    아카이브에서 정리된 공지와 retention_days 동안 갱신되지 않은 프로그램은 하루에 한 번 색인에서 뺍니다.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS search_docs (
+            doc_id INTEGER PRIMARY KEY,
+            source TEXT NOT NULL,
+            key TEXT NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            extra TEXT,
+            length INTEGER NOT NULL,
+            has_body INTEGER NOT NULL,
+            updated_at REAL NOT NULL,
+            UNIQUE (source, key)
+        );
+        CREATE TABLE IF NOT EXISTS search_postings (
+            term TEXT NOT NULL,
+            doc_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (term, doc_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_search_postings_doc ON search_postings (doc_id);
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, archive: NoticeArchive, retention_days: int = NOTICE_ARCHIVE_RETENTION_DAYS):
+        self._archive = archive
+        self.retention_days = retention_days
+        self._ready = False
+        self._last_prune = 0.0
+        self._stats = None   # (문서 수, 평균 문서 길이), 색인이 바뀌면 다시 계산
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = self._archive.conn
+        if not self._ready:
+            conn.executescript(self.SCHEMA)
+            self._ready = True
+            self._rebuild_if_empty()
+        return conn
+
+    def _rebuild_if_empty(self) -> None:
+        """색인이 비어 있으면(처음 실행, 테이블 삭제) 보관된 공지(본문 포함)로 다시 만듭니다."""
+        conn = self._archive.conn
+        if conn.execute("SELECT 1 FROM search_docs LIMIT 1").fetchone():
+            return
+        rows = conn.execute(
+            "SELECT a.title, a.url, a.department, a.posted, c.text FROM notice_archive a "
+            "LEFT JOIN notice_content c ON c.key = a.key").fetchall()
+        indexed = self.add_many("notices", [_notice_search_doc(tuple(row[:4]), row[4]) for row in rows])
+        if indexed:
+            logging.info(f"✅ 공지 아카이브의 {indexed}건을 검색 색인에 추가했습니다.")
+
+    def add_many(self, source: str, docs: list) -> int:
+        """
+        [{"key", "title", "url", "body", "extra"}] 를 한 트랜잭션으로 색인하고 색인한 문서 수를 반환합니다.
+        body 가 None 인 문서는 아직 색인되지 않은 경우에만 제목으로 색인합니다.
+        """
+        if not docs:
+            return 0
+        conn = self.conn
+        indexed = 0
+        now = time.time()
+        with _SqliteTransaction(conn):
+            for doc in docs:
+                row = conn.execute("SELECT doc_id FROM search_docs WHERE source = ? AND key = ?",
+                                   (source, doc["key"])).fetchone()
+                if row is not None and doc.get("body") is None:
+                    # 목록에 다시 보인 문서는 보존 기간 정리에서 빠지도록 갱신 시각만 새로 기록합니다.
+                    conn.execute("UPDATE search_docs SET updated_at = ? WHERE doc_id = ?", (now, row[0]))
+                    continue
+                terms = {}
+                for term in search_tokens(doc["title"]):
+                    terms[term] = terms.get(term, 0) + SEARCH_TITLE_WEIGHT
+                for term in search_tokens(doc.get("body")):
+                    terms[term] = terms.get(term, 0) + 1
+                extra = json.dumps(doc.get("extra") or {}, ensure_ascii=False)
+                values = (doc["title"], doc["url"], extra, sum(terms.values()), int(doc.get("body") is not None), now)
+                if row is None:
+                    doc_id = conn.execute(
+                        "INSERT INTO search_docs (title, url, extra, length, has_body, updated_at, source, key) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", values + (source, doc["key"])).lastrowid
+                else:
+                    doc_id = row[0]
+                    conn.execute("DELETE FROM search_postings WHERE doc_id = ?", (doc_id,))
+                    conn.execute("UPDATE search_docs SET title = ?, url = ?, extra = ?, length = ?, has_body = ?, "
+                                 "updated_at = ? WHERE doc_id = ?", values + (doc_id,))
+                conn.executemany("INSERT INTO search_postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                                 [(term, doc_id, tf) for term, tf in terms.items()])
+                indexed += 1
+        if indexed:
+            self._stats = None
+        self.maybe_prune()
+        return indexed
+
+    def maybe_prune(self, force: bool = False) -> int:
+        """하루에 한 번, 아카이브에 없는 공지와 오래된 프로그램 문서를 포스팅과 함께 삭제합니다."""
+        if not force and time.time() - self._last_prune < 24 * 3600:
+            return 0
+        self._last_prune = time.time()
+        self._archive.maybe_prune(force=force)
+        conn = self.conn
+        cutoff = time.time() - self.retention_days * 24 * 3600
+        stale = ("SELECT doc_id FROM search_docs WHERE (source = 'notices' AND key NOT IN "
+                 "(SELECT key FROM notice_archive)) OR (source != 'notices' AND updated_at < ?)")
+        with _SqliteTransaction(conn):
+            conn.execute(f"DELETE FROM search_postings WHERE doc_id IN ({stale})", (cutoff,))
+            deleted = conn.execute(f"DELETE FROM search_docs WHERE doc_id IN ({stale})", (cutoff,)).rowcount
+        if deleted:
+            self._stats = None
+            logging.info(f"검색 색인에서 정리된 문서 {deleted}개를 삭제했습니다.")
+        return deleted
+
+    def _collection_stats(self) -> tuple:
+        if self._stats is None:
+            count, average = self.conn.execute("SELECT COUNT(*), AVG(length) FROM search_docs").fetchone()
+            self._stats = (count, average or 1.0)
+        return self._stats
+
+    def search(self, query: str, limit: int = SEARCH_RESULT_LIMIT) -> list:
+        """BM25 점수순 검색 결과 [{"source", "title", "url", "extra", "score"}]"""
+        terms = list(dict.fromkeys(search_tokens(query)))
+        if not terms:
+            return []
+        doc_count, average_length = self._collection_stats()
+        scores, matches = {}, {}
+        for term in terms:
+            postings = self.conn.execute(
+                "SELECT p.doc_id, p.tf, d.length FROM search_postings p JOIN search_docs d ON d.doc_id = p.doc_id "
+                "WHERE p.term = ?", (term,)).fetchall()
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf, length in postings:
+                norm = self.K1 * (1 - self.B + self.B * length / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+                matches[doc_id] = matches.get(doc_id, 0) + 1
+
+        required = max(1, math.ceil(len(terms) * SEARCH_MIN_MATCH))
+        ranked = heapq.nlargest(limit, (doc_id for doc_id in scores if matches[doc_id] >= required), key=scores.get)
+        results = []
+        for doc_id in ranked:
+            source, title, url, extra = self.conn.execute(
+                "SELECT source, title, url, extra FROM search_docs WHERE doc_id = ?", (doc_id,)).fetchone()
+            results.append({"source": source, "title": title, "url": url,
+                            "extra": json.loads(extra or "{}"), "score": scores[doc_id]})
+        return results
+
+    def stats(self) -> str:
+        return f"검색 색인 {self._collection_stats()[0]}건"
+
+
+def _notice_search_doc(notice: tuple, body: str = None) -> dict:
+    title, href, department, posted = notice
+    return {"key": notice_archive_key(notice), "title": title, "url": href, "body": body,
+            "extra": {"department": department, "posted": posted}}
+
+def _program_search_doc(program: dict, body: str = None) -> dict:
+    return {"key": generate_cache_key(program["title"], program["unique_id"]), "title": program["title"],
+            "url": program["href"], "body": body, "extra": {"unique_id": program["unique_id"]}}
+
+def _search_result_notice(result: dict) -> tuple:
+    """공지 검색 결과를 (제목, 링크, 부서, 날짜) 공지 튜플로 되돌립니다."""
+    return result["title"], result["url"], result["extra"].get("department", ""), result["extra"].get("posted", "")
+
+def _search_result_program(result: dict) -> dict:
+    """프로그램 검색 결과를 프로그램 딕셔너리로 되돌립니다. (고유 ID가 없는 예전 문서는 상세 URL에서 만듭니다)"""
+    unique_id = result["extra"].get("unique_id")
+    if not unique_id:
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(result["url"]).query)
+        unique_id = "-".join(query.get(name, [""])[0] for name in ("yy", "shtm", "nonsubjcCd", "nonsubjcCrsCd"))
+    return {"title": result["title"], "href": result["url"], "unique_id": unique_id}
+
+
+search_index = SearchIndex(notice_archive)
+
+################################################################################
+#                                 AI 요약 캐시                                   #
+################################################################################
+class SummaryCache:
+    """
+    AI 요약 결과를 (정규화된 원문, 제목, 모델, 분석 관점)의 해시로 저장하는 LRU/TTL 캐시.
+    메모리에서 조회하고, flush() 시점에 JSON 파일로 저장합니다.
+    """
+    def __init__(self, file_path: str, max_entries: int, ttl: int):
+        self.file_path = file_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._entries = None
+        self._dirty = False
+        self._inflight = {}
+
+    @staticmethod
+    def make_key(text: str, title: str, model: str, viewpoint: str) -> str:
+        normalize = lambda value: " ".join((value or "").split())
+        raw = "\x1f".join([normalize(text), normalize(title), model, normalize(viewpoint)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load(self) -> OrderedDict:
+        if self._entries is None:
+            data = load_json_file(self.file_path)
+            self._entries = OrderedDict(sorted(data.items(), key=lambda item: item[1].get("ts", 0)))
+        return self._entries
+
+    def has(self, key: str) -> bool:
+        """적중/미스 통계에 영향을 주지 않고 유효한 항목이 있는지 확인합니다."""
+        entry = self._load().get(key)
+        return bool(entry) and time.time() - entry.get("ts", 0) < self.ttl
+
+    def get(self, key: str) -> dict | None:
+        entries = self._load()
+        entry = entries.get(key)
+        if entry and time.time() - entry.get("ts", 0) < self.ttl:
+            entries.move_to_end(key)
+            self.hits += 1
+            return {k: v for k, v in entry.items() if k != "ts"}
+        if entry:
+            del entries[key]
+            self._dirty = True
+        self.misses += 1
+        return None
 
-load_program_cache = lambda: load_json_file(PKNUAI_PROGRAM_CACHE_FILE)
-save_program_cache = lambda data: save_pknuai_program_cache(data)
-push_program_cache_changes = lambda: push_pknuai_program_cache_changes()
+    def put(self, key: str, value: dict) -> None:
+        entries = self._load()
+        entries[key] = {**value, "ts": time.time()}
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        self._dirty = True
+
+    def flush(self) -> None:
+        if self._dirty and self._entries is not None:
+            save_json_file(dict(self._entries), self.file_path)
+            self._dirty = False
+
+    async def singleflight(self, key: str, factory):
+        """같은 키의 요약이 이미 진행 중이면 새로 호출하지 않고 그 결과를 함께 기다립니다."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.shared += 1
+        # 한 호출자가 취소되어도 다른 호출자가 기다리는 요약은 계속 진행되도록 보호합니다.
+        return await asyncio.shield(task)
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0.0
+        return (f"요약 캐시: 적중 {self.hits} / 미스 {self.misses} / 진행 중 공유 {self.shared} "
+                f"(적중률 {hit_rate:.1f}%, 항목 {len(self._load())}개)")
+
+
+summary_cache = SummaryCache(SUMMARY_CACHE_FILE, SUMMARY_CACHE_MAX_ENTRIES, SUMMARY_CACHE_TTL)
+
+
+class OpenAIUsageStats:
+    """OpenAI 호출별 토큰 사용량(프롬프트 캐시 적중 토큰 포함)과 응답 시간을 집계합니다."""
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.elapsed = 0.0
+
+    def record(self, label: str, usage, elapsed: float) -> None:
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.cached_tokens += cached_tokens
+        self.completion_tokens += completion_tokens
+        self.elapsed += elapsed
+        logging.info(f"🧾 OpenAI 사용량 [{label}] 입력 {prompt_tokens} (캐시 {cached_tokens}) / "
+                     f"출력 {completion_tokens} 토큰, {elapsed:.2f}s")
+
+    def stats(self) -> str:
+        cached_rate = (self.cached_tokens / self.prompt_tokens * 100) if self.prompt_tokens else 0.0
+        avg_elapsed = self.elapsed / self.calls if self.calls else 0.0
+        return (f"OpenAI: 호출 {self.calls}회, 입력 {self.prompt_tokens} (캐시 {cached_rate:.1f}%) / "
+                f"출력 {self.completion_tokens} 토큰, 평균 {avg_elapsed:.2f}s")
+
+
+openai_usage = OpenAIUsageStats()
+
+_openai_client = None
+
+def get_openai_client():
+    """OpenAI 클라이언트를 처음 요약할 때 만듭니다. (openai 모듈 import 를 요약 단계까지 미룸)"""
+    global _openai_client
+    if _openai_client is None:
+        from openai import AsyncOpenAI
+        _openai_client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    return _openai_client
+
+async def request_json_completion(label: str, system_prompt: str, user_content: str,
+                                  temperature: float, max_tokens: int) -> dict:
+    """
+    고정된 시스템 프롬프트(접두사)와 호출마다 달라지는 사용자 메시지로 JSON 응답을 요청하고 사용량을 기록합니다.
+    prompt_cache_key 로 같은 프롬프트의 요청이 같은 캐시로 가도록 합니다.
+    """
+    started = time.monotonic()
+    response = await get_openai_client().chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ],
+        response_format={"type": "json_object"},
+        temperature=temperature,
+        max_tokens=max_tokens,
+        prompt_cache_key=f"pknu-{hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:16]}"
+    )
+    openai_usage.record(label, response.usage, time.monotonic() - started)
+    return json.loads(response.choices[0].message.content)
+
+# ▼ 배치 모드 지시문. 단건 시스템 프롬프트 뒤에 덧붙이므로 단건 요청과 같은 접두사 캐시를 공유합니다.
+SUMMARY_BATCH_INSTRUCTIONS = """
+### 여러 건 요약 (배치 모드)
+사용자 메시지에 '### 항목 [번호]' 로 구분된 여러 건이 주어진다. 각 항목을 서로 독립적으로 위 규칙에 따라 요약하고,
+위 출력 형식의 JSON 객체를 항목마다 만들어 "id"에 번호를 그대로 적은 뒤 아래 형식의 JSON 하나로만 응답한다.
+{"results": [{"id": "번호", (위 출력 형식의 나머지 키)}]}
+"""
 
-# ▼ 추가: PKNU AI 프로그램 캐시 함수
-load_pknuai_program_cache = lambda: load_json_file(PKNUAI_PROGRAM_CACHE_FILE)
-save_pknuai_program_cache = lambda data: save_json_file(data, PKNUAI_PROGRAM_CACHE_FILE)
-push_pknuai_program_cache_changes = lambda: push_file_changes(PKNUAI_PROGRAM_CACHE_FILE, "Update pknuai_programs_seen.json")
+async def request_json_batch(label: str, system_prompt: str, entries: list, preamble: str = "",
+                             temperature: float = 0.1, max_tokens_per_item: int = 1200) -> dict:
+    """
+    여러 항목을 한 번의 요청으로 요약합니다.
+    entries: [(항목 번호, 항목 내용)] / 반환: {항목 번호: 결과 딕셔너리} (응답에 빠진 항목은 포함되지 않음)
+    """
+    user_content = preamble + "\n\n".join(f"### 항목 [{item_id}]\n{content}" for item_id, content in entries)
+    data = await request_json_completion(
+        f"{label} x{len(entries)}", system_prompt + SUMMARY_BATCH_INSTRUCTIONS, user_content,
+        temperature=temperature, max_tokens=min(16000, max_tokens_per_item * len(entries)))
+    results = data.get("results", []) if isinstance(data, dict) else []
+    return {str(item.get("id")): item for item in results if isinstance(item, dict)}
 
 ################################################################################
 #                         웹페이지 크롤링 함수 (Playwright / aiohttp)                    #
 ################################################################################
 
+class HttpResponse:
+    """HttpSessionManager.fetch 의 결과 (본문을 모두 읽은 뒤의 응답)"""
+    def __init__(self, status: int, url: str, headers, body):
+        self.status = status
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+
+class HttpSessionManager:
+    """
+    애플리케이션 전체에서 공유하는 aiohttp 세션 관리자.
+    연결(keep-alive)을 재사용하고, 호스트별 연결 수 제한과 DNS 캐시, 지터가 있는 지수 백오프 재시도를 제공합니다.
+    """
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, headers: dict = None):
+        self._headers = headers
+        self._session = None
+
+    async def start(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=HTTP_LIMIT_PER_HOST,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self._headers,
+                timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            )
+        return self._session
+
+    @property
+    def cookie_jar(self) -> aiohttp.abc.AbstractCookieJar:
+        return self._session.cookie_jar
+
+    @staticmethod
+    def _backoff_delay(attempt: int, retry_after: str = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return HTTP_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def fetch(self, url: str, *, as_bytes: bool = False, raise_for_status: bool = True,
+                    timeout: float = None, headers: dict = None) -> HttpResponse:
+        """GET 요청을 보내고 본문까지 읽어 반환합니다. 연결 오류와 429/5xx 응답은 재시도합니다."""
+        session = await self.start()
+        # timeout=None 을 넘기면 aiohttp 는 세션 타임아웃 대신 '제한 없음'을 적용하므로 세션 값을 그대로 넘깁니다.
+        request_timeout = aiohttp.ClientTimeout(total=timeout, connect=HTTP_CONNECT_TIMEOUT) if timeout else session.timeout
+        for attempt in range(HTTP_MAX_RETRIES + 1):
+            try:
+                async with session.get(url, timeout=request_timeout, headers=headers) as response:
+                    if response.status in self.RETRY_STATUSES and attempt < HTTP_MAX_RETRIES:
+                        delay = self._backoff_delay(attempt, response.headers.get("Retry-After"))
+                        logging.warning(f"HTTP {response.status} 응답, {delay:.1f}초 후 재시도합니다: {url}")
+                        await asyncio.sleep(delay)
+                        continue
+                    if raise_for_status:
+                        response.raise_for_status()
+                    body = await response.read() if as_bytes else await response.text()
+                    return HttpResponse(response.status, str(response.url), response.headers, body)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                if attempt >= HTTP_MAX_RETRIES:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logging.warning(f"HTTP 연결 오류({type(e).__name__}), {delay:.1f}초 후 재시도합니다: {url}")
+                await asyncio.sleep(delay)
+
+    async def get_text(self, url: str, **kwargs) -> str:
+        return (await self.fetch(url, **kwargs)).body
+
+    async def get_bytes(self, url: str, **kwargs) -> bytes:
+        return (await self.fetch(url, as_bytes=True, **kwargs)).body
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+http_manager = HttpSessionManager()
+
+
+class _PooledContext:
+    """브라우저 풀에서 관리하는 로그인된 컨텍스트/페이지 한 쌍"""
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.logged_in_at = time.monotonic()
+        self.broken = False
+
+    def is_expired(self) -> bool:
+        return (self.uses >= PKNUAI_CONTEXT_MAX_USES
+                or time.monotonic() - self.logged_in_at >= PKNUAI_SESSION_TTL)
+
+    def is_healthy(self) -> bool:
+        return not self.broken and not self.page.is_closed()
+
+    async def close(self) -> None:
+        try:
+            await self.context.close()
+        except Exception as e:
+            logging.warning(f"브라우저 컨텍스트 종료 중 오류 (무시): {e}")
+
+
+class PknuaiBrowserPool:
+    """
+    Chromium 브라우저 하나를 오래 유지하면서, PKNU AI 로그인이 완료된 컨텍스트를 빌려주고 돌려받는 풀.
+    - 동시에 열 수 있는 페이지 수는 PKNUAI_BROWSER_MAX_PAGES 로 제한합니다.
+    - 사용 횟수(PKNUAI_CONTEXT_MAX_USES) 또는 세션 유효시간(PKNUAI_SESSION_TTL)을 넘긴 컨텍스트는 새로 로그인합니다.
+    """
+    def __init__(self, max_pages: int = PKNUAI_BROWSER_MAX_PAGES):
+        self._semaphore = asyncio.Semaphore(max_pages)
+        self._idle: list[_PooledContext] = []
+        self._start_lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+
+    async def _ensure_browser(self):
+        async with self._start_lock:
+            if self._browser and self._browser.is_connected():
+                return self._browser
+            if self._browser:
+                logging.warning("⚠️ Playwright 브라우저 연결이 끊어져 다시 실행합니다.")
+                await self._discard_idle()
+            if not self._playwright:
+                # playwright 는 브라우저가 실제로 필요할 때만 import 합니다.
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+            started = time.perf_counter()
+            self._browser = await self._playwright.chromium.launch(
+                headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"]
+            )
+            logging.info(f"🚀 Playwright 브라우저 실행 완료 ({time.perf_counter() - started:.2f}s)")
+            return self._browser
+
+    async def _new_context(self) -> _PooledContext:
+        browser = await self._ensure_browser()
+        context = await browser.new_context(
+            user_agent=PKNUAI_USER_AGENT,
+            locale="ko-KR",
+        )
+        try:
+            pooled = _PooledContext(context, await context.new_page())
+            await self._login(pooled)
+        except Exception:
+            # 로그인에 실패한 컨텍스트가 브라우저에 남지 않도록 닫습니다.
+            await context.close()
+            raise
+        return pooled
+
+    async def _login(self, pooled: _PooledContext) -> None:
+        """로그인 브리지 URL로 세션을 생성합니다."""
+        await pooled.page.goto(PKNUAI_LOGIN_BRIDGE_URL.format(user_id=PKNU_USERNAME), wait_until="networkidle")
+        pooled.logged_in_at = time.monotonic()
+        pooled.uses = 0
+        logging.info("Playwright 세션 로그인 성공.")
+
+    async def relogin(self, pooled: _PooledContext) -> None:
+        """세션이 만료된 것으로 보일 때 같은 컨텍스트에서 다시 로그인합니다."""
+        logging.info("PKNU AI 세션이 만료되어 다시 로그인합니다.")
+        await self._login(pooled)
+
+    async def export_cookies(self, relogin: bool = False) -> dict:
+        """로그인된 컨텍스트의 PKNU AI 쿠키를 {이름: 값} 형태로 내보냅니다."""
+        async with self.lease() as pooled:
+            if relogin:
+                await self.relogin(pooled)
+            cookies = await pooled.context.cookies(PKNUAI_BASE_URL)
+        return {c["name"]: c["value"] for c in cookies}
+
+    async def _discard_idle(self) -> None:
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await pooled.close()
+
+    async def _acquire(self) -> _PooledContext:
+        while self._idle:
+            pooled = self._idle.pop()
+            if pooled.is_healthy() and not pooled.is_expired() and self._browser and self._browser.is_connected():
+                return pooled
+            await pooled.close()
+        return await self._new_context()
+
+    @asynccontextmanager
+    async def lease(self):
+        """로그인된 컨텍스트를 빌려옵니다. 블록 안에서 예외가 나면 해당 컨텍스트는 폐기됩니다."""
+        async with self._semaphore:
+            pooled = await self._acquire()
+            try:
+                yield pooled
+            except BaseException:
+                pooled.broken = True
+                raise
+            finally:
+                pooled.uses += 1
+                if pooled.is_healthy() and not pooled.is_expired():
+                    self._idle.append(pooled)
+                else:
+                    await pooled.close()
+
+    async def close(self) -> None:
+        """봇 종료 시 브라우저와 Playwright 드라이버를 정리합니다."""
+        await self._discard_idle()
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logging.warning(f"브라우저 종료 중 오류 (무시): {e}")
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+browser_pool = PknuaiBrowserPool()
+
+def _is_pknuai_login_page(url: str) -> bool:
+    """세션 만료 시 로그인 페이지로 리다이렉트되었는지 확인"""
+    return "/login/" in urllib.parse.urlparse(url).path
+
+
+class PknuaiHttpSession:
+    """
+    Playwright로 한 번 로그인해 얻은 쿠키를 재사용하여, 서버 렌더링된 program.do / programDetail.do 를
+    aiohttp로 바로 가져오는 세션. 세션이 거부되면 한 번 재로그인 후 재시도하고, 그래도 실패하면 None을 반환합니다.
+    """
+    def __init__(self):
+        self._http = HttpSessionManager(
+            headers={"User-Agent": PKNUAI_USER_AGENT, "Accept-Language": "ko-KR,ko;q=0.9"},
+        )
+        self._cookies_loaded = False
+        self._lock = asyncio.Lock()
+
+    async def _load_cookies(self, relogin: bool = False) -> None:
+        async with self._lock:
+            if self._cookies_loaded and not relogin:
+                return
+            await self._http.start()
+            cookies = await browser_pool.export_cookies(relogin=relogin)
+            self._http.cookie_jar.clear()
+            self._http.cookie_jar.update_cookies(cookies, response_url=yarl.URL(PKNUAI_BASE_URL))
+            self._cookies_loaded = bool(cookies)
+            logging.info(f"PKNU AI 세션 쿠키 {len(cookies)}개를 HTTP 세션에 적용했습니다.")
+
+    @staticmethod
+    def _is_rejected(status: int, final_url: str, html_content: str) -> bool:
+        return status in (401, 403) or _is_pknuai_login_page(final_url) or "pknuLoginProc" in html_content
+
+    @staticmethod
+    def _needs_browser(url: str, html_content: str) -> bool:
+        """상세 페이지인데 본문 영역이 없으면 JS 렌더링이 필요한 페이지로 간주합니다."""
+        return "programDetail.do" in url and "pro_desc_box" not in html_content
+
+    async def fetch(self, url: str) -> str | None:
+        try:
+            await self._load_cookies()
+            for attempt in range(2):
+                response = await self._http.fetch(url, raise_for_status=False)
+                if not self._is_rejected(response.status, response.url, response.body):
+                    if response.status >= 400:
+                        raise aiohttp.ClientError(f"HTTP {response.status}")
+                    if self._needs_browser(url, response.body):
+                        logging.info(f"HTTP 응답에 필요한 내용이 없어 브라우저로 대체합니다: {url}")
+                        return None
+                    return response.body
+                if attempt == 0:
+                    logging.info("HTTP 세션이 거부되어 재로그인 후 다시 시도합니다.")
+                    await self._load_cookies(relogin=True)
+        except Exception as e:
+            logging.warning(f"HTTP 빠른 경로 실패, 브라우저로 대체합니다 ({url}): {e}")
+        return None
+
+    async def close(self) -> None:
+        await self._http.close()
+
+
+pknuai_http = PknuaiHttpSession()
+
 async def fetch_program_html(url: str, keyword: str = None, filters: dict = None) -> str:
     """
-    Playwright를 사용하여 로그인 세션을 유지하며 지정된 URL의 HTML을 가져오는 범용 함수.
+    브라우저 풀에서 로그인된 페이지를 빌려 지정된 URL의 HTML을 가져오는 범용 함수.
     """
     if not PKNU_USERNAME:
         logging.error("❌ PKNU_USERNAME 환경 변수가 설정되지 않았습니다.")
         return ""
 
-    logging.info(f"🚀 Playwright 작업 시작 (URL: {url})")
-    
-    async with async_playwright() as p:
-        browser = None
-        page = None
-        try:
-            browser = await p.chromium.launch(headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"])
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                locale="ko-KR",
-            )
-            page = await context.new_page()
-
-            # 최초 접근 시에만 로그인 브리지 URL을 사용
-            login_bridge_url = f"https://pknuai.pknu.ac.kr/web/login/pknuLoginProc.do?mId=3&userId={PKNU_USERNAME}"
-            await page.goto(login_bridge_url, wait_until="networkidle")
-            logging.info("Playwright 세션 로그인 성공.")
+    # 실제 목표 URL
+    target_url = url
+    if keyword:
+        target_url = f"https://pknuai.pknu.ac.kr/web/nonSbjt/program.do?mId=216&order=3&searchKeyword={quote(keyword)}"
 
-            # 실제 목표 URL로 이동
-            target_url = url
-            if keyword:
-                target_url = f"https://pknuai.pknu.ac.kr/web/nonSbjt/program.do?mId=216&order=3&searchKeyword={quote(keyword)}"
+    # 필터 라벨 클릭처럼 JS가 필요한 경우를 제외하면 HTTP 빠른 경로를 먼저 시도합니다.
+    if PKNUAI_HTTP_FASTPATH and not (filters and any(filters.values())):
+        html_content = await pknuai_http.fetch(target_url)
+        if html_content:
+            return html_content
 
-            logging.info(f"타겟 URL로 이동: {target_url}")
+    logging.info(f"🚀 Playwright 작업 시작 (URL: {target_url})")
+    try:
+        async with browser_pool.lease() as pooled:
+            page = pooled.page
             await page.goto(target_url, wait_until="networkidle")
+            if _is_pknuai_login_page(page.url):
+                await browser_pool.relogin(pooled)
+                await page.goto(target_url, wait_until="networkidle")
 
             if filters and any(filters.values()):
                 logging.info(f"필터를 적용합니다: {filters}")
@@ -232,62 +1431,551 @@ async def fetch_program_html(url: str, keyword: str = None, filters: dict = None
 
             return await page.content()
 
-        except Exception as e:
-            logging.error(f"❌ Playwright 크롤링 중 오류 발생: {e}", exc_info=True)
-            return ""
-        finally:
-            if browser:
-                await browser.close()
-            
+    except Exception as e:
+        logging.error(f"❌ Playwright 크롤링 중 오류 발생: {e}", exc_info=True)
+        return ""
+
 async def fetch_url(url: str) -> str:
     """정적 페이지(학교 공지사항) 크롤링 함수"""
     try:
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                return await response.text()
+        return await http_manager.get_text(url)
     except Exception as e:
         logging.error(f"❌ URL 요청 오류: {url}, {e}", exc_info=True)
         return None
 
+################################################################################
+#                          규칙 기반 정보 추출 (요약 보조)                          #
+################################################################################
+# 본문을 항목 단위로 나누는 기호 (공지 본문은 공백으로 합쳐져 있으므로 글머리 기호 앞에서 나눔)
+_SEGMENT_SPLIT = re.compile(r'\n+|\s+(?=[○□■▶※•◎●◆◇▪☞▣])|(?<![.\d~])\s+(?=\d{1,2}\.\s|[가-하]\.\s)')
+_DATE_MENTION = re.compile(r'(?<!\d)(?:(\d{4})\s*[.\-/년]\s*)?(\d{1,2})\s*[.\-/월]\s*(\d{1,2})(?!\d)')
+_PHONE_PATTERN = re.compile(r'(?<!\d)(0\d{1,2}[-.)\s]\d{3,4}[-.\s]\d{4})(?!\d)')
+_EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+
+# 요약 템플릿의 '핵심 정보' 항목과 본문에서 찾을 표지어
+NOTICE_FACT_LABELS = {
+    "지원 자격": re.compile(r'(?:지원|신청|참가|참여|모집|수혜)?\s*(?:대상|자격)'),
+    "주요 혜택": re.compile(r'혜택|지원\s*내용|지원\s*금액|장학\s*금액|시상|특전'),
+    "모집/운영 기간": re.compile(r'(?:신청|접수|모집|운영|행사|교육|활동|제출)?\s*(?:기간|일시|마감|기한)'),
+    "신청 방법": re.compile(r'(?:신청|접수|지원|제출)\s*방법'),
+}
+
+# 프롬프트의 고정 태그 목록에 대응하는 키워드 (본문/제목에 키워드가 있으면 태그 부여)
+NOTICE_TAG_KEYWORDS = {
+    "#학사일정": ["학사일정", "수강신청", "졸업"], "#장학금": ["장학"],
+    "#취업": ["취업", "일자리", "채용설명회"], "#채용": ["채용"], "#인턴": ["인턴"],
+    "#공모전": ["공모전", "경진대회"], "#특강": ["특강", "강연", "세미나"],
+    "#대외활동": ["대외활동", "서포터즈", "기자단", "홍보대사"], "#교내활동": ["동아리", "축제", "교내 행사"],
+    "#프로그램": ["프로그램"], "#마일리지": ["마일리지"],
+    "#공과대학": ["공과대학"], "#인문사회과학대학": ["인문사회과학대학"], "#자연과학대학": ["자연과학대학"],
+    "#경영대학": ["경영대학"], "#수산과학대학": ["수산과학대학"], "#정보융합대학": ["정보융합대학"],
+    "#기계공학과": ["기계공학과"], "#컴퓨터공학과": ["컴퓨터공학"], "#IT융합응용공학과": ["IT융합응용공학"],
+    "#데이터정보과학부": ["데이터정보과학"], "#경영학과": ["경영학과"],
+}
+PROGRAM_TAG_KEYWORDS = {
+    "#특강": ["특강", "강연"], "#워크숍": ["워크숍", "워크샵"], "#공모전": ["공모전"], "#경진대회": ["경진대회"],
+    "#상담": ["상담"], "#컨설팅": ["컨설팅"], "#현장실습": ["현장실습"], "#인턴십": ["인턴"],
+    "#봉사": ["봉사"], "#자격증": ["자격증"], "#장학금": ["장학"], "#인증서": ["인증서", "수료증"],
+    "#기념품": ["기념품", "상품", "경품"], "#새내기": ["신입생", "새내기", "1학년"],
+    "#졸업예정자": ["졸업예정", "4학년"], "#외국인유학생": ["유학생"],
+    "#공과대학": ["공과대학"], "#정보융합대학": ["정보융합대학"], "#인문사회과학대학": ["인문사회과학대학"],
+    "#자연과학대학": ["자연과학대학"], "#경영대학": ["경영대학"], "#수산과학대학": ["수산과학대학"],
+    "#기계공학과": ["기계공학과"], "#컴퓨터공학과": ["컴퓨터공학"], "#IT융합응용공학과": ["IT융합응용공학"],
+    "#데이터정보과학부": ["데이터정보과학"],
+}
+
+# ▼ AI 요약 호출 없이 규칙 기반 요약만 보내는 저가치 공지의 제목 패턴 (SUMMARY_SKIP_LOW_VALUE 일 때만 사용)
+LOW_VALUE_NOTICE_PATTERNS = re.compile(
+    r'(시설|건물|도로|전기|배관|방수|보수)\s*공사|정전|단수|소독|방역|휴관|분실물'
+    r'|주차장|(?<!\d)(?<!\d\s)주차\s*(안내|통제|제한|요금|등록|단속)'
+    r'|(정기|시설|시스템|서버|전기|소방|안전)\s*점검|설문\s*조사|홍보\s*협조'
+)
+# ▼ 저가치 표현이 있어도 채용/모집 등 기회성 공지는 AI 요약을 생략하지 않습니다.
+LOW_VALUE_EXEMPT_TAGS = {"#취업", "#채용", "#인턴", "#대외활동", "#장학금", "#공모전", "#특강"}
+LOW_VALUE_EXEMPT_KEYWORDS = ("모집", "선발", "신청")
+
+def _split_segments(text: str) -> list:
+    return [segment.strip(" -:·") for segment in _SEGMENT_SPLIT.split(text or "") if segment and segment.strip(" -:·")]
+
+def _labeled_value(segments: list, pattern: re.Pattern, max_length: int = 80) -> str:
+    """항목 머리(앞부분 12자 이내)에 표지어가 있는 첫 항목의 값을 반환합니다."""
+    for segment in segments:
+        match = pattern.search(segment[:12 + 8])
+        if match and match.start() <= 12:
+            value = segment[match.end():].lstrip(" :：)]-·")
+            if value:
+                return value if len(value) <= max_length else value[:max_length].rstrip() + "…"
+    return ""
+
+def parse_date_mentions(text: str, today=None) -> list:
+    """
+    본문에 언급된 날짜를 date 목록으로 반환합니다.
+    연도가 없으면 앞서 언급된 연도를, 그것도 없으면 오늘과 가장 가까운 연도로 추정합니다.
+    """
+    today = today or datetime.now().date()
+    dates = []
+    last_year = None
+    for year, month, day in _DATE_MENTION.findall(text or ""):
+        month, day = int(month), int(day)
+        if not (1 <= month <= 12 and 1 <= day <= 31):
+            continue
+        if year:
+            last_year = int(year)
+        try:
+            mentioned = today.replace(year=last_year or today.year, month=month, day=day)
+        except ValueError:
+            continue
+        if not last_year and (today - mentioned).days > 180:
+            mentioned = mentioned.replace(year=mentioned.year + 1)
+        dates.append(mentioned)
+    return dates
+
+def classify_tags(text: str, tag_keywords: dict, limit: int = 5) -> list:
+    """고정 태그 목록 중 키워드가 본문에 나타나는 태그를 최대 limit 개 반환합니다."""
+    return [tag for tag, keywords in tag_keywords.items() if any(keyword in text for keyword in keywords)][:limit]
+
+def is_low_value_notice(title: str) -> bool:
+    """시설 공사/정전/주차장/설문 조사 등 단순 안내 공지인지 제목으로 판단합니다. (채용·모집 등은 제외)"""
+    if not LOW_VALUE_NOTICE_PATTERNS.search(title):
+        return False
+    if any(keyword in title for keyword in LOW_VALUE_EXEMPT_KEYWORDS):
+        return False
+    return not LOW_VALUE_EXEMPT_TAGS.intersection(classify_tags(title, NOTICE_TAG_KEYWORDS, limit=len(NOTICE_TAG_KEYWORDS)))
+
+def extract_notice_facts(text: str, title: str) -> dict:
+    """
+    공지 본문에서 요약 템플릿의 '핵심 정보'를 규칙으로 추출합니다.
+    반환값: {"fields": {항목: 값}, "deadline": 마감일(date|None), "tags": [...], "first_come": bool}
+    """
+    segments = _split_segments(text)
+    fields = {label: _labeled_value(segments, pattern) for label, pattern in NOTICE_FACT_LABELS.items()}
+
+    contacts = list(dict.fromkeys(_PHONE_PATTERN.findall(text) + _EMAIL_PATTERN.findall(text)))[:2]
+    fields["문의처"] = ", ".join(contacts) or _labeled_value(segments, re.compile(r'문의'))
+
+    period_dates = parse_date_mentions(fields["모집/운영 기간"])
+    return {
+        "fields": fields,
+        "deadline": max(period_dates) if period_dates else None,
+        "tags": classify_tags(f"{title} {text}", NOTICE_TAG_KEYWORDS),
+        "first_come": "선착순" in text,
+    }
+
+def extract_program_facts(details: dict) -> dict:
+    """parse_pknuai_program_details 결과를 요약 템플릿 항목으로 옮깁니다. (AI 추론 없이 그대로 사용)"""
+    content = details.get("내용", "")
+    apply_guide = details.get("신청안내", "") or details.get("모집안내", "")
+    first_sentence = lambda value: re.split(r'(?<=[.!?다])\s|\n', value.strip(), maxsplit=1)[0][:80] if value else ""
+    total, applied = details.get("모집인원", 0), details.get("지원인원", 0)
+    period_dates = parse_date_mentions(details.get("모집기간", ""))
+    all_text = " ".join(str(value) for value in details.values())
+    tags = classify_tags(all_text, PROGRAM_TAG_KEYWORDS, limit=4)
+    if "전체" in details.get("참여대상", ""):
+        tags.insert(0, "#전체학생")
+    return {
+        "fields": {
+            "모집기간": details.get("모집기간", ""),
+            "운영기간": details.get("운영기간", ""),
+            "참여 대상": details.get("참여대상", ""),
+            "주요 내용": first_sentence(content),
+            "신청 방법": first_sentence(apply_guide),
+            "예상 마일리지": details.get("예상 마일리지", ""),
+        },
+        "deadline": max(period_dates) if period_dates else None,
+        "tags": ["#비교과", "#마일리지"] + [tag for tag in tags if tag != "#마일리지"][:3],
+        "first_come": "선착순" in all_text,
+        "fill_rate": applied / total if total else 0.0,
+        "easy_access": any(word in details.get("참여대상", "") for word in ("전체", "1학년")),
+        "career": any(word in all_text for word in ("취업", "자격증", "상담")),
+    }
+
+def recommend_actions(facts: dict) -> list:
+    """추출한 마감일/선발 방식 등으로 프롬프트의 '추천 액션' 규칙을 그대로 적용합니다."""
+    actions = []
+    deadline = facts.get("deadline")
+    if deadline and 0 <= (deadline - datetime.now().date()).days <= 3:
+        actions.append("마감이 임박했어요! 놓치기 아까운 기회이니 지금 바로 신청하세요.")
+    if facts.get("first_come") and facts.get("fill_rate", 1.0) >= 0.7:
+        actions.append("선착순 마감이니 서두르는 걸 추천해요.")
+    if facts.get("easy_access"):
+        actions.append("신청 절차가 간단해 보여요. 5분만 투자해서 경험과 마일리지를 얻어보세요.")
+    if facts.get("career"):
+        actions.append("진로나 취업을 준비하고 있다면 좋은 스펙이 될 거예요.")
+    return actions[:2] or ["원문에서 세부 내용을 확인해 보세요."]
+
+def render_rule_summary(facts: dict, rating, one_line: str, reason: str = "") -> str:
+    """규칙으로 채운 '핵심 정보'와 AI(또는 규칙)가 정한 별점/한 줄 요약으로 기존 요약 형식의 본문을 만듭니다."""
+    try:
+        stars = "⭐" * min(5, max(1, int(rating)))
+    except (TypeError, ValueError):
+        stars = "⭐⭐⭐"
+    lines = [f"<b>{stars} {html.escape(one_line)}</b>"]
+    if reason:
+        lines.append(f"- <i>평가 근거: {html.escape(reason)}</i>")
+    lines += ["", "<b>📋 핵심 정보</b>"]
+    lines += [f"- <b>{label}:</b> {html.escape(value) if value else '원문 참고'}" for label, value in facts["fields"].items()]
+    lines += ["", "<b>🚀 추천 액션</b>"] + [f"- {action}" for action in recommend_actions(facts)]
+    if facts["tags"]:
+        lines += ["", "<b>#️⃣ 관련 태그</b>", "- " + " ".join(facts["tags"])]
+    return "\n".join(lines)
+
+################################################################################
+#                          요약 입력 크기 조절 (토큰 예산)                          #
+################################################################################
+# 공지 본문 앞뒤에 붙는 게시판 공통 문구 (요약에 도움이 되지 않으므로 제거)
+BOILERPLATE_PATTERNS = re.compile(
+    r'^(?:첨부\s*파일|이전글|다음글|목록|인쇄|공유하기|조회수|TOP|개인정보\s*처리방침|Copyright|COPYRIGHT|ⓒ|©)'
+)
+
+_token_encoder = None
+
+def estimate_tokens(text: str) -> int:
+    """gpt-4o 기준 토큰 수. tiktoken 이 없으면 글자 수로 추정합니다. (한글은 대략 1.2자당 1토큰)"""
+    global _token_encoder
+    if _token_encoder is None:
+        try:
+            import tiktoken
+            _token_encoder = tiktoken.encoding_for_model(SUMMARY_MODEL)
+        except Exception:
+            _token_encoder = False
+    if _token_encoder:
+        return len(_token_encoder.encode(text or ""))
+    return int(len(text or "") / 1.2) + 1
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """text 를 앞에서부터 budget 토큰까지 자릅니다. (tiktoken 이 없으면 estimate_tokens 와 같은 비율로 자름)"""
+    if estimate_tokens(text) <= budget:
+        return text
+    if _token_encoder:
+        return _token_encoder.decode(_token_encoder.encode(text)[:budget])
+    return text[:int(budget * 1.2)]
+
+# 문장 끝(숫자가 아닌 글자 뒤의 . ! ?) 다음 공백에서 자릅니다. ('2025. 8. 20' 같은 날짜는 자르지 않음)
+_SENTENCE_SPLIT = re.compile(r'(?<=[^\d\s][.!?])\s+')
+
+def split_oversized_segments(segments: list, max_tokens: int) -> list:
+    """
+    max_tokens 보다 큰 항목을 문장 단위로 나눠 max_tokens 이하 조각으로 묶습니다.
+    글머리 기호 없이 공백으로 이어진 본문은 통째로 한 항목이 되므로, 선별/조각 나누기 전에 필요합니다.
+    """
+    result = []
+    for segment in segments:
+        if estimate_tokens(segment) <= max_tokens:
+            result.append(segment)
+            continue
+        current, used = [], 0
+        for sentence in _SENTENCE_SPLIT.split(segment):
+            tokens = estimate_tokens(sentence)
+            if tokens > max_tokens:
+                sentence, tokens = truncate_to_tokens(sentence, max_tokens), max_tokens
+            if current and used + tokens > max_tokens:
+                result.append(" ".join(current))
+                current, used = [], 0
+            current.append(sentence)
+            used += tokens
+        if current:
+            result.append(" ".join(current))
+    return result
+
+def _clean_segments(text: str) -> tuple:
+    """항목 단위로 나눈 뒤 반복되는 줄(OCR 중복 등)과 게시판 공통 문구를 제거합니다. (항목 목록, 중복 수, 상용구 수)"""
+    segments, seen = [], set()
+    duplicates = boilerplate = 0
+    for segment in _split_segments(text):
+        normalized = re.sub(r'\s+', '', segment)
+        if len(normalized) < 2:
+            continue
+        if normalized in seen:
+            duplicates += 1
+            continue
+        if BOILERPLATE_PATTERNS.match(segment):
+            boilerplate += 1
+            continue
+        seen.add(normalized)
+        segments.append(segment)
+    return segments, duplicates, boilerplate
+
+def _segment_score(segment: str, position: int, title_words: set) -> float:
+    """요약에 필요한 정보(항목 표지어, 날짜, 연락처, 제목 단어)가 많고 앞쪽에 있을수록 높은 점수를 줍니다."""
+    head = segment[:20]
+    score = sum(3 for pattern in NOTICE_FACT_LABELS.values() if pattern.search(head))
+    score += 2 if _DATE_MENTION.search(segment) else 0
+    score += 2 if _PHONE_PATTERN.search(segment) or _EMAIL_PATTERN.search(segment) else 0
+    score += sum(1 for word in title_words if word in segment)
+    return score + 1 / (1 + position * 0.1)
+
+def select_segments(segments: list, title: str, budget: int) -> list:
+    """점수가 높은 항목부터 budget 토큰까지 고르고, 원래 순서대로 되돌려 반환합니다."""
+    title_words = {word for word in re.findall(r'[가-힣A-Za-z0-9]{2,}', title or "")}
+    ranked = sorted(range(len(segments)), key=lambda i: _segment_score(segments[i], i, title_words), reverse=True)
+    chosen, used = set(), 0
+    for i in ranked:
+        tokens = estimate_tokens(segments[i]) + 1  # 항목을 잇는 줄바꿈 몫
+        if used + tokens > budget:
+            continue
+        chosen.add(i)
+        used += tokens
+    return [segments[i] for i in sorted(chosen)]
+
+# ▼ map-reduce 1단계 프롬프트: 긴 본문 조각에서 요약에 필요한 사실만 뽑습니다.
+SUMMARY_MAP_SYSTEM_PROMPT = """당신은 부경대학교 공지사항을 정리하는 조교입니다.
+사용자 메시지의 '공지 일부'에서 지원 자격, 혜택, 일정/기간, 신청 방법, 문의처, 핵심 내용을 빠짐없이 짧은 문장으로 뽑아주세요.
+원문에 없는 내용은 만들지 않습니다.
+
+### 출력 형식 (Key-Value JSON 형식)
+{"points": ["핵심 사실 1", "핵심 사실 2"]}
+"""
+
+async def _map_reduce_segments(segments: list, title: str) -> list:
+    """
+    너무 긴 본문을 SUMMARY_CHUNK_TOKENS 단위 조각으로 나눠 동시에 핵심 사실을 뽑습니다. (map 단계)
+    조각 수는 SUMMARY_MAP_MAX_CHUNKS 로 제한하여 입력 크기와 관계없이 지연 시간이 일정하도록 합니다.
+    """
+    segments = select_segments(segments, title, SUMMARY_CHUNK_TOKENS * SUMMARY_MAP_MAX_CHUNKS)
+    chunks, current, used = [], [], 0
+    for segment in segments:
+        tokens = estimate_tokens(segment)
+        if current and used + tokens > SUMMARY_CHUNK_TOKENS:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(segment)
+        used += tokens
+    if current:
+        chunks.append(current)
+    chunks = chunks[:SUMMARY_MAP_MAX_CHUNKS]
+
+    async def map_chunk(chunk: list) -> list:
+        try:
+            result = await request_json_completion(
+                "공지 조각 정리", SUMMARY_MAP_SYSTEM_PROMPT,
+                f"### 공지 제목\n{title}\n\n### 공지 일부\n" + "\n".join(chunk), temperature=0.0, max_tokens=400)
+            return [str(point) for point in result.get("points", []) if point]
+        except Exception as e:
+            logging.error(f"❌ 공지 조각 정리 오류 (원문 일부로 대체): {e}")
+            return select_segments(chunk, title, SUMMARY_CHUNK_TOKENS // 6)
+
+    mapped = await asyncio.gather(*(map_chunk(chunk) for chunk in chunks))
+    return [point for points in mapped for point in points]
+
+async def prepare_summary_input(text: str, title: str) -> str:
+    """
+    요약 요청에 넣을 본문을 SUMMARY_INPUT_TOKEN_BUDGET 토큰 안으로 줄입니다.
+    중복/상용구 제거 → (예산 초과 시) 중요 항목 선별 → (SUMMARY_MAP_REDUCE_THRESHOLD 초과 시) map-reduce
+    """
+    original_tokens = estimate_tokens(text)
+    segments, duplicates, boilerplate = _clean_segments(text)
+    cleaned = "\n".join(segments)
+    cleaned_tokens = estimate_tokens(cleaned)
+
+    if cleaned_tokens > SUMMARY_INPUT_TOKEN_BUDGET:
+        # 예산의 1/6 보다 큰 항목은 문장 단위로 나눠 두어야 선별 시 통째로 빠지지 않습니다.
+        segments = split_oversized_segments(segments, max(1, SUMMARY_INPUT_TOKEN_BUDGET // 6))
+
+    if cleaned_tokens <= SUMMARY_INPUT_TOKEN_BUDGET:
+        strategy, prepared = "그대로", cleaned
+    elif cleaned_tokens <= SUMMARY_MAP_REDUCE_THRESHOLD:
+        strategy, prepared = "선별", "\n".join(select_segments(segments, title, SUMMARY_INPUT_TOKEN_BUDGET))
+    else:
+        strategy = "map-reduce"
+        points = await _map_reduce_segments(segments, title)
+        prepared = "\n".join(select_segments(points, title, SUMMARY_INPUT_TOKEN_BUDGET))
+
+    logging.info(f"📏 요약 입력 [{title}] 원문 {original_tokens} → {estimate_tokens(prepared)} 토큰 "
+                 f"(중복 {duplicates}줄, 상용구 {boilerplate}줄 제거, 방식: {strategy})")
+    return prepared or truncate_to_tokens(text, SUMMARY_INPUT_TOKEN_BUDGET)
+
 ################################################################################
 #                                 콘텐츠 파싱 및 요약 함수                           #
 ################################################################################
-async def get_school_notices(category: str = "") -> list:
-    # ... 기존 공지사항 파싱 코드 (변경 없음)
+async def refresh_notice_archive(category: str = "", pages: int = 1,
+                                 max_age: float = NOTICE_ARCHIVE_STALE_SECONDS) -> int:
+    """
+    카테고리의 게시판 목록을 pages 페이지까지 읽어 공지 아카이브에 저장합니다.
+    마지막 갱신 후 max_age 초가 지나지 않았으면 요청하지 않습니다. 새로 보관된 공지 수를 반환합니다.
+    """
+    if not notice_archive.is_stale(category, max_age):
+        return 0
+    added = 0
+    for page in range(1, pages + 1):
+        html_content = await fetch_url(notice_page_url(page, category))
+        if not html_content:
+            break
+        notices = [notice for notice, _ in _iter_notice_rows(html_content)]
+        if not notices:
+            break
+        added += notice_archive.add_many(notices, category)
+        search_index.add_many("notices", [_notice_search_doc(notice) for notice in notices])
+        if page == 1:
+            notice_archive.mark_refreshed(category)
+    return added
+
+async def refresh_notice_categories() -> bool:
+    """
+    카테고리별 게시판을 읽어 아카이브의 카테고리 인덱스를 채웁니다. (스케줄러용)
+    전체 게시판은 새 공지 확인에서 이미 보관하므로, 아카이브에 처음 들어온 공지가 있을 때만 True 입니다.
+    """
+    added = 0
+    if notice_archive.is_empty():
+        # 로컬 아카이브가 비어 있으면(새 환경, 파일 삭제) 전체 게시판을 여러 페이지 읽어 다시 채웁니다.
+        added += await refresh_notice_archive("", NOTICE_ARCHIVE_SEED_PAGES, max_age=0)
+    for code in CATEGORY_CODES.values():
+        if code:
+            added += await refresh_notice_archive(code, NOTICE_CATEGORY_REFRESH_PAGES, max_age=0)
+    logging.info(f"공지 카테고리 인덱스를 갱신했습니다. (새로 보관 {added}건, {notice_archive.stats()})")
+    return added > 0
+
+def _notice_sort_key(notice: tuple) -> datetime:
+    return datetime.strptime(notice[3], "%Y.%m.%d") if re.match(r'\d{4}\.\d{2}\.\d{2}', notice[3]) else datetime.min
+
+_LXML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+def _lxml_document(html_content: str):
+    """lxml 로 HTML을 파싱합니다. (인코딩 선언이 있는 문서도 처리되도록 UTF-8 바이트로 전달)"""
+    return lxml.html.fromstring(html_content.encode("utf-8"), parser=_LXML_PARSER)
+
+def _has_class(*classes: str) -> str:
+    """CSS 클래스 선택자에 해당하는 XPath 조건식"""
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in classes)
+
+def _lxml_strings(element):
+    """BeautifulSoup 과 같이 주석, script/style 을 제외한 텍스트 조각을 문서 순서대로 내보냅니다."""
+    if isinstance(element.tag, str) and element.tag not in ("script", "style"):
+        if element.text:
+            yield element.text
+        for child in element:
+            yield from _lxml_strings(child)
+            if child.tail:
+                yield child.tail
+
+def _lxml_text(element, separator: str = "") -> str:
+    """BeautifulSoup 의 get_text(separator=..., strip=True) 와 같은 결과"""
+    return separator.join(piece.strip() for piece in _lxml_strings(element) if piece.strip())
+
+def _notice_row(title: str, href: str, department: str, date_: str, row_classes: list, num_text: str | None) -> tuple:
+    if href.startswith("/"): href = BASE_URL + href
+    elif href.startswith("?"): href = f"{BASE_URL}/main/163{href}"
+    # 상단 고정 공지는 번호 칸에 숫자 대신 '공지' 등이 표시됩니다.
+    pinned = "notice" in row_classes or (num_text is not None and not num_text.isdigit())
+    return (title, href, department, date_), pinned
+
+def _iter_notice_rows_bs4(html_content: str) -> list:
+    soup = BeautifulSoup(html_content, 'html.parser')
+    rows = []
+    for tr in soup.select("tbody > tr"):
+        if "글이 없습니다" in tr.text: continue
+        title_td = tr.select_one("td.bdlTitle a")
+        if not title_td: continue
+        num_td = tr.select_one("td.bdlNum")
+        rows.append(_notice_row(
+            title_td.get_text(strip=True), title_td.get("href"),
+            tr.select_one("td.bdlUser").get_text(strip=True), tr.select_one("td.bdlDate").get_text(strip=True),
+            tr.get("class") or [], num_td.get_text(strip=True) if num_td is not None else None))
+    return rows
+
+def _iter_notice_rows_lxml(html_content: str) -> list:
+    """<tbody> 영역만 잘라 lxml 로 파싱합니다."""
+    start = html_content.find("<tbody")
+    end = html_content.find("</tbody>", start)
+    if start == -1 or end == -1:
+        return []
+    table = lxml.html.fragment_fromstring("<table>" + html_content[start:end + len("</tbody>")] + "</table>")
+    rows = []
+    for tr in table.xpath("./tbody/tr"):
+        if "글이 없습니다" in tr.text_content(): continue
+        links = tr.xpath(f".//td[{_has_class('bdlTitle')}]//a")
+        if not links: continue
+        cell = lambda cls: tr.xpath(f".//td[{_has_class(cls)}]")
+        num_td = cell("bdlNum")
+        rows.append(_notice_row(
+            _lxml_text(links[0]), links[0].get("href"),
+            _lxml_text(cell("bdlUser")[0]), _lxml_text(cell("bdlDate")[0]),
+            (tr.get("class") or "").split(), _lxml_text(num_td[0]) if num_td else None))
+    return rows
+
+def _iter_notice_rows(html_content: str) -> list:
+    """공지사항 목록 HTML을 게시판 순서대로 (공지 튜플, 상단고정 여부) 목록으로 파싱합니다."""
+    if HTML_PARSER_BACKEND == "bs4":
+        return _iter_notice_rows_bs4(html_content)
+    return _iter_notice_rows_lxml(html_content)
+
+def parse_school_notices(html_content: str) -> list:
+    """공지사항 목록 HTML을 (제목, 링크, 부서, 날짜) 튜플 목록으로 파싱합니다. (최신순 정렬)"""
     try:
-        category_url = f"{URL}?cd={category}" if category else URL
-        html_content = await fetch_url(category_url)
-        if not html_content: return []
-        soup = BeautifulSoup(html_content, 'html.parser')
-        notices = []
-        for tr in soup.select("tbody > tr"):
-            if "글이 없습니다" in tr.text: continue
-            title_td = tr.select_one("td.bdlTitle a")
-            if not title_td: continue
-            title = title_td.get_text(strip=True)
-            href = title_td.get("href")
-            if href.startswith("/"): href = BASE_URL + href
-            elif href.startswith("?"): href = f"{BASE_URL}/main/163{href}"
-            department = tr.select_one("td.bdlUser").get_text(strip=True)
-            date_ = tr.select_one("td.bdlDate").get_text(strip=True)
-            notices.append((title, href, department, date_))
-        notices.sort(key=lambda x: datetime.strptime(x[3], "%Y.%m.%d") if re.match(r'\d{4}\.\d{2}\.\d{2}', x[3]) else datetime.min, reverse=True)
+        notices = [notice for notice, _ in _iter_notice_rows(html_content)]
+        notices.sort(key=_notice_sort_key, reverse=True)
         return notices
     except Exception as e:
         logging.exception(f"❌ 공지사항 파싱 중 오류 발생: {e}")
         return []
 
-async def summarize_text(text: str, original_title: str, user_id: str = None) -> dict:
+def notice_page_url(page: int, category: str = "") -> str:
+    params = {}
+    if category:
+        params["cd"] = category
+    if page > 1:
+        params[NOTICE_PAGE_PARAM] = page
+    return f"{URL}?{urllib.parse.urlencode(params)}" if params else URL
+
+async def crawl_new_school_notices(seen, first_page_html: str, backfill: bool = False) -> list:
     """
-    공지사항 원문과 원본 제목을 받아, 정제된 제목과 AI 요약문을 포함한 딕셔너리를 반환하는 고도화된 함수.
-    (사용자 ID를 받아 개인화된 분석 관점을 적용)
+    공지사항 게시판을 1페이지부터 차례로 읽으며 캐시에 없는 공지를 모읍니다.
+    (상단 고정 공지를 제외하고) 이미 본 공지가 NOTICE_SEEN_RUN_STOP 개 연속으로 나오면 중단하므로,
+    평소에는 1페이지만 읽습니다. 2페이지부터는 NOTICE_CRAWL_PREFETCH 개 페이지를 미리 동시에 요청합니다.
+    backfill=True 이면 복구용으로 최대 NOTICE_BACKFILL_PAGES 페이지까지 읽습니다.
+    읽은 페이지의 공지는 이미 본 것까지 모두 공지 아카이브에 저장합니다.
+    반환값: [(캐시 키, 공지 튜플), ...] (최신순)
     """
-    if not text or not text.strip():
-        return {"refined_title": original_title, "summary_body": "요약할 수 없는 공지입니다."}
-
-    # 기본 분석 관점
-    analysis_viewpoint = """
+    max_pages = NOTICE_BACKFILL_PAGES if backfill else NOTICE_MAX_PAGES
+    new_notices, visited_keys = [], set()
+    seen_run = 0
+    prefetched = {}
+    html_content = first_page_html
+    page = 1
+    try:
+        while page <= max_pages:
+            if html_content is None:
+                for next_page in range(page, min(page + NOTICE_CRAWL_PREFETCH, max_pages + 1)):
+                    if next_page not in prefetched:
+                        prefetched[next_page] = asyncio.create_task(fetch_url(notice_page_url(next_page)))
+                html_content = await prefetched.pop(page)
+                if not html_content:
+                    break
+
+            rows = _iter_notice_rows(html_content)
+            if page > 1:
+                # 상단 고정 공지는 모든 페이지에 다시 나오므로 1페이지에서만 처리합니다.
+                rows = [(notice, pinned) for notice, pinned in rows if not pinned]
+            notice_archive.add_many([notice for notice, _ in rows])
+            search_index.add_many("notices", [_notice_search_doc(notice) for notice, _ in rows])
+            regular_count = 0
+            for notice, pinned in rows:
+                # 링크의 pageIndex 는 공지가 다음 페이지로 밀리면 바뀌므로 게시글 번호로 찾고,
+                # 번호 키 도입 전에 기록된 제목+링크 키도 이미 본 것으로 인정합니다.
+                key = notice_archive_key(notice)
+                if key in visited_keys:
+                    continue
+                visited_keys.add(key)
+                if not pinned:
+                    regular_count += 1
+                if key not in seen and generate_cache_key(notice[0], notice[1]) not in seen:
+                    new_notices.append((key, notice))
+                    seen_run = 0
+                elif not pinned:
+                    seen_run += 1
+
+            if seen_run >= NOTICE_SEEN_RUN_STOP or regular_count == 0:
+                break
+            logging.info(f"공지사항 {page}페이지에서 이미 본 공지를 충분히 찾지 못해 다음 페이지를 확인합니다.")
+            page += 1
+            html_content = None
+    finally:
+        for task in prefetched.values():
+            task.cancel()
+
+    new_notices.sort(key=lambda item: _notice_sort_key(item[1]), reverse=True)
+    return new_notices
+
+DEFAULT_ANALYSIS_VIEWPOINT = """
     - <b>대상:</b> 모든 부경대학교 학부생
     - <b>핵심 평가 기준:</b>
         1. <b>혜택의 보편성:</b> 얼마나 많은 학생에게 실질적인 이득(장학금, 경력, 경험 등)이 되는가?
@@ -295,57 +1983,74 @@ async def summarize_text(text: str, original_title: str, user_id: str = None) ->
         3. <b>시의성 및 중요도:</b> 등록금, 수강신청 등 다수의 학생에게 영향을 미치는 중요한 학사일정인가?
     """
 
-    # 개인화 설정이 켜져 있고, 사용자 ID가 있는 경우 분석 관점을 동적으로 생성
-    if user_id:
-        user_settings = ALLOWED_USERS.get(user_id, {}).get("personalization", {})
-        if user_settings.get("enabled"):
-            profile_parts = []
-            criteria_parts = []
-
-            # 프로필 조합
-            selected_grade = user_settings.get("학년", "전체학년")
-            if selected_grade != "전체학년":
-                profile_parts.append(selected_grade)
+# 관심분야별 평가 기준 (딕셔너리 순서가 곧 분석 관점에 표시되는 순서)
+INTEREST_CRITERIA = {
+    "취업": "채용, 인턴 등 취업 준비와의 직접적인 연관성", "채용": "채용 공고와의 직접적인 연관성",
+    "인턴": "인턴십 기회 제공 여부", "현장실습": "현장실습 기회 제공 여부",
+    "장학금": "장학금 수혜 가능성 및 금액", "등록금": "등록금 관련 중요 안내",
+    "공모전": "수상 경력 및 스펙 획득 가능성", "경진대회": "경진대회 참여 기회", "대외활동": "새로운 경험 및 인맥 형성 기회",
+    "특강": "관심 분야 지식 및 역량 강화 기회", "워크숍": "실습 중심의 역량 강화 기회", "교내활동": "교내 행사 및 활동 참여 기회",
+    "학사일정": "졸업, 수강신청 등 필수 학업 일정과의 관련성", "수강신청": "수강신청 관련 중요 안내", "졸업": "졸업 요건 및 절차 관련성",
+    "창업": "창업 지원 및 아이디어 실현 기회", "상담": "진로, 심리 등 상담 프로그램 제공 여부",
+    "봉사": "봉사활동 시간 인정 및 참여 기회", "자격증": "자격증 취득 지원 여부",
+    "대학원": "대학원 진학 및 연구 관련 정보"
+}
 
-            selected_dept = user_settings.get("전공학과", "전체학과")
-            if selected_dept != "전체학과":
-                profile_parts.append(selected_dept)
+def profile_signature(user_id: str = None) -> tuple | None:
+    """
+    사용자의 개인화 설정을 분석 관점에 영향을 주는 값만 남긴 정규화된 튜플로 반환합니다.
+    같은 서명을 가진 사용자는 같은 요약을 공유하며, 개인화를 쓰지 않으면 None(기본 요약)입니다.
+    """
+    if not user_id:
+        return None
+    user_settings = ALLOWED_USERS.get(str(user_id), {}).get("personalization", {})
+    if not user_settings.get("enabled"):
+        return None
+    selected_interests = user_settings.get("관심분야", [])
+    # 관심분야는 순서와 중복, 평가 기준이 없는 항목을 무시합니다. (선택 없음은 None으로 구분)
+    interests = tuple(i for i in INTEREST_CRITERIA if i in selected_interests) if selected_interests else None
+    return (user_settings.get("학년", "전체학년"), user_settings.get("전공학과", "전체학과"), interests)
+
+def group_by_profile(user_ids: list) -> dict:
+    """사용자 목록을 프로필 서명별로 묶어 {서명: [user_id, ...]} 형태로 반환합니다."""
+    groups = {}
+    for user_id in user_ids:
+        groups.setdefault(profile_signature(user_id), []).append(user_id)
+    return groups
+
+def viewpoint_for_profile(signature: tuple | None) -> str:
+    """프로필 서명으로부터 요약 프롬프트에 들어갈 '분석 관점'을 생성합니다."""
+    if signature is None:
+        return DEFAULT_ANALYSIS_VIEWPOINT
+    selected_grade, selected_dept, interests = signature
+
+    # 프로필 조합
+    profile_parts = [part for part, default in ((selected_grade, "전체학년"), (selected_dept, "전체학과")) if part != default]
+    target_audience = " ".join(profile_parts) if profile_parts else "모든 부경대 학생"
+
+    # 관심분야에 따라 평가 기준 추가
+    if interests is None:
+        criteria_parts = ["일반적인 학업 및 교내 활동에 대한 중요도"]
+    else:
+        criteria_parts = [INTEREST_CRITERIA[interest] for interest in interests]
 
-            # 관심분야에 따라 평가 기준 추가
-            selected_interests = user_settings.get("관심분야", [])
-            if not selected_interests:
-                 criteria_parts.append("일반적인 학업 및 교내 활동에 대한 중요도")
-            else:
-                criteria_map = {
-                    "취업": "채용, 인턴 등 취업 준비와의 직접적인 연관성", "채용": "채용 공고와의 직접적인 연관성",
-                    "인턴": "인턴십 기회 제공 여부", "현장실습": "현장실습 기회 제공 여부",
-                    "장학금": "장학금 수혜 가능성 및 금액", "등록금": "등록금 관련 중요 안내",
-                    "공모전": "수상 경력 및 스펙 획득 가능성", "경진대회": "경진대회 참여 기회", "대외활동": "새로운 경험 및 인맥 형성 기회",
-                    "특강": "관심 분야 지식 및 역량 강화 기회", "워크숍": "실습 중심의 역량 강화 기회", "교내활동": "교내 행사 및 활동 참여 기회",
-                    "학사일정": "졸업, 수강신청 등 필수 학업 일정과의 관련성", "수강신청": "수강신청 관련 중요 안내", "졸업": "졸업 요건 및 절차 관련성",
-                    "창업": "창업 지원 및 아이디어 실현 기회", "상담": "진로, 심리 등 상담 프로그램 제공 여부",
-                    "봉사": "봉사활동 시간 인정 및 참여 기회", "자격증": "자격증 취득 지원 여부",
-                    "대학원": "대학원 진학 및 연구 관련 정보"
-                }
-                for interest in selected_interests:
-                    if interest in criteria_map:
-                        criteria_parts.append(criteria_map[interest])
-
-            target_audience = " ".join(profile_parts) if profile_parts else "모든 부경대 학생"
-            
-            # 최종 analysis_viewpoint 생성
-            analysis_viewpoint = (
-                f"- <b>대상:</b> {target_audience}의 관점에서 분석\n"
-                f"- <b>핵심 평가 기준:</b>\n"
-                + "\n".join([f"    {i+1}. <b>{part}</b>" for i, part in enumerate(criteria_parts)])
-            )
+    return (
+        f"- <b>대상:</b> {target_audience}의 관점에서 분석\n"
+        f"- <b>핵심 평가 기준:</b>\n"
+        + "\n".join([f"    {i+1}. <b>{part}</b>" for i, part in enumerate(criteria_parts)])
+    )
 
-    prompt = f"""
-당신은 부경대학교 학생들을 위한 똑똑한 AI 조교입니다.
-아래 '분석 관점'과 '작업 규칙'에 따라 '공지사항 원문'을 분석하고, 지정된 '출력 형식'으로만 요약해주세요.
+def build_analysis_viewpoint(user_id: str = None) -> str:
+    """
+    요약 프롬프트에 들어갈 '분석 관점'을 생성합니다.
+    (개인화 설정이 켜진 사용자는 학년/전공학과/관심분야에 맞춘 관점을 사용)
+    """
+    return viewpoint_for_profile(profile_signature(user_id))
 
-### 분석 관점
-{analysis_viewpoint}
+# ▼ 공지 요약 시스템 프롬프트. 모든 호출에서 바이트 단위로 동일해야 OpenAI 프롬프트 캐시(접두사 캐시)가 적중하므로
+#   사용자마다 달라지는 분석 관점과 공지 원문은 사용자 메시지에 넣습니다.
+NOTICE_SUMMARY_SYSTEM_PROMPT = """당신은 부경대학교 학생들을 위한 똑똑한 AI 조교입니다.
+사용자 메시지의 '분석 관점'과 아래 '작업 규칙'에 따라 '공지사항 원문'을 분석하고, 지정된 '출력 형식'으로만 요약해주세요.
 
 ### 작업 규칙 (매우 중요)
 1.  **제목 정제:** '공지사항 원본 제목'에서 날짜, 이모지, 부서명 등 불필요한 수식어는 제거하고 핵심 내용만 남겨 간결한 제목으로 만든다.
@@ -367,144 +2072,518 @@ async def summarize_text(text: str, original_title: str, user_id: str = None) ->
     - [주요학과] #기계공학과 #컴퓨터공학과 #IT융합응용공학과 #데이터정보과학부 #경영학과
 
 ### 출력 형식 (Key-Value JSON 형식)
-{{
+{
     "refined_title": "AI가 정제한 새로운 공지 제목",
     "summary_body": "<b>⭐⭐⭐(여기 별 개수를 수정) 한 줄 요약</b>\\n- *평가 근거: 명사형 키워드 나열*\\n\\n<b>📋 핵심 정보</b>\\n- <b>지원 자격:</b> ...\\n- <b>주요 혜택:</b> ...\\n- <b>모집/운영 기간:</b> ...\\n- <b>신청 방법:</b> ...\\n- <b>문의처:</b> ...\\n\\n<b>🚀 추천 액션</b>\\n- ...\\n\\n<b>#️⃣ 관련 태그</b>\\n- ..."
-}}
+}
 """
+
+# ▼ compact 방식 공지 요약 프롬프트. 세부 항목은 extract_notice_facts 가 채우므로 AI는 제목/별점/한 줄 요약만 작성
+NOTICE_COMPACT_SYSTEM_PROMPT = """당신은 부경대학교 학생들을 위한 똑똑한 AI 조교입니다.
+일정, 대상, 문의처 등 세부 항목은 별도로 추출하므로, 사용자 메시지의 '분석 관점'과 아래 '작업 규칙'에 따라 '공지사항 원문'의 제목, 중요도, 한 줄 요약만 지정된 '출력 형식'으로 작성해주세요.
+
+### 작업 규칙 (매우 중요)
+1.  **제목 정제:** '공지사항 원본 제목'에서 날짜, 이모지, 부서명 등 불필요한 수식어는 제거하고 핵심 내용만 남겨 간결한 제목으로 만든다.
+2.  **중요도 평가 보정 (5점 척도):** 아래의 엄격한 기준에 따라 중요도를 1에서 5까지의 정수로 평가한다.
+    - 5 (필수/긴급): 수강신청, 등록금, 성적, 졸업 등 **모든 학생의 학사에 직접적이고 긴급한 영향을 미치는 공지.**
+    - 4 (강력 추천): 전체 대상 주요 장학금, 대규모 채용/공모전 등 **놓치면 매우 아쉬운 핵심 기회.**
+    - 3 (확인 권장): 특정 단과대/학과 대상의 중요 공지, 유용한 특강, 인기 비교과 프로그램 등.
+    - 2 (관심 시 확인): 소수 대상 행사, 동아리 모집, 일반적인 대외활동 등.
+    - 1 (참고): 단순 정보 공지, 시설 안내, 홍보 등.
+3.  **평가 근거 형식:** '평가 근거'는 완전한 문장이 아닌, '전체 학생 대상, 성적 장학금, 높은 중요도' 와 같이 **핵심 키워드를 명사형으로 나열**하여 간결하게 제시한다.
+4.  **한 줄 요약:** 공지의 핵심을 40자 이내의 한 문장으로 요약한다.
+
+### 출력 형식 (Key-Value JSON 형식)
+{
+    "refined_title": "AI가 정제한 새로운 공지 제목",
+    "rating": 3,
+    "one_line": "한 줄 요약",
+    "reason": "명사형 키워드 나열"
+}
+"""
+
+SUMMARY_ERROR_MESSAGE = "요약 중 오류가 발생했습니다."
+
+def _summary_mode_marker(viewpoint: str) -> str:
+    """요약 방식이 바뀌면 캐시 키도 달라지도록 분석 관점 앞에 방식 표시를 붙입니다."""
+    return viewpoint if SUMMARY_MODE == "full" else f"[{SUMMARY_MODE}]\x1f{viewpoint}"
+
+def _notice_summary_key(text: str, title: str, analysis_viewpoint: str) -> str:
+    return summary_cache.make_key(text, title, SUMMARY_MODEL, _summary_mode_marker(analysis_viewpoint))
+
+def _is_complete_summary(result: dict | None) -> bool:
+    """AI 응답에 현재 요약 방식에서 필요한 항목이 들어 있는지 확인합니다."""
+    return bool(result) and bool(result.get("summary_body") if SUMMARY_MODE == "full" else result.get("one_line"))
+
+def _finalize_notice_summary(result: dict, text: str, title: str) -> dict:
+    """AI 응답을 최종 요약 딕셔너리로 만듭니다. (compact 방식은 규칙 추출 결과와 합쳐 본문을 구성)"""
+    refined_title = result.get("refined_title") or title
+    if SUMMARY_MODE == "full":
+        return {"refined_title": refined_title,
+                "summary_body": re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', result.get("summary_body", ""))}
+    facts = extract_notice_facts(text, title)
+    return {"refined_title": refined_title,
+            "summary_body": render_rule_summary(facts, result.get("rating"), result.get("one_line", ""), result.get("reason", ""))}
+
+async def summarize_text(text: str, original_title: str, user_id: str = None) -> dict:
+    """
+    공지사항 원문과 원본 제목을 받아, 정제된 제목과 AI 요약문을 포함한 딕셔너리를 반환하는 고도화된 함수.
+    (사용자 ID를 받아 개인화된 분석 관점을 적용)
+    """
+    if not text or not text.strip():
+        return {"refined_title": original_title, "summary_body": "요약할 수 없는 공지입니다."}
+    if SUMMARY_MODE == "compact" and SUMMARY_SKIP_LOW_VALUE and is_low_value_notice(original_title):
+        logging.info(f"저가치 공지로 분류되어 AI 호출 없이 규칙 기반으로 요약합니다: {original_title}")
+        facts = extract_notice_facts(text, original_title)
+        return {"refined_title": original_title,
+                "summary_body": render_rule_summary(facts, 1, original_title, "단순 정보 안내")}
+
+    analysis_viewpoint = build_analysis_viewpoint(user_id)
+    cache_key = _notice_summary_key(text, original_title, analysis_viewpoint)
+    cached = summary_cache.get(cache_key)
+    if cached:
+        logging.info(f"요약 캐시 적중: {original_title}")
+        return cached
+    # 같은 프로필의 요약이 이미 진행 중이면 그 결과를 함께 사용합니다.
+    result = await summary_cache.singleflight(
+        cache_key, lambda: _request_text_summary(text, original_title, analysis_viewpoint, cache_key))
+    return dict(result)
+
+async def _request_text_summary(text: str, original_title: str, analysis_viewpoint: str, cache_key: str) -> dict:
+    """summarize_text의 실제 OpenAI 호출부. 성공한 결과만 캐시에 저장합니다."""
     try:
-        response = await aclient.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": f"### 공지사항 원본 제목\n{original_title}\n\n### 공지사항 원문\n{text}"}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.1,
-            max_tokens=1500
+        user_content = (
+            f"### 분석 관점\n{analysis_viewpoint.strip()}\n\n"
+            f"### 공지사항 원본 제목\n{original_title}\n\n"
+            f"### 공지사항 원문\n{await prepare_summary_input(text, original_title)}"
         )
-        result = json.loads(response.choices[0].message.content)
-        result["summary_body"] = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', result.get("summary_body", ""))
+        if SUMMARY_MODE == "full":
+            response = await request_json_completion(
+                "공지 요약", NOTICE_SUMMARY_SYSTEM_PROMPT, user_content, temperature=0.1, max_tokens=1500)
+        else:
+            response = await request_json_completion(
+                "공지 요약(compact)", NOTICE_COMPACT_SYSTEM_PROMPT, user_content, temperature=0.1, max_tokens=300)
+        result = _finalize_notice_summary(response, text, original_title)
+        summary_cache.put(cache_key, result)
         return result
     except Exception as e:
         logging.error(f"❌ OpenAI API 요약 오류: {e}", exc_info=True)
-        return {"refined_title": original_title, "summary_body": "요약 중 오류가 발생했습니다."}
+        return {"refined_title": original_title, "summary_body": SUMMARY_ERROR_MESSAGE}
+
+async def warm_notice_summaries(items: list, user_id: str = None) -> int:
+    """
+    백로그용 배치 요약. [(원문, 원본 제목)] 중 캐시에 없는 공지를 SUMMARY_BATCH_SIZE 개씩 묶어 요약하고
+    summarize_text 와 같은 캐시 키로 저장합니다. 응답에서 빠진 공지는 이후 단건 요약으로 처리됩니다.
+    """
+    analysis_viewpoint = build_analysis_viewpoint(user_id)
+    pending = {}
+    for text, title in items:
+        if not text or not text.strip() or len(text) > SUMMARY_BATCH_MAX_INPUT_CHARS:
+            continue
+        if SUMMARY_MODE == "compact" and SUMMARY_SKIP_LOW_VALUE and is_low_value_notice(title):
+            continue
+        cache_key = _notice_summary_key(text, title, analysis_viewpoint)
+        if not summary_cache.has(cache_key):
+            pending[cache_key] = (text, title)
+    pending = list(pending.items())
+    chunks = [pending[i:i + SUMMARY_BATCH_SIZE] for i in range(0, len(pending), SUMMARY_BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(NOTICE_SUMMARY_CONCURRENCY)
+
+    async def summarize_chunk(chunk: list) -> int:
+        async with semaphore:
+            bodies = [await prepare_summary_input(text, title) for _, (text, title) in chunk]
+            entries = [(str(i + 1), f"### 공지사항 원본 제목\n{title}\n\n### 공지사항 원문\n{body}")
+                       for i, ((_, (_, title)), body) in enumerate(zip(chunk, bodies))]
+            try:
+                results = await request_json_batch(
+                    "공지 배치 요약", NOTICE_SUMMARY_SYSTEM_PROMPT if SUMMARY_MODE == "full" else NOTICE_COMPACT_SYSTEM_PROMPT,
+                    entries, preamble=f"### 분석 관점\n{analysis_viewpoint.strip()}\n\n",
+                    max_tokens_per_item=1500 if SUMMARY_MODE == "full" else 300)
+            except Exception as e:
+                logging.error(f"❌ OpenAI API 배치 요약 오류 ({len(chunk)}건, 단건 요약으로 대체): {e}", exc_info=True)
+                return 0
+        warmed = 0
+        for i, (cache_key, (text, title)) in enumerate(chunk):
+            result = results.get(str(i + 1))
+            if not _is_complete_summary(result):
+                continue
+            summary_cache.put(cache_key, _finalize_notice_summary(result, text, title))
+            warmed += 1
+        return warmed
+
+    warmed = sum(await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks)))
+    if pending:
+        logging.info(f"📦 공지 배치 요약: {len(pending)}건을 {len(chunks)}회 요청으로 처리 (성공 {warmed}건)")
+    return warmed
         
-async def summarize_program_details(details: dict, original_title: str) -> dict:
+
+
+def _current_rss_mb() -> float:
+    """현재 프로세스의 상주 메모리(RSS)를 MB 단위로 반환합니다."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+# ▼ 아래 _ocr_worker_* 함수들은 OCR 프로세스 풀의 워커 프로세스 안에서 실행됩니다.
+_worker_ocr_reader = None
+
+def _ocr_worker_init(torch_threads: int) -> None:
+    """워커 프로세스 시작 시 EasyOCR 리더를 한 번 로딩합니다."""
+    global _worker_ocr_reader
+    import torch
+    import easyocr  # torch를 포함한 무거운 모듈이므로 워커 프로세스에서만 import
+    # 워커마다 모든 코어를 쓰지 않도록 torch 스레드 수를 나눠 줍니다.
+    torch.set_num_threads(torch_threads)
+    # verbose=False 옵션을 추가하여 불필요한 로그 출력을 비활성화합니다.
+    _worker_ocr_reader = easyocr.Reader(["ko", "en"], gpu=False, verbose=False)
+
+def _ocr_worker_stats() -> tuple:
+    """워커 프로세스의 PID와 RSS(MB)를 반환합니다. (로딩 지표 측정용)"""
+    return os.getpid(), _current_rss_mb()
+
+def _preprocess_ocr_image(image_bytes: bytes) -> list:
+    """
+    OCR 전에 이미지를 흑백으로 바꾸고, 너무 넓으면 OCR_MAX_WIDTH 로 축소하며,
+    세로로 긴 포스터는 OCR_TILE_HEIGHT 높이의 조각(겹침 OCR_TILE_OVERLAP)으로 나눕니다.
     """
-    파싱된 비교과 프로그램 상세 정보를 받아 AI로 재가공 및 요약하는 함수.
+    import cv2
+    import numpy as np
+
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:  # GIF 등 OpenCV가 읽지 못하는 형식은 Pillow로 디코딩
+        from PIL import Image
+        image = np.array(Image.open(io.BytesIO(image_bytes)).convert("L"))
+
+    height, width = image.shape[:2]
+    if width > OCR_MAX_WIDTH:
+        scale = OCR_MAX_WIDTH / width
+        image = cv2.resize(image, (OCR_MAX_WIDTH, int(height * scale)), interpolation=cv2.INTER_AREA)
+        height, width = image.shape[:2]
+
+    if height <= OCR_TILE_HEIGHT:
+        return [image]
+    step = OCR_TILE_HEIGHT - OCR_TILE_OVERLAP
+    return [image[top:top + OCR_TILE_HEIGHT] for top in range(0, height - OCR_TILE_OVERLAP, step)]
+
+def _ocr_worker_readtext(image_bytes: bytes) -> list:
+    """전처리된 이미지 조각마다 OCR을 수행하고 텍스트를 순서대로 합쳐 반환합니다."""
+    texts = []
+    for tile in _preprocess_ocr_image(image_bytes):
+        texts.extend(_worker_ocr_reader.readtext(tile, detail=0))
+    return texts
+
+
+class OcrEngine:
     """
-    # AI에게 전달할 정보를 문자열로 변환
-    input_text = "\n".join([f"- {key}: {value}" for key, value in details.items()])
+    EasyOCR 추론을 전용 프로세스 풀(OCR_WORKERS 개)에서 실행하는 관리자.
+    풀은 처음 필요할 때 만들고(동시 호출은 하나의 생성을 공유), OCR_IDLE_UNLOAD_SECONDS 동안
+    사용되지 않으면 워커를 종료해 모델 메모리를 돌려줍니다. 동시에 맡길 수 있는 작업은
+    워커 수 + OCR_QUEUE_SIZE 로 제한되며, 초과한 호출은 자리가 날 때까지 기다립니다.
+    """
+    def __init__(self, workers: int = OCR_WORKERS, queue_size: int = OCR_QUEUE_SIZE,
+                 idle_timeout: int = OCR_IDLE_UNLOAD_SECONDS):
+        self.workers = max(1, workers)
+        self.idle_timeout = idle_timeout
+        self._executor = None
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.workers + max(0, queue_size))
+        self._active = 0
+        self._last_used = 0.0
+        self._disabled_until = 0.0
+        self._idle_task = None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # 리눅스에서는 fork로 워커를 만들어 script.py 전체를 다시 import 하지 않도록 합니다.
+        mp_context = multiprocessing.get_context("fork") if sys.platform.startswith("linux") else None
+        torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=mp_context,
+                                   initializer=_ocr_worker_init, initargs=(torch_threads,))
+
+    async def _ensure_loaded(self):
+        async with self._lock:
+            if self._executor is not None:
+                return self._executor
+            if time.monotonic() < self._disabled_until:
+                return None
+            logging.info(f"EasyOCR 워커 {self.workers}개를 시작합니다... (최초 실행 시 시간이 걸릴 수 있습니다)")
+            started = time.perf_counter()
+            executor = self._create_executor()
+            try:
+                pid, worker_rss = await asyncio.get_running_loop().run_in_executor(executor, _ocr_worker_stats)
+            except Exception as e:
+                executor.shutdown(wait=False, cancel_futures=True)
+                logging.error(f"❌ EasyOCR 로딩 실패 ({OCR_LOAD_RETRY_SECONDS}초 후 재시도): {e}", exc_info=True)
+                self._disabled_until = time.monotonic() + OCR_LOAD_RETRY_SECONDS
+                return None
+            self._executor = executor
+            logging.info(f"✅ EasyOCR 로딩 완료! ({time.perf_counter() - started:.1f}s, "
+                         f"워커 PID {pid} RSS {worker_rss:.0f}MB, 메인 RSS {_current_rss_mb():.0f}MB)")
+            if self._idle_task is None or self._idle_task.done():
+                self._idle_task = asyncio.create_task(self._unload_when_idle())
+            return self._executor
+
+    def _shutdown_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _unload_when_idle(self) -> None:
+        while True:
+            await asyncio.sleep(min(60, self.idle_timeout))
+            if self._active or time.monotonic() - self._last_used < self.idle_timeout:
+                continue
+            async with self._lock:
+                if self._active or self._executor is None:
+                    continue
+                self._shutdown_executor()
+                gc.collect()
+                logging.info(f"💤 EasyOCR 워커를 종료했습니다. (메인 RSS {_current_rss_mb():.0f}MB)")
+                return
+
+    async def readtext(self, image_bytes: bytes) -> list | None:
+        """이미지에서 텍스트 목록을 추출합니다. OCR을 사용할 수 없으면 None"""
+        self._active += 1
+        try:
+            async with self._slots:
+                executor = await self._ensure_loaded()
+                if executor is None:
+                    return None
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(executor, _ocr_worker_readtext, image_bytes)
+                except BrokenProcessPool:
+                    logging.error("❌ OCR 워커가 비정상 종료되어 프로세스 풀을 다시 만듭니다.")
+                    async with self._lock:
+                        if self._executor is executor:
+                            self._shutdown_executor()
+                    return None
+        finally:
+            self._active -= 1
+            self._last_used = time.monotonic()
 
-    prompt = f"""
-당신은 부경대학교 학생들을 위한 똑똑한 AI 조교입니다.
-아래 '작업 규칙'에 따라 '비교과 프로그램 정보'를 분석하고, 지정된 '출력 형식'으로만 요약해주세요.
+    async def close(self) -> None:
+        if self._idle_task:
+            self._idle_task.cancel()
+        self._shutdown_executor()
 
-### 작업 규칙 (매우 중요)
-1.  **핵심 정보 요약:** '내용', '모집안내', '신청안내' 등 여러 항목에 흩어진 정보를 종합하여 가장 중요한 핵심 내용을 간결하게 요약한다.
-2.  **참여 대상 통합:** '참여대상'과 '모집안내'에 언급된 대상을 통합하여 최종 '참여 대상'을 명확하게 정리한다. 예를 들어 '참여대상: 1학년'과 '모집안내: 자유전공학부 학생'이라면, 최종적으로 '자유전공학부 1학년'으로 합쳐준다.
-3.  **중요도 평가 (5점 척도):** 아래 기준에 따라 중요도를 ⭐ 1개에서 5개까지로 평가한다.
-    - ⭐⭐⭐⭐⭐ (강력 추천): 대다수 학생에게 유용하며, 마일리지가 높거나 혜택이 매우 좋은 프로그램.
-    - ⭐⭐⭐⭐ (추천): 특정 단과대/학과 학생들에게 매우 유용한 핵심 전공 관련 프로그램.
-    - ⭐⭐⭐ (확인 권장): 참여하면 좋은 일반적인 교양, 특강, 학습법 관련 프로그램.
-    - ⭐⭐ (관심 시 확인): 소수 대상이거나 특정 관심 분야에만 해당되는 프로그램.
-    - ⭐ (참고): 단순 안내 또는 홍보성 프로그램.
-4.  **기간 포맷 정리:** '모집기간'과 '운영기간'의 날짜와 시간을 "YYYY.MM.DD HH:MM" 형식으로 통일하고, 시작일과 종료일이 같으면 날짜는 한 번만 표시한다. (예: "2025.09.12 16:30 ~ 20:30")
 
-### 비교과 프로그램 정보
-- 원본 제목: {original_title}
-{input_text}
+ocr_engine = OcrEngine()
 
-### 출력 형식 (Key-Value JSON 형식)
-{{
-    "refined_title": "AI가 정제한 새로운 프로그램 제목",
-    "summary_body": "<b>⭐⭐⭐(여기 별 개수를 수정) 한 줄 요약</b>\\n\\n<b>📋 핵심 정보</b>\\n- <b>모집기간:</b> (정리된 형식)\\n- <b>운영기간:</b> (정리된 형식)\\n- <b>참여 대상:</b> (통합된 대상)\\n- <b>주요 내용:</b> (핵심 내용 요약)\\n- <b>신청 방법:</b> ...",
-    "tags": "#비교과 #프로그램 #마일리지"
-}}
-"""
+def _image_phash(image_bytes: bytes) -> tuple:
+    """이미지의 (퍼셉추얼 해시 16진수 문자열, 'WxH' 크기)를 계산합니다. 디코딩할 수 없으면 (None, None)"""
     try:
-        response = await aclient.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": "위 규칙에 따라 비교과 프로그램 정보를 요약해주세요."}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.1,
-            max_tokens=1000
-        )
-        return json.loads(response.choices[0].message.content)
+        import imagehash
+        from PIL import Image
+        image = Image.open(io.BytesIO(image_bytes))
+        return str(imagehash.phash(image)), f"{image.width}x{image.height}"
     except Exception as e:
-        logging.error(f"❌ OpenAI API 프로그램 요약 오류: {e}", exc_info=True)
-        return {
-            "refined_title": original_title,
-            "summary_body": "AI 요약 중 오류가 발생했습니다.",
-            "tags": ""
-        }
+        logging.warning(f"이미지 퍼셉추얼 해시 계산 실패: {e}")
+        return None, None
 
 
-async def ocr_image_from_url(session: aiohttp.ClientSession, url: str) -> str:
+class OcrResultCache:
+    """
+    이미지 OCR 결과를 이미지 바이트의 SHA-256으로 저장하는 LRU 캐시.
+    정확히 같은 이미지가 없으면 크기가 같고 퍼셉추얼 해시의 해밍 거리가 OCR_PHASH_MAX_DISTANCE 이하인
+    이미지(재인코딩된 같은 포스터)의 결과를 재사용합니다. 퍼셉추얼 해시는 주로 레이아웃을 반영하므로
+    날짜/문구만 바뀐 같은 양식의 포스터를 잘못 맞히지 않도록 거리 기준을 작게 둡니다.
+    flush() 시점에 JSON 파일로 저장합니다.
+    """
+    def __init__(self, file_path: str, max_entries: int, max_distance: int):
+        self.file_path = file_path
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._entries = None
+        self._phashes = {}
+        self._dirty = False
+
+    def _load(self) -> OrderedDict:
+        if self._entries is None:
+            data = load_json_file(self.file_path)
+            self._entries = OrderedDict(sorted(data.items(), key=lambda item: item[1].get("ts", 0)))
+            # 크기 정보가 없는 이전 항목은 유사 일치에 사용하지 않습니다.
+            self._phashes = {digest: (int(entry["phash"], 16), entry["size"])
+                             for digest, entry in self._entries.items() if entry.get("phash") and entry.get("size")}
+        return self._entries
+
+    def get_exact(self, digest: str) -> str | None:
+        entries = self._load()
+        entry = entries.get(digest)
+        if entry is None:
+            return None
+        entries.move_to_end(digest)
+        self.hits += 1
+        return entry["text"]
+
+    def get_similar(self, phash: str, size: str) -> str | None:
+        entries = self._load()
+        target = int(phash, 16)
+        best_digest, best_distance = None, self.max_distance + 1
+        for digest, (value, entry_size) in self._phashes.items():
+            if entry_size != size:
+                continue
+            distance = (target ^ value).bit_count()
+            if distance < best_distance:
+                best_digest, best_distance = digest, distance
+        if best_digest is None:
+            self.misses += 1
+            return None
+        entries.move_to_end(best_digest)
+        self.similar_hits += 1
+        return entries[best_digest]["text"]
+
+    def put(self, digest: str, text: str, phash: str | None, size: str | None = None) -> None:
+        entries = self._load()
+        entries[digest] = {"text": text, "phash": phash, "size": size, "ts": time.time()}
+        entries.move_to_end(digest)
+        if phash and size:
+            self._phashes[digest] = (int(phash, 16), size)
+        while len(entries) > self.max_entries:
+            evicted, _ = entries.popitem(last=False)
+            self._phashes.pop(evicted, None)
+        self._dirty = True
+
+    def flush(self) -> None:
+        if self._dirty and self._entries is not None:
+            save_json_file(dict(self._entries), self.file_path)
+            self._dirty = False
+
+    def stats(self) -> str:
+        return f"OCR 캐시: 적중 {self.hits} / 유사 적중 {self.similar_hits} / 미스 {self.misses} (항목 {len(self._load())}개)"
+
+
+ocr_cache = OcrResultCache(OCR_CACHE_FILE, OCR_CACHE_MAX_ENTRIES, OCR_PHASH_MAX_DISTANCE)
+
+async def ocr_image_from_url(url: str) -> str:
     """URL에서 이미지를 비동기적으로 받아 OCR을 수행하고 텍스트를 반환합니다."""
-    if not ocr_reader:
-        logging.warning("OCR 리더가 초기화되지 않아 이미지 처리를 건너뜁니다.")
-        return ""
     try:
-        async with session.get(url) as response:
-            if response.status != 200:
-                logging.error(f"이미지 다운로드 실패: {url}, 상태 코드: {response.status}")
-                return ""
-            image_bytes = await response.read()
-
-            # EasyOCR의 readtext는 동기 함수이므로 asyncio.to_thread로 실행하여 이벤트 루프 블로킹 방지
-            result = await asyncio.to_thread(
-                ocr_reader.readtext, image_bytes, detail=0
-            )
+        response = await http_manager.fetch(url, as_bytes=True, raise_for_status=False, timeout=60)
+        if response.status != 200:
+            logging.error(f"이미지 다운로드 실패: {url}, 상태 코드: {response.status}")
+            return ""
+        image_bytes = response.body
+
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        cached_text = ocr_cache.get_exact(digest)
+        if cached_text is not None:
+            logging.info(f"OCR 캐시 적중: {url}")
+            return cached_text
+
+        phash, size = await asyncio.to_thread(_image_phash, image_bytes)
+        if phash:
+            similar_text = ocr_cache.get_similar(phash, size)
+            if similar_text is not None:
+                logging.info(f"OCR 캐시 유사 이미지 적중: {url}")
+                ocr_cache.put(digest, similar_text, phash, size)
+                return similar_text
+        else:
+            ocr_cache.misses += 1
+
+        result = await ocr_engine.readtext(image_bytes)
+        if result is None:
+            logging.warning("OCR 리더를 사용할 수 없어 이미지 처리를 건너뜁니다.")
+            return ""
 
-            logging.info(f"이미지 OCR 완료: {url}")
-            return " ".join(result)
+        logging.info(f"이미지 OCR 완료: {url}")
+        text = " ".join(result)
+        ocr_cache.put(digest, text, phash, size)
+        return text
     except Exception as e:
         logging.error(f"이미지 OCR 처리 중 오류 발생 {url}: {e}", exc_info=True)
         return ""
 
-async def extract_content(url: str, original_title: str, user_id: str = None) -> dict:
-    """
-    웹페이지 본문을 추출하고, 요약하여 정제된 제목, 요약 본문, 이미지 목록을 포함한 딕셔너리를 반환합니다.
-    (user_id를 summarize_text로 전달)
-    """
-    try:
-        html_content = await fetch_url(url)
-        if not html_content:
-            return {"refined_title": original_title, "summary_body": "페이지 내용을 불러올 수 없습니다.", "images": []}
-
+def parse_notice_body(html_content: str, url: str) -> tuple:
+    """공지 상세 페이지에서 본문(.bdvTxt_wrap) 텍스트와 이미지 URL 목록을 추출합니다."""
+    if HTML_PARSER_BACKEND == "bs4":
         soup = BeautifulSoup(html_content, "html.parser")
         container = soup.find("div", class_="bdvTxt_wrap") or soup
-        
         raw_text = " ".join(container.get_text(separator=" ", strip=True).split())
-        images = [urllib.parse.urljoin(url, img["src"]) for img in container.find_all("img") if img.get("src")]
-
-        text_to_summarize = raw_text
-        if (not raw_text or len(raw_text) < 100) and images:
-            logging.info(f"텍스트가 부족하여 이미지 OCR을 시도합니다: {url}")
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60)) as session:
-                tasks = [ocr_image_from_url(session, img_url) for img_url in images]
-                ocr_texts = await asyncio.gather(*tasks)
-            
-            full_ocr_text = "\n".join(filter(None, ocr_texts))
-            if full_ocr_text.strip():
-                text_to_summarize = full_ocr_text
-            else:
-                return {"refined_title": original_title, "summary_body": "이미지가 있으나 텍스트를 추출할 수 없었습니다.", "images": images}
+        sources = [img["src"] for img in container.find_all("img") if img.get("src")]
+    else:
+        # 본문 영역이 시작되는 <div 부터만 파싱하여 머리글/메뉴 파싱을 건너뜁니다.
+        marker = html_content.find("bdvTxt_wrap")
+        start = html_content.rfind("<div", 0, marker) if marker != -1 else -1
+        document = _lxml_document(html_content[start:] if start != -1 else html_content)
+        found = document.xpath(f"//div[{_has_class('bdvTxt_wrap')}]")
+        container = found[0] if found else document
+        raw_text = " ".join(_lxml_text(container, " ").split())
+        sources = [src for src in container.xpath(".//img/@src") if src]
+    return raw_text, [urllib.parse.urljoin(url, src) for src in sources]
+
+async def fetch_notice_content(url: str) -> dict:
+    """
+    공지 페이지를 가져와 요약할 본문과 이미지 목록을 추출합니다. (본문이 부족하면 이미지 OCR 수행)
+    반환값: {"text": 요약할 텍스트, "images": 이미지 URL 목록, "error": 실패 시 사용자에게 보여줄 문구}
+    """
+    html_content = await fetch_url(url)
+    if not html_content:
+        return {"text": "", "images": [], "error": "페이지 내용을 불러올 수 없습니다."}
+
+    raw_text, images = parse_notice_body(html_content, url)
 
-        # user_id를 전달하도록 수정
-        summary_dict = await summarize_text(text_to_summarize, original_title, user_id=user_id)
-        summary_dict["images"] = images
-        return summary_dict
+    text_to_summarize = raw_text
+    if (not raw_text or len(raw_text) < 100) and images:
+        logging.info(f"텍스트가 부족하여 이미지 OCR을 시도합니다: {url}")
+        tasks = [ocr_image_from_url(img_url) for img_url in images]
+        ocr_texts = await asyncio.gather(*tasks)
+
+        full_ocr_text = "\n".join(filter(None, ocr_texts))
+        if full_ocr_text.strip():
+            text_to_summarize = full_ocr_text
+        else:
+            return {"text": "", "images": images, "error": "이미지가 있으나 텍스트를 추출할 수 없었습니다."}
 
+    return {"text": text_to_summarize, "images": images, "error": None}
+
+async def summarize_notice_content(content: dict, original_title: str, user_id: str = None) -> dict:
+    """fetch_notice_content 결과를 요약하여 정제된 제목, 요약 본문, 이미지 목록을 담은 딕셔너리로 반환합니다."""
+    if content.get("error"):
+        return {"refined_title": original_title, "summary_body": content["error"], "images": content.get("images", [])}
+    summary_dict = await summarize_text(content["text"], original_title, user_id=user_id)
+    return {**summary_dict, "images": content.get("images", [])}
+
+def _stored_summary_version() -> str:
+    return f"{SUMMARY_MODEL}:{SUMMARY_MODE}"
+
+def store_notice_result(notice: tuple, content: dict, summary: dict = None) -> None:
+    """처리한 공지의 본문/이미지 목록과 기본 요약을 공지 아카이브에 저장합니다. (요약 실패 결과는 저장하지 않음)"""
+    if content.get("error"):
+        return
+    key = notice_archive_key(notice)
+    notice_archive.store_content(key, content)
+    search_index.add_many("notices", [_notice_search_doc(notice, content["text"])])
+    if summary is not None and summary.get("summary_body") != SUMMARY_ERROR_MESSAGE:
+        notice_archive.store_summary(key, summary, _stored_summary_version())
+
+async def load_notice_summary(notice: tuple, user_id: str = None) -> dict:
+    """
+    대화형 조회용 요약. 스케줄러가 저장해 둔 본문과 기본 요약을 우선 사용하고,
+    저장된 것이 없을 때만 본문 추출/요약을 수행한 뒤 저장합니다. (개인화 사용자는 저장된 본문으로 요약만 수행)
+    """
+    key = notice_archive_key(notice)
+    try:
+        content = notice_archive.get_content(key)
+        fetched = content is None
+        if fetched:
+            content = await fetch_notice_content(notice[1])
+        is_default = profile_signature(user_id) is None
+        if is_default and not fetched:
+            stored = notice_archive.get_summary(key, _stored_summary_version())
+            if stored is not None:
+                return {**stored, "images": content["images"]}
+        summary = await summarize_notice_content(content, notice[0], user_id=user_id)
+        if fetched or is_default:
+            store_notice_result(notice, content, summary if is_default else None)
+        return summary
     except Exception as e:
-        logging.error(f"❌ 본문 내용 추출 오류 {url}: {e}", exc_info=True)
-        return {"refined_title": original_title, "summary_body": "내용 처리 중 오류가 발생했습니다.", "images": []}
-        
+        logging.error(f"❌ 본문 내용 추출 오류 {notice[1]}: {e}", exc_info=True)
+        return {"refined_title": notice[0], "summary_body": "내용 처리 중 오류가 발생했습니다.", "images": []}
+
 # ▼ 추가: PKNU AI 비교과 파싱 함수
 def _parse_pknuai_page(soup: BeautifulSoup) -> list:
     """PKNU AI 시스템의 HTML을 파싱하여 프로그램 목록 반환 (상세 페이지 URL 추출)"""
@@ -519,43 +2598,66 @@ def _parse_pknuai_page(soup: BeautifulSoup) -> list:
         title_element = li.select_one("h5 a.ellip_2")
         title = title_element.get_text(strip=True) if title_element else "제목 없음"
         
-        yy = card_body.get("data-yy")
-        shtm = card_body.get("data-shtm")
-        nonsubjc_cd = card_body.get("data-nonsubjc-cd")
-        nonsubjc_crs_cd = card_body.get("data-nonsubjc-crs-cd")
-        
-        if not all([yy, shtm, nonsubjc_cd, nonsubjc_crs_cd]):
+        program = _program_from_card(title, card_body.get("data-yy"), card_body.get("data-shtm"),
+                                     card_body.get("data-nonsubjc-cd"), card_body.get("data-nonsubjc-crs-cd"))
+        if program:
+            programs.append(program)
+    return programs
+
+def _program_from_card(title: str, yy: str, shtm: str, nonsubjc_cd: str, nonsubjc_crs_cd: str) -> dict | None:
+    """카드의 data-* 속성으로 상세 페이지 URL과 고유 ID를 만듭니다. (속성이 빠지면 None)"""
+    if not all([yy, shtm, nonsubjc_cd, nonsubjc_crs_cd]):
+        return None
+    detail_url = (f"{PKNUAI_BASE_URL}/web/nonSbjt/programDetail.do?mId=216&order=3&"
+                  f"yy={yy}&shtm={shtm}&nonsubjcCd={nonsubjc_cd}&nonsubjcCrsCd={nonsubjc_crs_cd}")
+    return {
+        "title": title,
+        "href": detail_url,
+        "unique_id": f"{yy}-{shtm}-{nonsubjc_cd}-{nonsubjc_crs_cd}"
+    }
+
+def _parse_pknuai_page_lxml(html_content: str) -> list:
+    """_parse_pknuai_page 의 lxml 버전"""
+    document = _lxml_document(html_content)
+    programs = []
+    for li in document.xpath(f"//li[{_has_class('col-xl-3', 'col-lg-4', 'col-md-6')}]"):
+        card_bodies = li.xpath(f".//*[{_has_class('card-body')} and @data-url]")
+        if not card_bodies:
             continue
-            
-        detail_url = (f"{PKNUAI_BASE_URL}/web/nonSbjt/programDetail.do?mId=216&order=3&"
-                      f"yy={yy}&shtm={shtm}&nonsubjcCd={nonsubjc_cd}&nonsubjcCrsCd={nonsubjc_crs_cd}")
-
-        programs.append({
-            "title": title,
-            "href": detail_url,
-            "unique_id": f"{yy}-{shtm}-{nonsubjc_cd}-{nonsubjc_crs_cd}"
-        })
+        card_body = card_bodies[0]
+        title_elements = li.xpath(f".//h5//a[{_has_class('ellip_2')}]")
+        title = _lxml_text(title_elements[0]) if title_elements else "제목 없음"
+        program = _program_from_card(title, card_body.get("data-yy"), card_body.get("data-shtm"),
+                                     card_body.get("data-nonsubjc-cd"), card_body.get("data-nonsubjc-crs-cd"))
+        if program:
+            programs.append(program)
     return programs
 
+def parse_program_list(html_content: str) -> list:
+    """비교과 프로그램 목록 HTML을 프로그램 목록으로 파싱합니다."""
+    if HTML_PARSER_BACKEND == "bs4":
+        return _parse_pknuai_page(BeautifulSoup(html_content, 'html.parser'))
+    return _parse_pknuai_page_lxml(html_content)
+
+def _format_period_string(raw_text: str) -> str:
+    """기간 문자열을 정제합니다."""
+    # nbsp; 같은 공백 문자를 일반 공백으로 바꾸고, 여러 공백을 하나로 합칩니다.
+    clean_text = re.sub(r'\s+', ' ', raw_text.replace('\xa0', ' ')).strip()
+    # " ~ " 양 옆의 공백을 통일합니다.
+    return re.sub(r'\s*~\s*', ' ~ ', clean_text)
+
 def parse_pknuai_program_details(soup: BeautifulSoup) -> dict:
     """PKNU AI 시스템의 상세 페이지 HTML을 파싱하여 주요 정보 반환 (기간 포맷팅 강화)"""
     details = {}
 
-    # ✨ [NEW] 기간 문자열을 정제하는 헬퍼 함수
-    def format_period_string(raw_text: str) -> str:
-        # nbsp; 같은 공백 문자를 일반 공백으로 바꾸고, 여러 공백을 하나로 합칩니다.
-        clean_text = re.sub(r'\s+', ' ', raw_text.replace('\xa0', ' ')).strip()
-        # " ~ " 양 옆의 공백을 통일합니다.
-        return re.sub(r'\s*~\s*', ' ~ ', clean_text)
-
     pro_desc_box = soup.select_one(".pro_desc_box")
     if pro_desc_box:
         # ✨ [수정] 헬퍼 함수를 적용하여 기간 데이터를 가공합니다.
         raw_recruit_period = pro_desc_box.find("span", string=re.compile(r"모집기간:")).find_next_sibling("span").get_text(strip=True, separator=" ")
-        details["모집기간"] = format_period_string(raw_recruit_period)
+        details["모집기간"] = _format_period_string(raw_recruit_period)
         
         raw_operating_period = pro_desc_box.find("span", string=re.compile(r"운영기간:")).find_next_sibling("span").get_text(strip=True, separator=" ")
-        details["운영기간"] = format_period_string(raw_operating_period)
+        details["운영기간"] = _format_period_string(raw_operating_period)
 
         details["운영방식"] = pro_desc_box.find("span", string=re.compile(r"운영방식:")).find_next_sibling("span").get_text(strip=True)
         details["장소"] = pro_desc_box.find("span", string=re.compile(r"장소:")).find_next_sibling("span").get_text(strip=True)
@@ -580,30 +2682,357 @@ def parse_pknuai_program_details(soup: BeautifulSoup) -> dict:
 
     return details
     
-async def get_pknuai_programs() -> list:
-    """PKNU AI 비교과 프로그램 목록을 가져옵니다"""
-    program_list_url = f"{PKNUAI_BASE_URL}/web/nonSbjt/program.do?mId=216&order=3"
-    html_content = await fetch_program_html(program_list_url)
-    if not html_content:
-        return []
-    soup = BeautifulSoup(html_content, 'html.parser')
-    return _parse_pknuai_page(soup)
+def _parse_pknuai_program_details_lxml(html_content: str) -> dict:
+    """
+    parse_pknuai_program_details 의 lxml 버전.
+    .pro_desc_box 의 '라벨:' span 을 한 번만 훑어 라벨별 값 span 을 모은 뒤 필요한 항목을 꺼냅니다.
+    """
+    document = _lxml_document(html_content)
+    details = {}
+
+    boxes = document.xpath(f"//*[{_has_class('pro_desc_box')}]")
+    if boxes:
+        values = {}
+        for span in boxes[0].iter("span"):
+            label = _lxml_text(span)
+            if not label.endswith(":") or label[:-1].strip() in values:
+                continue
+            value_span = next((sibling for sibling in span.itersiblings() if sibling.tag == "span"), None)
+            if value_span is not None:
+                values[label[:-1].strip()] = value_span
+        for label in ("모집기간", "운영기간"):
+            if label in values:
+                details[label] = _format_period_string(_lxml_text(values[label], " "))
+        for label in ("운영방식", "장소", "참여대상"):
+            if label in values:
+                details[label] = _lxml_text(values[label])
+        if "예상 마일리지" in values:
+            details["예상 마일리지"] = _lxml_text(values["예상 마일리지"]).replace("점", "").strip() + "점"
+
+    # 모집인원 숫자 추출
+    gauges = document.xpath(f"//*[{_has_class('app_gauge')}]")
+    if gauges:
+        def get_num(cls: str) -> int:
+            found = gauges[0].xpath(f".//*[{_has_class(cls)}]")
+            match = re.search(r'\d+', _lxml_text(found[0])) if found else None
+            return int(match.group()) if match else 0
+        details["모집인원"] = get_num("total_member")
+        details["지원인원"] = get_num("volun")
+
+    # 내용, 신청안내 등 pre 태그 정보 추출
+    for header in document.xpath(f"//h4[{_has_class('pi_header')}]"):
+        content_boxes = header.xpath(f"following-sibling::div[{_has_class('pi_box')}][1]")
+        pre = content_boxes[0].xpath(".//pre") if content_boxes else []
+        if pre:
+            details[_lxml_text(header)] = _lxml_text(pre[0])
+
+    return details
+
+def parse_program_detail(html_content: str) -> dict:
+    """비교과 프로그램 상세 페이지 HTML을 파싱합니다."""
+    if HTML_PARSER_BACKEND == "bs4":
+        return parse_pknuai_program_details(BeautifulSoup(html_content, 'html.parser'))
+    return _parse_pknuai_program_details_lxml(html_content)
+
+async def fetch_program_details(program: dict) -> dict | None:
+    """프로그램 상세 페이지를 가져와 파싱합니다. 실패 시 None"""
+    detail_html = await fetch_program_html(program['href'])
+    if not detail_html:
+        return None
+    return parse_program_detail(detail_html)
+
+async def stream_program_cards(programs: list, timeout: float = None, outcome: dict = None):
+    """
+    여러 프로그램의 상세 조회 + AI 요약을 PROGRAM_DETAIL_CONCURRENCY 개씩 동시에 수행하고,
+    준비가 끝나는 순서대로 (program, summary) 를 내보내는 비동기 제너레이터.
+    timeout(초)이 지나면 남은 작업을 취소하고 지금까지 준비된 결과만으로 종료합니다.
+    outcome 딕셔너리를 넘기면 시간 초과 여부를 outcome["timed_out"] 에 기록합니다.
+    """
+    if outcome is not None:
+        outcome["timed_out"] = False
+    semaphore = asyncio.Semaphore(PROGRAM_DETAIL_CONCURRENCY)
+
+    async def prepare(program: dict):
+        async with semaphore:
+            details = await fetch_program_details(program)
+            if details is None:
+                return program, None
+            search_index.add_many("programs", [_program_search_doc(program, _program_input_text(details))])
+            return program, await summarize_program_details(details, program['title'])
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout else None
+    tasks = [asyncio.create_task(prepare(program)) for program in programs]
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                logging.warning(f"⏱️ 프로그램 상세 조회 시간 예산 초과, {len(pending)}개 작업을 취소합니다.")
+                if outcome is not None:
+                    outcome["timed_out"] = True
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    program, summary = task.result()
+                except Exception as e:
+                    logging.error(f"❌ 프로그램 상세 처리 중 오류 발생: {e}", exc_info=True)
+                    continue
+                if summary is not None:
+                    yield program, summary
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def batch_program_cards(programs: list):
+    """
+    백로그용 stream_program_cards. 상세 조회를 모두 마친 뒤 요약을 배치로 미리 채우고,
+    목록 순서대로 (program, summary) 를 내보냅니다. (배치에서 빠진 프로그램은 단건 요약)
+    """
+    semaphore = asyncio.Semaphore(PROGRAM_DETAIL_CONCURRENCY)
+
+    async def fetch(program: dict):
+        async with semaphore:
+            try:
+                return await fetch_program_details(program)
+            except Exception as e:
+                logging.error(f"❌ 프로그램 상세 처리 중 오류 발생: {e}", exc_info=True)
+                return None
+
+    details_list = await asyncio.gather(*(fetch(program) for program in programs))
+    search_index.add_many("programs", [_program_search_doc(program, _program_input_text(details))
+                                       for program, details in zip(programs, details_list) if details])
+    await warm_program_summaries([(details, program['title'])
+                                  for program, details in zip(programs, details_list) if details])
+    for program, details in zip(programs, details_list):
+        if details:
+            yield program, await summarize_program_details(details, program['title'])
+
+################################################################################
+#                          텔레그램 전송 대기열 (속도 제한)                          #
+################################################################################
+class TokenBucket:
+    """초당 rate 개의 토큰이 채워지는 토큰 버킷 (최대 capacity 개까지 누적)"""
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def wait_time(self) -> float:
+        """토큰 하나를 쓸 수 있을 때까지 남은 시간(초). 지금 쓸 수 있으면 0 입니다."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def try_acquire(self) -> bool:
+        """기다리지 않고 토큰을 하나 쓰며, 토큰이 없으면 False 를 반환합니다."""
+        if self.wait_time() > 0:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def acquire(self) -> None:
+        while not self.try_acquire():
+            await asyncio.sleep(self.wait_time())
+
+
+PRIORITY_INTERACTIVE = 0  # 사용자 요청에 대한 응답
+PRIORITY_BROADCAST = 1    # 스케줄러의 새 공지/프로그램 알림
+
+# 전송 대기열 워커 안에서 실행 중인지 표시 (워커가 보내는 요청은 미들웨어에서 다시 대기열에 넣지 않음)
+_IN_DELIVERY_WORKER = contextvars.ContextVar("in_delivery_worker", default=False)
+
+
+class TelegramDeliveryQueue:
+    """
+    텔레그램 메시지 전송 대기열.
+    - 전체(TELEGRAM_GLOBAL_RATE)와 채팅별(TELEGRAM_CHAT_RATE, 그룹은 TELEGRAM_GROUP_RATE) 토큰 버킷으로 속도를 제한합니다.
+    - 메시지는 채팅별 대기열에 쌓이고, 채팅 버킷에 토큰이 있는 채팅만 준비 큐에 올라갑니다.
+      워커는 준비된 채팅의 다음 메시지만 꺼내므로, 한 그룹 채팅의 느린 버킷이 다른 채팅의 전송을 막지 않습니다.
+    - 사용자 응답(PRIORITY_INTERACTIVE)을 스케줄러 알림(PRIORITY_BROADCAST)보다 먼저 보냅니다.
+    - TelegramRetryAfter 를 받으면 워커를 붙잡지 않고 해당 채팅만 안내된 시간 뒤로 미루며,
+      같은 채팅의 메시지 순서는 유지합니다.
+    """
+    def __init__(self, workers: int = TELEGRAM_DELIVERY_WORKERS):
+        self.workers = workers
+        self._ready = asyncio.PriorityQueue()   # (맨 앞 메시지 우선순위, 순번, chat_id)
+        self._sequence = itertools.count()
+        self._global_bucket = TokenBucket(TELEGRAM_GLOBAL_RATE, capacity=TELEGRAM_GLOBAL_RATE)
+        self._chat_buckets = {}
+        self._pending = {}    # chat_id -> [[우선순위, 순번, send_func, future, 넣은 시각, 시도 횟수], ...] (힙)
+        self._active = set()  # 준비 큐/전송 중/대기 타이머 중 한 곳에 있는 채팅
+        self._timers = {}     # chat_id -> 다시 준비 큐에 올릴 타이머
+        self._worker_tasks = []
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self._latency_total = 0.0
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        if chat_id not in self._chat_buckets:
+            is_group = str(chat_id).startswith("-")
+            self._chat_buckets[chat_id] = TokenBucket(TELEGRAM_GROUP_RATE if is_group else TELEGRAM_CHAT_RATE)
+        return self._chat_buckets[chat_id]
+
+    def _ensure_workers(self) -> None:
+        self._worker_tasks = [task for task in self._worker_tasks if not task.done()]
+        while len(self._worker_tasks) < self.workers:
+            self._worker_tasks.append(asyncio.create_task(self._worker()))
+
+    async def send(self, chat_id, send_func, priority: int = PRIORITY_BROADCAST):
+        """
+        send_func(): 매 시도마다 호출되어 bot.send_* 코루틴을 반환하는 함수.
+        전송이 끝나면 결과를 반환하고, 재시도 후에도 실패하면 예외를 그대로 전달합니다.
+        """
+        self._ensure_workers()
+        chat_id = str(chat_id)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._pending.setdefault(chat_id, []),
+                       [priority, next(self._sequence), send_func, future, time.monotonic(), 0])
+        if chat_id not in self._active:
+            self._active.add(chat_id)
+            self._schedule(chat_id)
+        return await future
+
+    def _schedule(self, chat_id: str, delay: float = None) -> None:
+        """채팅의 다음 메시지를 채팅 버킷이 준비되는 시점(또는 delay 초 뒤)에 준비 큐에 올립니다."""
+        self._timers.pop(chat_id, None)
+        pending = self._pending.get(chat_id)
+        if not pending:
+            self._pending.pop(chat_id, None)
+            self._active.discard(chat_id)
+            return
+        if delay is None:
+            delay = self._chat_bucket(chat_id).wait_time()
+        if delay > 0:
+            self._timers[chat_id] = asyncio.get_running_loop().call_later(delay, self._schedule, chat_id)
+            return
+        self._ready.put_nowait((pending[0][0], pending[0][1], chat_id))
+
+    async def _worker(self) -> None:
+        _IN_DELIVERY_WORKER.set(True)
+        while True:
+            _, _, chat_id = await self._ready.get()
+            try:
+                await self._deliver_next(chat_id)
+            except Exception as e:
+                logging.error(f"❌ 텔레그램 전송 대기열 처리 오류 (chat_id={chat_id}): {e}", exc_info=True)
+                self._schedule(chat_id)
+            finally:
+                self._ready.task_done()
+
+    async def _deliver_next(self, chat_id: str) -> None:
+        """채팅의 다음 메시지를 한 번 보내 봅니다. 재시도가 필요하면 대기열 맨 앞에 되돌리고 채팅을 미룹니다."""
+        pending = self._pending[chat_id]
+        while pending and pending[0][3].done():   # 요청한 쪽이 취소한 메시지는 버립니다.
+            heapq.heappop(pending)
+        if not pending or not self._chat_bucket(chat_id).try_acquire():
+            self._schedule(chat_id)
+            return
+        item = heapq.heappop(pending)
+        _, _, send_func, future, enqueued_at, attempt = item
+        await self._global_bucket.acquire()
+        retry_delay = None
+        try:
+            result = await send_func()
+        except TelegramRetryAfter as e:
+            if attempt < TELEGRAM_MAX_RETRIES:
+                retry_delay = e.retry_after
+                logging.warning(f"텔레그램 전송 제한(RetryAfter), {e.retry_after}초 후 재시도합니다. (chat_id={chat_id})")
+            else:
+                self._fail(future, e)
+        except TelegramNetworkError as e:
+            if attempt < TELEGRAM_MAX_RETRIES:
+                retry_delay = min(30, 2 ** attempt) * random.uniform(0.5, 1.5)
+                logging.warning(f"텔레그램 네트워크 오류, {retry_delay:.1f}초 후 재시도합니다: {e}")
+            else:
+                self._fail(future, e)
+        except Exception as e:
+            self._fail(future, e)
+        else:
+            self.sent += 1
+            self._latency_total += time.monotonic() - enqueued_at
+            if not future.done():
+                future.set_result(result)
+        if retry_delay is not None:
+            self.retried += 1
+            item[5] = attempt + 1
+            heapq.heappush(pending, item)
+        self._schedule(chat_id, retry_delay)
+
+    def _fail(self, future: asyncio.Future, error: Exception) -> None:
+        self.failed += 1
+        if not future.done():
+            future.set_exception(error)
+
+    def pending_count(self) -> int:
+        return sum(len(pending) for pending in self._pending.values())
+
+    def stats(self) -> str:
+        avg_latency = self._latency_total / self.sent if self.sent else 0.0
+        return (f"텔레그램 전송: 성공 {self.sent} / 재시도 {self.retried} / 실패 {self.failed}, "
+                f"평균 대기 {avg_latency:.2f}s, 대기열 {self.pending_count()}개")
+
+    async def close(self, timeout: float = 30) -> None:
+        """대기 중인 메시지를 최대 timeout 초 동안 보내고 워커를 종료합니다."""
+        futures = [item[3] for pending in self._pending.values() for item in pending]
+        if futures and any(not task.done() for task in self._worker_tasks):
+            _, not_done = await asyncio.wait(futures, timeout=timeout)
+            if not_done:
+                logging.warning(f"종료 시 전송하지 못한 메시지 {len(not_done)}개가 남았습니다.")
+        for timer in self._timers.values():
+            timer.cancel()
+        for task in self._worker_tasks:
+            task.cancel()
+
+
+class TelegramQueueMiddleware(BaseRequestMiddleware):
+    """
+    핸들러의 message.answer / edit_text 처럼 봇 객체로 직접 보내는 메시지도 전송 대기열을 거치게 하는
+    aiogram 요청 미들웨어. (사용자 응답이므로 PRIORITY_INTERACTIVE)
+    콜백 응답(answerCallbackQuery) 등 채팅 메시지를 만들지 않는 요청과 대기열 워커가 보내는 요청은 그대로 통과합니다.
+    """
+    QUEUED_METHODS = (SendMessage, SendPhoto, SendMediaGroup, EditMessageText, EditMessageCaption, EditMessageReplyMarkup)
+
+    def __init__(self, queue: TelegramDeliveryQueue):
+        self._queue = queue
+
+    async def __call__(self, make_request, bot: Bot, method):
+        if _IN_DELIVERY_WORKER.get() or not isinstance(method, self.QUEUED_METHODS) or method.chat_id is None:
+            return await make_request(bot, method)
+        return await self._queue.send(method.chat_id, lambda: make_request(bot, method), priority=PRIORITY_INTERACTIVE)
+
+
+delivery_queue = TelegramDeliveryQueue()
+bot.session.middleware(TelegramQueueMiddleware(delivery_queue))
 
 ################################################################################
 #                                알림 전송 및 확인 함수                            #
 ################################################################################
 # script.py에서 send_notification 함수를 찾아 아래 코드로 교체하세요.
 
-async def send_notification(notice: tuple, target_chat_id: str):
+async def send_notification(notice: tuple, target_chat_id: str, priority: int = PRIORITY_INTERACTIVE):
     """
     AI가 요약하고 정제한 정보를 바탕으로 공지사항 알림을 전송하는 함수. (구분선 추가)
-    (target_chat_id를 user_id로 활용하여 extract_content에 전달)
+    (target_chat_id를 user_id로 활용하여, 저장된 요약이 있으면 그대로 사용)
     """
+    summary_data = await load_notice_summary(notice, user_id=target_chat_id)
+    await deliver_notification(notice, summary_data, target_chat_id, priority=priority)
+
+async def send_notifications(notices: list, target_chat_id: str, priority: int = PRIORITY_INTERACTIVE) -> None:
+    """여러 공지의 요약을 동시에 불러온 뒤 목록 순서대로 전송합니다. (대화형 조회용)"""
+    summaries = await asyncio.gather(*(load_notice_summary(notice, user_id=target_chat_id) for notice in notices))
+    for notice, summary_data in zip(notices, summaries):
+        await deliver_notification(notice, summary_data, target_chat_id, priority=priority)
+
+async def deliver_notification(notice: tuple, summary_data: dict, target_chat_id: str,
+                               priority: int = PRIORITY_BROADCAST):
+    """이미 요약된 공지 정보를 메시지로 구성하여 전송 대기열에 넣습니다. (첫 번째 이미지가 있으면 사진으로 전송)"""
     original_title, href, department, date_ = notice
-    
-    # target_chat_id를 user_id로 전달
-    summary_data = await extract_content(href, original_title, user_id=target_chat_id)
-    
+
     refined_title = summary_data.get("refined_title", original_title)
     summary_body = summary_data.get("summary_body", "요약 정보를 불러올 수 없습니다.")
     images = summary_data.get("images", [])
@@ -622,42 +3051,92 @@ async def send_notification(notice: tuple, target_chat_id: str):
 
     if images:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(images[0]) as resp:
-                    if resp.status == 200:
-                        image_bytes = await resp.read()
-                        photo_file = BufferedInputFile(image_bytes, filename="photo.jpg")
-                        
-                        await bot.send_photo(
-                            chat_id=target_chat_id,
-                            photo=photo_file,
-                            caption=message_text,
-                            reply_markup=keyboard,
-                            parse_mode="HTML"
-                        )
-                        return
+            resp = await http_manager.fetch(images[0], as_bytes=True, raise_for_status=False)
+            if resp.status == 200:
+                photo_file = BufferedInputFile(resp.body, filename="photo.jpg")
+
+                await delivery_queue.send(target_chat_id, lambda: bot.send_photo(
+                    chat_id=target_chat_id,
+                    photo=photo_file,
+                    caption=message_text,
+                    reply_markup=keyboard,
+                    parse_mode="HTML"
+                ), priority=priority)
+                return
         except Exception as e:
             logging.error(f"이미지와 함께 메시지 전송 실패 (텍스트만 전송으로 대체): {e}", exc_info=True)
             message_text += "\n\n<i>(공지 이미지를 불러오는 데 실패했습니다.)</i>"
 
-    await bot.send_message(
+    await delivery_queue.send(target_chat_id, lambda: bot.send_message(
         chat_id=target_chat_id,
         text=message_text,
         reply_markup=keyboard,
         parse_mode="HTML",
         disable_web_page_preview=True
+    ), priority=priority)
+
+async def deliver_program_notification(program: dict, summary: dict, target_chat_id: str,
+                                       priority: int = PRIORITY_BROADCAST):
+    """이미 요약된 비교과 프로그램 정보를 메시지로 구성하여 전송 대기열에 넣습니다."""
+    refined_title = summary.get("refined_title", program['title'])
+    summary_body = summary.get("summary_body", "요약 정보를 불러올 수 없습니다.")
+    if summary.get("tags"):
+        summary_body += f"\n\n{summary['tags']}"
+
+    separator = "─" * 23
+    message_text = (
+        f"<b>{html.escape(refined_title)}</b>\n"
+        f"{separator}\n\n"
+        f"{summary_body}"
+    )
+    keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="🔗 프로그램 확인하기", url=program['href'])]]
     )
+    await delivery_queue.send(target_chat_id, lambda: bot.send_message(
+        chat_id=target_chat_id,
+        text=message_text,
+        reply_markup=keyboard,
+        parse_mode="HTML",
+        disable_web_page_preview=True
+    ), priority=priority)
 
-async def summarize_program_details(details: dict, original_title: str) -> dict:
+async def send_program_search_results(programs: list, chat_id: int) -> None:
     """
-    파싱된 비교과 프로그램 상세 정보를 받아 AI로 재가공 및 요약하는 함수 (규칙 기반 강화).
+    검색된 프로그램 카드를 준비되는 즉시 하나씩 전송합니다. 일부만 보냈으면 시간 예산 초과인지
+    상세 조회 실패인지 구분하여 알립니다.
     """
-    # AI에게 전달할 정보를 문자열로 변환
-    input_text = "\n".join([f"- {key}: {value}" for key, value in details.items()])
+    sent = 0
+    outcome = {}
+    async for program, summary in stream_program_cards(programs, timeout=PROGRAM_SEARCH_TIMEOUT, outcome=outcome):
+        await deliver_program_notification(program, summary, chat_id, priority=PRIORITY_INTERACTIVE)
+        sent += 1
+    if sent < len(programs):
+        if outcome.get("timed_out"):
+            notice_text = f"⏱️ {len(programs)}개 중 {sent}개의 프로그램만 불러왔습니다. 잠시 후 다시 검색해 주세요."
+        else:
+            notice_text = f"⚠️ {len(programs) - sent}개 프로그램의 상세 정보를 불러오지 못했습니다."
+        await delivery_queue.send(chat_id, lambda: bot.send_message(chat_id, notice_text),
+                                  priority=PRIORITY_INTERACTIVE)
 
-    prompt = f"""
-당신은 부경대학교 학생들을 위한 똑똑한 AI 조교입니다.
-아래 '작업 규칙'에 따라 '비교과 프로그램 정보'를 분석하고, 지정된 '출력 형식'으로만 요약해주세요.
+async def send_local_search_results(keyword: str, results: list, chat_id: int, elapsed_ms: float) -> None:
+    """
+    로컬 검색 결과를 기존 요약 카드로 전송합니다. 공지는 저장된 요약(없으면 새로 요약)으로,
+    비교과 프로그램은 상세 조회 + 요약 카드 스트림으로 보냅니다.
+    """
+    notices = [_search_result_notice(result) for result in results if result["source"] == "notices"]
+    programs = [_search_result_program(result) for result in results if result["source"] == "programs"]
+    header = (f"🔎 '<b>{html.escape(keyword)}</b>' 검색 결과: 공지 {len(notices)}건, "
+              f"비교과 {len(programs)}건 ({elapsed_ms:.0f}ms)")
+    await delivery_queue.send(chat_id, lambda: bot.send_message(chat_id, header, parse_mode="HTML"),
+                              priority=PRIORITY_INTERACTIVE)
+    if notices:
+        await send_notifications(notices, chat_id)
+    if programs:
+        await send_program_search_results(programs, chat_id)
+
+# ▼ 비교과 프로그램 요약 시스템 프롬프트 (프롬프트 캐시를 위해 프로그램 정보는 사용자 메시지로 분리)
+PROGRAM_SUMMARY_SYSTEM_PROMPT = """당신은 부경대학교 학생들을 위한 똑똑한 AI 조교입니다.
+아래 '작업 규칙'에 따라 사용자 메시지의 '비교과 프로그램 정보'를 분석하고, 지정된 '출력 형식'으로만 요약해주세요.
 
 ### 작업 규칙 (매우 중요)
 
@@ -692,82 +3171,284 @@ async def summarize_program_details(details: dict, original_title: str) -> dict:
 -   **단과대학:** `#공과대학` `#정보융합대학` `#인문사회과학대학` `#자연과학대학` `#경영대학` `#수산과학대학`
 -   **주요 학과:** `#기계공학과` `#컴퓨터공학과` `#IT융합응용공학과` `#데이터정보과학부`
 
-### 비교과 프로그램 정보
-- 원본 제목: {original_title}
-{input_text}
-
 ### 출력 형식 (Key-Value JSON 형식)
-{{
+{
     "refined_title": "AI가 정제한 새로운 프로그램 제목",
     "summary_body": "<b>⭐⭐⭐(여기 별 개수를 수정) 한 줄 요약</b>\\n\\n<b>📋 핵심 정보</b>\\n- <b>모집기간:</b> ...\\n- <b>운영기간:</b> ...\\n- <b>참여 대상:</b> (통합된 대상)\\n- <b>주요 내용:</b> (핵심 내용 요약)\\n- <b>신청 방법:</b> ...\\n\\n<b>🚀 추천 액션</b>\\n- (규칙에 따라 생성된 추천 액션)\\n\\n<b>#️⃣ 관련 태그</b>\\n- (태그 목록에서 선택된 태그)"
-}}
+}
 """
+
+def _program_input_text(details: dict) -> str:
+    """AI에게 전달할 프로그램 상세 정보를 문자열로 변환합니다."""
+    return "\n".join([f"- {key}: {value}" for key, value in details.items()])
+
+# ▼ compact 방식 프로그램 요약 프롬프트. 기간/대상/마일리지는 상세 페이지 값을 그대로 쓰므로 AI는 제목/별점/한 줄 요약만 작성
+PROGRAM_COMPACT_SYSTEM_PROMPT = """당신은 부경대학교 학생들을 위한 똑똑한 AI 조교입니다.
+기간, 대상, 마일리지 등 세부 항목은 별도로 정리하므로, 아래 '작업 규칙'에 따라 사용자 메시지의 '비교과 프로그램 정보'의 제목, 중요도, 한 줄 요약만 지정된 '출력 형식'으로 작성해주세요.
+
+### 작업 규칙 (매우 중요)
+1.  **제목 정제:** '원본 제목'에서 불필요한 수식어를 제거하고 간결한 핵심 제목으로 만든다.
+2.  **중요도 평가 (5점 척도):** 아래 기준에 따라 중요도를 1에서 5까지의 정수로 평가한다.
+    - 5 (강력 추천): 대다수 학생에게 유용하며, 마일리지가 높거나 혜택이 매우 좋은 프로그램.
+    - 4 (추천): 특정 단과대/학과 학생들에게 매우 유용한 핵심 전공 관련 프로그램.
+    - 3 (확인 권장): 참여하면 좋은 일반적인 교양, 특강, 학습법 관련 프로그램.
+    - 2 (관심 시 확인): 소수 대상이거나 특정 관심 분야에만 해당되는 프로그램.
+    - 1 (참고): 단순 안내 또는 홍보성 프로그램.
+3.  **한 줄 요약:** '내용', '모집안내' 등을 종합하여 프로그램의 핵심을 40자 이내의 한 문장으로 요약한다.
+
+### 출력 형식 (Key-Value JSON 형식)
+{
+    "refined_title": "AI가 정제한 새로운 프로그램 제목",
+    "rating": 3,
+    "one_line": "한 줄 요약"
+}
+"""
+
+def _program_summary_key(details: dict, title: str) -> str:
+    return summary_cache.make_key(_program_input_text(details), title, SUMMARY_MODEL, _summary_mode_marker("비교과 프로그램"))
+
+def _finalize_program_summary(result: dict, details: dict, title: str) -> dict:
+    """AI 응답을 최종 프로그램 요약으로 만듭니다. (compact 방식은 상세 정보로 본문을 구성)"""
+    result = {key: value for key, value in result.items() if key != "id"}
+    result["refined_title"] = result.get("refined_title") or title
+    if SUMMARY_MODE == "full":
+        return result
+    facts = extract_program_facts(details)
+    return {"refined_title": result["refined_title"],
+            "summary_body": render_rule_summary(facts, result.get("rating"), result.get("one_line", ""))}
+
+async def summarize_program_details(details: dict, original_title: str) -> dict:
+    """
+    파싱된 비교과 프로그램 상세 정보를 받아 AI로 재가공 및 요약하는 함수 (규칙 기반 강화).
+    """
+    input_text = _program_input_text(details)
+    cache_key = _program_summary_key(details, original_title)
+    cached = summary_cache.get(cache_key)
+    if cached:
+        logging.info(f"요약 캐시 적중: {original_title}")
+        return cached
+
+    user_content = f"### 비교과 프로그램 정보\n- 원본 제목: {original_title}\n{input_text}"
     try:
-        response = await aclient.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": "위 규칙에 따라 비교과 프로그램 정보를 요약해주세요."}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.0, # 규칙 기반이므로 창의성을 최소화
-            max_tokens=1000
-        )
-        return json.loads(response.choices[0].message.content)
+        # 규칙 기반이므로 창의성을 최소화 (temperature=0.0)
+        if SUMMARY_MODE == "full":
+            response = await request_json_completion(
+                "프로그램 요약", PROGRAM_SUMMARY_SYSTEM_PROMPT, user_content, temperature=0.0, max_tokens=1000)
+        else:
+            response = await request_json_completion(
+                "프로그램 요약(compact)", PROGRAM_COMPACT_SYSTEM_PROMPT, user_content, temperature=0.0, max_tokens=250)
+        result = _finalize_program_summary(response, details, original_title)
+        summary_cache.put(cache_key, result)
+        return result
     except Exception as e:
         logging.error(f"❌ OpenAI API 프로그램 요약 오류: {e}", exc_info=True)
         return {
             "refined_title": original_title,
             "summary_body": "AI 요약 중 오류가 발생했습니다.",
         }
-async def check_for_new_notices(target_chat_id: str):
-    # ... 기존 공지사항 확인 함수 (변경 없음)
+
+async def warm_program_summaries(items: list) -> int:
+    """백로그용 배치 요약. [(상세 정보, 원본 제목)] 중 캐시에 없는 프로그램을 묶어 요약하고 캐시에 저장합니다."""
+    pending = {}
+    for details, title in items:
+        if len(_program_input_text(details)) > SUMMARY_BATCH_MAX_INPUT_CHARS:
+            continue
+        cache_key = _program_summary_key(details, title)
+        if not summary_cache.has(cache_key):
+            pending[cache_key] = (details, title)
+    pending = list(pending.items())
+    warmed = 0
+    for start in range(0, len(pending), SUMMARY_BATCH_SIZE):
+        chunk = pending[start:start + SUMMARY_BATCH_SIZE]
+        entries = [(str(i + 1), f"### 비교과 프로그램 정보\n- 원본 제목: {title}\n{_program_input_text(details)}")
+                   for i, (_, (details, title)) in enumerate(chunk)]
+        try:
+            results = await request_json_batch(
+                "프로그램 배치 요약", PROGRAM_SUMMARY_SYSTEM_PROMPT if SUMMARY_MODE == "full" else PROGRAM_COMPACT_SYSTEM_PROMPT,
+                entries, temperature=0.0, max_tokens_per_item=1000 if SUMMARY_MODE == "full" else 250)
+        except Exception as e:
+            logging.error(f"❌ OpenAI API 프로그램 배치 요약 오류 ({len(chunk)}건, 단건 요약으로 대체): {e}", exc_info=True)
+            continue
+        for i, (cache_key, (details, title)) in enumerate(chunk):
+            result = results.get(str(i + 1))
+            if _is_complete_summary(result):
+                summary_cache.put(cache_key, _finalize_program_summary(result, details, title))
+                warmed += 1
+    if pending:
+        logging.info(f"📦 프로그램 배치 요약: {len(pending)}건 중 {warmed}건 처리")
+    return warmed
+
+async def _prepare_notice(notice: tuple, profile_groups: dict, extract_semaphore: asyncio.Semaphore,
+                          summary_semaphore: asyncio.Semaphore, content: dict = None) -> dict:
+    """
+    파이프라인의 준비 단계: 본문/OCR 추출은 한 번만 하고(content 가 주어지면 생략), AI 요약은 프로필 서명마다
+    한 번씩 각각의 동시 실행 한도 안에서 수행합니다. 본문과 기본 요약은 공지 아카이브에 저장하며
+    {chat_id: 요약 결과} 를 반환합니다.
+    """
+    if content is None:
+        async with extract_semaphore:
+            content = await fetch_notice_content(notice[1])
+
+    async def summarize_for(user_id: str) -> dict:
+        async with summary_semaphore:
+            return await summarize_notice_content(content, notice[0], user_id=user_id)
+
+    groups = list(profile_groups.values())
+    summaries = await asyncio.gather(*(summarize_for(chat_ids[0]) for chat_ids in groups))
+    # 대화형 조회에서 바로 보여 줄 수 있도록 본문과 기본 요약을 저장합니다.
+    if None in profile_groups:
+        default_summary = summaries[list(profile_groups).index(None)]
+    else:
+        default_summary = await summarize_for(None)
+    store_notice_result(notice, content, default_summary)
+    return {chat_id: summary for chat_ids, summary in zip(groups, summaries) for chat_id in chat_ids}
+
+async def _warm_notice_backlog(new_notices: list, profile_groups: dict,
+                               extract_semaphore: asyncio.Semaphore) -> dict:
+    """
+    새 공지가 많을 때(백로그/백필) 본문을 먼저 모두 추출하고, 프로필별로 배치 요약하여 캐시를 채웁니다.
+    추출한 본문을 {캐시 키: content} 로 반환하여 파이프라인에서 다시 추출하지 않도록 합니다.
+    """
+    async def fetch(notice: tuple):
+        async with extract_semaphore:
+            try:
+                return await fetch_notice_content(notice[1])
+            except Exception as e:
+                logging.error(f"❌ 본문 내용 추출 오류 {notice[1]}: {e}", exc_info=True)
+                return None
+
+    contents = await asyncio.gather(*(fetch(notice) for _, notice in new_notices))
+    prefetched = {key: content for (key, _), content in zip(new_notices, contents) if content is not None}
+    items = [(content["text"], notice[0]) for (key, notice), content in zip(new_notices, contents)
+             if content is not None and not content.get("error")]
+    for chat_ids in profile_groups.values():
+        await warm_notice_summaries(items, user_id=chat_ids[0])
+    return prefetched
+
+async def check_for_new_notices(target_chat_ids: str | list, backfill: bool = NOTICE_BACKFILL) -> bool:
+    """
+    새 공지사항을 확인하고 알림을 보냅니다. (backfill=True 이면 더 많은 페이지를 거슬러 올라가 확인)
+    추출/요약은 병렬로 미리 진행하고, 전송은 게시판 순서대로 하며 실제로 전송된 공지만 캐시에 기록합니다.
+    여러 채팅에 보낼 때는 개인화 프로필이 같은 채팅끼리 요약 한 번을 공유합니다.
+    새 공지를 발견했으면 True 를 반환합니다. (스케줄러의 확인 주기 조절에 사용)
+    """
+    if isinstance(target_chat_ids, str):
+        target_chat_ids = [target_chat_ids]
     logging.info("새로운 공지사항을 확인합니다...")
-    seen = load_cache()
-    current = await get_school_notices()
-    found = False
-    for notice in current:
-        key = generate_cache_key(notice[0], notice[1])
-        if key not in seen:
-            logging.info(f"새 공지사항 발견: {notice[0]}")
-            await send_notification(notice, target_chat_id)
-            seen[key] = True
-            found = True
-    if found:
-        save_cache(seen)
-        push_cache_changes()
-
-async def check_for_new_pknuai_programs(target_chat_id: str):
-    """새로운 PKNU AI 비교과 프로그램을 확인하고 알림을 보냅니다. (오류 수정)"""
-    logging.info("새로운 AI 비교과 프로그램을 확인합니다...")
-    seen = load_pknuai_program_cache()
-    
-    # ✨ [수정] get_pknuai_programs()를 호출하여 프로그램 목록을 가져옵니다.
-    current_programs_list = await get_pknuai_programs() 
-    found = False
+    response = await http_manager.fetch(URL, headers=list_change_detector.request_headers("notices"),
+                                        raise_for_status=False)
+    if response.status >= 400:
+        logging.error(f"❌ 공지사항 목록 요청 실패: 상태 코드 {response.status}")
+        return False
+    # 목록 1페이지를 확인했으므로 (변경이 없더라도) 전체 카테고리 아카이브는 최신 상태입니다.
+    notice_archive.mark_refreshed("")
+    if response.status == 304:
+        logging.info("공지사항 목록 변경 없음 (304 Not Modified)")
+        return False
+    snapshot = list_change_detector.snapshot(region_fingerprint(response.body, "<tbody", "</tbody>"), response.headers)
+    if list_change_detector.is_unchanged("notices", snapshot):
+        logging.info("공지사항 목록 변경 없음 (목록 지문 동일)")
+        list_change_detector.commit("notices", snapshot)
+        return False
+
+    seen = seen_store.view("notices")
+    new_notices = await crawl_new_school_notices(seen, response.body, backfill=backfill)
+    for _, notice in new_notices:
+        logging.info(f"새 공지사항 발견: {notice[0]}")
+    if not new_notices:
+        list_change_detector.commit("notices", snapshot)
+        return False
+
+    profile_groups = group_by_profile(target_chat_ids)
+    logging.info(f"알림 대상 {len(target_chat_ids)}개 채팅, 요약 프로필 {len(profile_groups)}개")
+    extract_semaphore = asyncio.Semaphore(NOTICE_EXTRACT_CONCURRENCY)
+    summary_semaphore = asyncio.Semaphore(NOTICE_SUMMARY_CONCURRENCY)
+    prefetched = {}
+    if len(new_notices) >= SUMMARY_BATCH_THRESHOLD:
+        prefetched = await _warm_notice_backlog(new_notices, profile_groups, extract_semaphore)
+    tasks = [
+        asyncio.create_task(_prepare_notice(notice, profile_groups, extract_semaphore, summary_semaphore,
+                                            content=prefetched.get(key)))
+        for key, notice in new_notices
+    ]
 
+    delivered = []
+    failed = False
+    try:
+        for (key, notice), task in zip(new_notices, tasks):
+            try:
+                summaries = await task
+            except Exception as e:
+                logging.error(f"❌ 공지사항 처리 실패 (다음 주기에 재시도): {notice[0]}, {e}", exc_info=True)
+                failed = True
+                continue
+            # 일부 채팅만 실패한 경우 이미 받은 채팅에 중복 전송하지 않도록 전송된 것으로 기록합니다.
+            results = await asyncio.gather(
+                *(deliver_notification(notice, summaries[chat_id], chat_id) for chat_id in target_chat_ids),
+                return_exceptions=True)
+            errors = [r for r in results if isinstance(r, Exception)]
+            for error in errors:
+                logging.error(f"❌ 공지사항 전송 실패: {notice[0]}, {error}")
+            if len(errors) == len(results):
+                failed = True
+                continue
+            delivered.append((key, notice[0]))
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if not failed:
+        list_change_detector.commit("notices", snapshot)
+    if delivered:
+        seen_store.add_many("notices", delivered)
+        push_seen_changes()
+    return True
+
+async def check_for_new_pknuai_programs(target_chat_id: str) -> bool:
+    """새로운 PKNU AI 비교과 프로그램을 확인하고 알림을 보냅니다. 새 프로그램을 발견했으면 True"""
+    logging.info("새로운 AI 비교과 프로그램을 확인합니다...")
+    html_content = await fetch_program_html(PKNUAI_PROGRAM_LIST_URL)
+    if not html_content:
+        return False
+    # 카드 목록 영역만 지문으로 비교하여, 변경이 없으면 파싱과 캐시 로드를 건너뜁니다.
+    snapshot = list_change_detector.snapshot(region_fingerprint(html_content, "card-body", "</li>"))
+    if list_change_detector.is_unchanged("programs", snapshot):
+        logging.info("비교과 프로그램 목록 변경 없음 (목록 지문 동일)")
+        return False
+
+    seen = seen_store.view("programs")
+    current_programs_list = parse_program_list(html_content)
+    search_index.add_many("programs", [_program_search_doc(program) for program in current_programs_list])
+
+    new_programs = []
     for program_summary in current_programs_list:
         # unique_id를 사용하도록 키 생성 방식을 통일합니다.
         key = generate_cache_key(program_summary['title'], program_summary['unique_id'])
         if key not in seen:
             logging.info(f"새 비교과 프로그램 발견: {program_summary['title']}")
-            
-            detail_html = await fetch_program_html(program_summary['href'])
-            if not detail_html:
-                continue
+            program_summary["cache_key"] = key
+            new_programs.append(program_summary)
 
-            # ✨ [수정] AI 요약 대신 직접 파싱 함수를 사용합니다.
-            detail_soup = BeautifulSoup(detail_html, 'html.parser')
-            program_details = parse_pknuai_program_details(detail_soup)
-
-            await send_pknuai_program_notification(program_summary, program_details, target_chat_id)
+    # 상세 조회/요약은 병렬로 진행하고, 준비된 프로그램부터 전송합니다. (새 프로그램이 많으면 배치 요약)
+    delivered = []
+    if len(new_programs) >= SUMMARY_BATCH_THRESHOLD:
+        cards = batch_program_cards(new_programs)
+    else:
+        cards = stream_program_cards(new_programs)
+    async for program_summary, summary in cards:
+        try:
+            await deliver_program_notification(program_summary, summary, target_chat_id)
+        except Exception as e:
+            logging.error(f"❌ 비교과 프로그램 전송 실패 (다음 주기에 재시도): {program_summary['title']}, {e}", exc_info=True)
+            continue
+        delivered.append((program_summary["cache_key"], program_summary['title']))
 
-            seen[key] = True
-            found = True
-            
-    if found:
-        save_pknuai_program_cache(seen)
-        push_pknuai_program_cache_changes()
+    if len(delivered) == len(new_programs):
+        list_change_detector.commit("programs", snapshot)
+    if delivered:
+        seen_store.add_many("programs", delivered)
+        push_seen_changes()
+    return bool(new_programs)
 
 ################################################################################
 #                             명령어 및 기본 콜백 핸들러                            #
@@ -806,8 +3487,7 @@ async def register_command(message: types.Message):
                 "filters": {f: False for f in PROGRAM_FILTERS},
                 "personalization": get_default_personalization() # 기본 설정 함수 호출
             }
-            save_whitelist(ALLOWED_USERS)
-            push_file_changes(WHITELIST_FILE, f"New user registration: {user_id_str}")
+            persist_whitelist(f"New user registration: {user_id_str}")
             await message.answer("✅ 등록이 완료되었습니다! 이제 모든 기능을 사용할 수 있습니다.")
             logging.info(f"새 사용자 등록: {user_id_str}")
     else:
@@ -845,7 +3525,10 @@ async def back_to_start_handler(callback: CallbackQuery):
 async def notice_menu_handler(callback: CallbackQuery):
     # ... 기존 코드 (변경 없음)
     await callback.answer()
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text="📅 날짜로 검색", callback_data="filter_date"), InlineKeyboardButton(text="🗂️ 카테고리별 보기", callback_data="all_notices")]])
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📅 날짜로 검색", callback_data="filter_date"), InlineKeyboardButton(text="🗂️ 카테고리별 보기", callback_data="all_notices")],
+        [InlineKeyboardButton(text="🔎 키워드로 검색", callback_data="keyword_search")]
+    ])
     await callback.message.edit_text("공지사항 옵션을 선택하세요:", reply_markup=keyboard)
 
 @dp.callback_query(lambda c: c.data == "filter_date")
@@ -945,7 +3628,7 @@ async def personalization_menu_handler(callback: CallbackQuery, state: FSMContex
     if "personalization" not in ALLOWED_USERS.get(user_id_str, {}):
         if user_id_str not in ALLOWED_USERS: ALLOWED_USERS[user_id_str] = {}
         ALLOWED_USERS[user_id_str]["personalization"] = get_default_personalization()
-        save_whitelist(ALLOWED_USERS)
+        persist_whitelist()
 
     user_settings = ALLOWED_USERS[user_id_str]["personalization"]
     is_enabled = user_settings.get("enabled", False)
@@ -984,8 +3667,7 @@ async def toggle_personalization_enabled_handler(callback: CallbackQuery, state:
     user_id_str = str(callback.message.chat.id)
     settings = ALLOWED_USERS[user_id_str].setdefault("personalization", get_default_personalization())
     settings["enabled"] = not settings.get("enabled", False)
-    save_whitelist(ALLOWED_USERS)
-    push_file_changes(WHITELIST_FILE, f"User {user_id_str} toggled personalization")
+    persist_whitelist(f"User {user_id_str} toggled personalization")
     await callback.answer(f"개인화 요약이 {'ON' if settings['enabled'] else 'OFF'} 되었습니다.")
     await personalization_menu_handler(callback, state)
 
@@ -1024,7 +3706,7 @@ async def department_selection_handler(callback: CallbackQuery, state: FSMContex
 
     if college == "기타":
         ALLOWED_USERS[user_id_str]["personalization"]["전공학과"] = "전체학과"
-        save_whitelist(ALLOWED_USERS)
+        persist_whitelist()
         await state.clear()
         await callback.answer("'전체학과'로 설정되었습니다.")
         await personalization_menu_handler(callback, state)
@@ -1043,7 +3725,7 @@ async def set_department_handler(callback: CallbackQuery, state: FSMContext):
     department = callback.data.replace("p13n_dept_", "")
     user_id_str = str(callback.message.chat.id)
     ALLOWED_USERS[user_id_str]["personalization"]["전공학과"] = department
-    save_whitelist(ALLOWED_USERS)
+    persist_whitelist()
     await state.clear()
     await callback.answer(f"'{department}'으로 설정되었습니다.")
     await personalization_menu_handler(callback, state)
@@ -1057,7 +3739,7 @@ async def set_personalization_option_handler(callback: CallbackQuery, state: FSM
 
     if cat_info["type"] == "single":
         settings[category] = option
-        save_whitelist(ALLOWED_USERS)
+        persist_whitelist()
         await callback.answer(f"{category}가 '{option}'으로 설정되었습니다.")
         await personalization_menu_handler(callback, state)
     else: # multi
@@ -1068,7 +3750,7 @@ async def set_personalization_option_handler(callback: CallbackQuery, state: FSM
         else:
             current_options.append(option)
             await callback.answer(f"'{option}' 선택")
-        save_whitelist(ALLOWED_USERS)
+        persist_whitelist()
         await personalization_category_handler(callback, state)
 
 def get_program_filter_keyboard(chat_id: int) -> InlineKeyboardMarkup:
@@ -1099,8 +3781,7 @@ async def toggle_program_filter(callback: CallbackQuery):
     filters = user_data.setdefault("filters", {f: False for f in PROGRAM_FILTERS})
     filters[filter_name] = not filters.get(filter_name, False)
 
-    save_whitelist(ALLOWED_USERS) # 변경 즉시 저장
-    push_file_changes(WHITELIST_FILE, f"Update filters for user {user_id_str}")
+    persist_whitelist(f"Update filters for user {user_id_str}") # 저장/푸시는 모아서 백그라운드로 처리
 
     await callback.answer(f"{filter_name} 필터 {'선택' if filters[filter_name] else '해제'}")
     keyboard = get_program_filter_keyboard(callback.message.chat.id)
@@ -1127,19 +3808,12 @@ async def my_programs_handler(callback: CallbackQuery):
 
     programs = []
     if html_content:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        programs = _parse_pknuai_page(soup)
+        programs = parse_program_list(html_content)
 
     if not programs:
         await callback.message.answer("조건에 맞는 프로그램이 없습니다.")
     else:
-        for program in programs:
-            detail_html = await fetch_program_html(program['href'])
-            if detail_html:
-                # ✨ [수정] AI 요약 대신 직접 파싱 함수를 사용합니다.
-                detail_soup = BeautifulSoup(detail_html, 'html.parser')
-                program_details = parse_pknuai_program_details(detail_soup)
-                await send_pknuai_program_notification(program, program_details, callback.message.chat.id)
+        await send_program_search_results(programs, callback.message.chat.id)
             
 @dp.callback_query(lambda c: c.data == "compare_programs")
 async def compare_programs_handler(callback: CallbackQuery):
@@ -1160,10 +3834,21 @@ async def keyword_search_handler(callback: CallbackQuery, state: FSMContext):
 
 @dp.message(KeywordSearchState.waiting_for_keyword)
 async def process_keyword_search(message: types.Message, state: FSMContext):
-    """키워드 입력을 처리하고, 검색된 프로그램을 가져와 전송"""
+    """
+    키워드 입력을 처리합니다. 공지와 비교과 프로그램의 로컬 검색 색인에서 먼저 찾아 요약 카드로 보내고,
+    결과가 없을 때만 PKNU AI 시스템의 키워드 검색(브라우저)으로 프로그램을 찾아 전송합니다.
+    """
     keyword = message.text.strip()
     await state.clear()
 
+    started = time.perf_counter()
+    results = search_index.search(keyword)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logging.info(f"로컬 검색 '{keyword}': {len(results)}건, {elapsed_ms:.1f}ms ({search_index.stats()})")
+    if results:
+        await send_local_search_results(keyword, results, message.chat.id, elapsed_ms)
+        return
+
     status_msg = await message.answer(f"🔍 '{keyword}' 키워드로 검색 중입니다...")
     
     # 키워드 검색 시에는 URL을 직접 만들지 않고 fetch_program_html에 인자로 전달합니다.
@@ -1174,19 +3859,12 @@ async def process_keyword_search(message: types.Message, state: FSMContext):
 
     programs = []
     if html_content:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        programs = _parse_pknuai_page(soup)
+        programs = parse_program_list(html_content)
 
     if not programs:
-        await message.answer(f"❌ '{keyword}' 키워드에 해당하는 프로그램이 없습니다.")
+        await message.answer(f"❌ '{keyword}' 키워드에 해당하는 공지사항이나 프로그램이 없습니다.")
     else:
-        for program in programs:
-            detail_html = await fetch_program_html(program['href'])
-            if detail_html:
-                # ✨ [수정] AI 요약 대신 직접 파싱 함수를 사용합니다.
-                detail_soup = BeautifulSoup(detail_html, 'html.parser')
-                program_details = parse_pknuai_program_details(detail_soup)
-                await send_pknuai_program_notification(program, program_details, message.chat.id)
+        await send_program_search_results(programs, message.chat.id)
                 
 class KeywordSearchState(StatesGroup):
     waiting_for_keyword = State()
@@ -1208,7 +3886,7 @@ def parse_date(date_str: str):
 # 기존 process_date_input 함수를 지우고 아래 최종 버전으로 교체하세요.
 @dp.message(FilterState.waiting_for_date)
 async def process_date_input(message: types.Message, state: FSMContext) -> None:
-    """날짜 입력을 처리하는 핸들러 (디버깅 강화 및 숫자 비교 방식)"""
+    """날짜 입력을 처리하는 핸들러 (공지 아카이브의 게시일 인덱스에서 조회)"""
     # --- 생략되었던 권한 확인 부분 ---
     user_id_str = str(message.chat.id)
     if user_id_str not in ALLOWED_USERS:
@@ -1227,28 +3905,16 @@ async def process_date_input(message: types.Message, state: FSMContext) -> None:
 
     await state.clear()
     await message.answer(f"📅 {month}월 {day}일 날짜의 공지사항을 검색합니다...")
-    
-    all_notices = await get_school_notices()
-    
-    filtered_notices = []
-    logging.info(f"사용자 요청 날짜: Month={month}, Day={day}") # 디버깅 로그 추가
 
-    for notice_tuple in all_notices:
-        notice_date_str = notice_tuple[3]
-        try:
-            notice_date_obj = datetime.strptime(notice_date_str, "%Y.%m.%d")
-            # 비교 직전에 로그를 남겨서 확인
-            logging.info(f"  -> 공지사항 날짜 '{notice_date_str}'와 비교 중... (Month={notice_date_obj.month}, Day={notice_date_obj.day})")
-            if notice_date_obj.month == month and notice_date_obj.day == day:
-                filtered_notices.append(notice_tuple)
-        except ValueError:
-            continue
+    # 아카이브가 오래된 경우에만 게시판 1페이지로 갱신한 뒤, 게시일 인덱스에서 조회합니다.
+    await refresh_notice_archive("")
+    filtered_notices = notice_archive.by_date(month, day)
+    logging.info(f"날짜 조회 {month}/{day}: 아카이브에서 {len(filtered_notices)}건")
 
     if not filtered_notices:
         await message.answer(f"📢 {month}월 {day}일 날짜에 해당하는 공지사항이 없습니다.")
     else:
-        for notice in filtered_notices:
-            await send_notification(notice, message.chat.id)
+        await send_notifications(filtered_notices, message.chat.id)
             
 @dp.callback_query(lambda c: c.data == "all_notices")
 async def callback_all_notices(callback: CallbackQuery, state: FSMContext) -> None:
@@ -1269,12 +3935,12 @@ async def callback_category_selection(callback: CallbackQuery, state: FSMContext
     category_name = next((name for name, code in CATEGORY_CODES.items() if code == category_code), category_code)
     await callback.message.edit_text(f"카테고리 '{category_name}'의 공지사항을 검색합니다...")
 
-    notices = await get_school_notices(category_code)
+    await refresh_notice_archive(category_code)
+    notices = notice_archive.by_category(category_code, limit=7)
     if not notices:
         await callback.message.answer("해당 카테고리의 공지사항이 없습니다.")
     else:
-        for notice in notices[:7]: # 최신 7개만 전송
-            await send_notification(notice, callback.message.chat.id)
+        await send_notifications(notices, callback.message.chat.id) # 최신 7개만 전송
     await state.clear()
 
 @dp.message()
@@ -1284,38 +3950,184 @@ async def catch_all(message: types.Message):
 ################################################################################
 #                                 메인 실행 및 스케줄러                            #
 ################################################################################
+def is_office_hours(now: datetime = None) -> bool:
+    """평일 업무시간(KST) 여부. 공지가 주로 올라오는 시간대입니다."""
+    now = now or datetime.now(SCHEDULE_TIMEZONE)
+    return now.weekday() < 5 and SCHEDULE_OFFICE_HOURS[0] <= now.hour < SCHEDULE_OFFICE_HOURS[1]
+
+class PollingSource:
+    """
+    소스 하나(공지사항, 비교과 프로그램)의 확인 주기와 실행 상태.
+    - 업무시간/야간·주말에 따라 기본 주기를 바꾸고, 새 글 발견 직후에는 잠시 더 자주 확인합니다.
+    - 변경이 없는 확인이 이어지면 기본 주기에서 조용한 시간대 주기까지 점차 늘립니다.
+    - 같은 소스의 확인이 겹쳐 실행되지 않도록 잠금을 사용합니다.
+    """
+    def __init__(self, name: str, check, busy_interval: float, quiet_interval: float):
+        self.name = name
+        self.check = check
+        self.busy_interval = busy_interval
+        self.quiet_interval = quiet_interval
+        self.last_run = None
+        self.next_run = None
+        self.last_change = None
+        self.last_duration = 0.0
+        self.idle_streak = 0
+        self.boost_remaining = 0
+        self.runs = 0
+        self._lock = asyncio.Lock()
+
+    def next_interval(self) -> float:
+        if self.boost_remaining > 0:
+            interval = SCHEDULE_BOOST_INTERVAL
+        elif is_office_hours():
+            # 변경 없는 확인이 이어지면 1.25배씩 늘리되 조용한 시간대 주기를 넘지 않습니다.
+            interval = min(self.quiet_interval, self.busy_interval * 1.25 ** min(self.idle_streak, 8))
+        else:
+            interval = self.quiet_interval
+        return interval * random.uniform(1 - SCHEDULE_JITTER, 1 + SCHEDULE_JITTER)
+
+    async def run_once(self) -> bool | None:
+        """한 번 확인합니다. 이미 실행 중이면 건너뛰고 None 을 반환합니다."""
+        if self._lock.locked():
+            logging.info(f"[{self.name}] 이전 확인이 아직 진행 중이라 이번 확인을 건너뜁니다.")
+            return None
+        async with self._lock:
+            started = time.monotonic()
+            self.last_run = datetime.now(SCHEDULE_TIMEZONE)
+            self.runs += 1
+            try:
+                changed = bool(await self.check())
+            except Exception as e:
+                logging.error(f"[{self.name}] 확인 중 오류 발생: {e}", exc_info=True)
+                changed = False
+            self.last_duration = time.monotonic() - started
+            if changed:
+                self.last_change = self.last_run
+                self.idle_streak = 0
+                self.boost_remaining = SCHEDULE_BOOST_CYCLES
+            else:
+                self.idle_streak += 1
+                self.boost_remaining = max(0, self.boost_remaining - 1)
+            return changed
+
+    async def run_forever(self) -> None:
+        while True:
+            delay = self.next_interval()
+            self.next_run = datetime.now(SCHEDULE_TIMEZONE) + timedelta(seconds=delay)
+            logging.info(f"[{self.name}] 다음 확인: {self.next_run:%H:%M:%S} ({delay:.0f}초 후)")
+            await asyncio.sleep(delay)
+            await self.run_once()
+            after_scheduled_check()
+
+    def status(self) -> str:
+        fmt = lambda value: f"{value:%m-%d %H:%M:%S}" if value else "-"
+        return (f"{self.name}: 최근 {fmt(self.last_run)} ({self.last_duration:.1f}s), 다음 {fmt(self.next_run)}, "
+                f"마지막 변경 {fmt(self.last_change)}, 연속 무변경 {self.idle_streak}회, 총 {self.runs}회")
+
+
+polling_sources = [
+    PollingSource("공지사항", lambda: check_for_new_notices(GROUP_CHAT_ID), NOTICE_BUSY_INTERVAL, NOTICE_QUIET_INTERVAL),
+    PollingSource("비교과 프로그램", lambda: check_for_new_pknuai_programs(GROUP_CHAT_ID), PROGRAM_BUSY_INTERVAL, PROGRAM_QUIET_INTERVAL),
+    PollingSource("공지 카테고리", refresh_notice_categories, CATEGORY_BUSY_INTERVAL, CATEGORY_QUIET_INTERVAL),
+]
+
+def after_scheduled_check() -> None:
+    """확인이 끝날 때마다 캐시를 저장하고 상태를 기록합니다."""
+    summary_cache.flush()
+    ocr_cache.flush()
+    logging.info(f"스케줄링된 작업이 완료되었습니다. ({summary_cache.stats()}, {ocr_cache.stats()}, {delivery_queue.stats()}, {openai_usage.stats()})")
+    logging.info("스케줄러 상태: " + " | ".join(source.status() for source in polling_sources))
+
 async def scheduled_tasks():
-    """10분마다 새로운 공지사항과 프로그램을 확인하는 스케줄러"""
-    while True:
-        try:
-            logging.info("스케줄링된 작업을 시작합니다.")
-            await check_for_new_notices(GROUP_CHAT_ID)
-            await check_for_new_pknuai_programs(GROUP_CHAT_ID)
-            logging.info("스케줄링된 작업이 완료되었습니다.")
-        except Exception as e:
-            logging.error(f"스케줄링 작업 중 오류 발생: {e}", exc_info=True)
-        await asyncio.sleep(600)
+    """소스별로 독립적인 주기에 따라 새로운 공지사항과 프로그램을 동시에 확인하는 스케줄러"""
+    await asyncio.gather(*(source.run_forever() for source in polling_sources))
+
+async def shutdown() -> None:
+    """공유 HTTP 세션과 브라우저 풀 등 장기 리소스를 정리합니다."""
+    summary_cache.flush()
+    ocr_cache.flush()
+    await delivery_queue.close()
+    await persister.flush()
+    await ocr_engine.close()
+    await pknuai_http.close()
+    await browser_pool.close()
+    await http_manager.close()
+    seen_store.close()
+    notice_archive.close()
 
 async def main() -> None:
-    logging.info("봇을 시작합니다. 초기 데이터 확인 중...")
+    logging.info(f"봇을 시작합니다. 초기 데이터 확인 중... (⏱️ 모듈 로드 {time.perf_counter() - _STARTUP_STARTED:.2f}s)")
+    await http_manager.start()
     try:
-        await check_for_new_notices(GROUP_CHAT_ID)
-        await check_for_new_pknuai_programs(GROUP_CHAT_ID)
-    except Exception as e:
-        logging.error(f"초기 데이터 확인 중 오류 발생: {e}", exc_info=True)
+        await asyncio.gather(*(source.run_once() for source in polling_sources))
+        after_scheduled_check()
+
+        scheduler_task = asyncio.create_task(scheduled_tasks())
+        logging.info("🚀 봇 폴링을 시작합니다...")
+        try:
+            await dp.start_polling(bot)
+        finally:
+            scheduler_task.cancel()
+    finally:
+        await shutdown()
+
+ONCE_SOURCES = ("notices", "programs", "categories")
 
-    scheduler_task = asyncio.create_task(scheduled_tasks())
-    logging.info("🚀 봇 폴링을 시작합니다...")
-    await dp.start_polling(bot)
-    scheduler_task.cancel()
+async def run_once(sources: list, backfill: bool = NOTICE_BACKFILL) -> int:
+    """
+    텔레그램 폴링과 스케줄러 없이 지정한 소스를 한 번씩 확인하고 종료합니다. (CI 실행용)
+    반환값: 종료 코드 (0: 정상, 1: 확인 중 오류 발생)
+    """
+    logging.info(f"1회 확인 모드를 시작합니다: {', '.join(sources)} (⏱️ 모듈 로드 {time.perf_counter() - _STARTUP_STARTED:.2f}s)")
+    checks = {
+        "notices": lambda: check_for_new_notices(GROUP_CHAT_ID, backfill=backfill),
+        "programs": lambda: check_for_new_pknuai_programs(GROUP_CHAT_ID),
+        "categories": refresh_notice_categories,
+    }
+    exit_code = 0
+    await http_manager.start()
+    try:
+        results = await asyncio.gather(*(checks[name]() for name in sources), return_exceptions=True)
+        for name, result in zip(sources, results):
+            if isinstance(result, Exception):
+                logging.error(f"❌ [{name}] 확인 중 오류 발생: {result}", exc_info=result)
+                exit_code = 1
+            else:
+                logging.info(f"[{name}] 확인 완료: {'새 항목 있음' if result else '새 항목 없음'}")
+    finally:
+        await shutdown()
+    logging.info(f"1회 확인 모드 종료 (종료 코드 {exit_code}, ⏱️ 전체 {time.perf_counter() - _STARTUP_STARTED:.2f}s, "
+                 f"{summary_cache.stats()}, {openai_usage.stats()})")
+    return exit_code
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="부경대 공지사항 / 비교과 프로그램 알림 봇")
+    parser.add_argument("--once", action="store_true",
+                        help="텔레그램 폴링과 스케줄러 없이 한 번만 확인하고 종료합니다.")
+    parser.add_argument("--sources", default=",".join(ONCE_SOURCES),
+                        help="--once 로 확인할 소스 (쉼표로 구분: notices, programs, categories)")
+    parser.add_argument("--backfill", action="store_true",
+                        help="--once 실행 시 공지사항을 NOTICE_BACKFILL_PAGES 페이지까지 거슬러 확인합니다.")
+    args = parser.parse_args(argv)
+    args.sources = [name.strip() for name in args.sources.split(",") if name.strip()]
+    unknown = [name for name in args.sources if name not in ONCE_SOURCES]
+    if unknown or not args.sources:
+        parser.error(f"알 수 없는 소스: {', '.join(unknown) or '(없음)'} (사용 가능: {', '.join(ONCE_SOURCES)})")
+    return args
 
 if __name__ == '__main__':
+    args = parse_args()
     if sys.platform.startswith("win"): asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    exit_code = 0
     try:
-        asyncio.run(main())
+        if args.once:
+            exit_code = asyncio.run(run_once(args.sources, backfill=args.backfill or NOTICE_BACKFILL))
+        else:
+            asyncio.run(main())
     except (KeyboardInterrupt, SystemExit):
         logging.info("봇이 종료되었습니다.")
     except Exception as e:
+        exit_code = 1
         logging.critical(f"❌ 봇 실행 중 치명적인 오류 발생: {e}", exc_info=True)
         async def notify_crash():
             try:
@@ -1325,4 +4137,4 @@ if __name__ == '__main__':
             except Exception as notify_error:
                 logging.error(f"❌ 크래시 알림 전송 실패: {notify_error}", exc_info=True)
         asyncio.run(notify_crash())
-
+    sys.exit(exit_code)
@@ -0,0 +1,16 @@
+"""
+테스트 공통 설정.
+script.py 는 import 시 봇 객체와 로그 파일을 만들므로, 형식만 맞는 토큰을 넣고
+임시 디렉터리에서 import 하여 저장소에 로그/DB 파일이 생기지 않게 합니다. (네트워크 호출 없음)
+"""
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT_DIR, "benchmarks", "fixtures")
+
+os.environ.setdefault("TELEGRAM_TOKEN", "123456:test-token-not-used")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+sys.path.insert(0, ROOT_DIR)
+os.chdir(tempfile.mkdtemp(prefix="pknu-bot-test-"))
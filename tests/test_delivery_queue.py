@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+
+import script
+
+
+def _queue(monkeypatch, workers: int = 2, chat_rate: float = 1000, group_rate: float = 1000) -> "script.TelegramDeliveryQueue":
+    monkeypatch.setattr(script, "TELEGRAM_GLOBAL_RATE", 1000)
+    monkeypatch.setattr(script, "TELEGRAM_CHAT_RATE", chat_rate)
+    monkeypatch.setattr(script, "TELEGRAM_GROUP_RATE", group_rate)
+    return script.TelegramDeliveryQueue(workers=workers)
+
+
+def _sender(log: list, name: str, delay: float = 0.0, failures: list = None):
+    """호출될 때마다 failures 의 예외를 하나씩 던지고, 다 쓰면 log 에 이름을 남기는 send_func"""
+    failures = list(failures or [])
+
+    async def send():
+        await asyncio.sleep(delay)
+        if failures:
+            raise failures.pop(0)
+        log.append((name, time.monotonic()))
+        return name
+    return send
+
+
+def test_messages_to_one_chat_keep_their_order(monkeypatch):
+    queue = _queue(monkeypatch, workers=4)
+    log = []
+
+    async def run():
+        await asyncio.gather(*(queue.send("42", _sender(log, i, delay=0.01 * (5 - i))) for i in range(5)))
+        await queue.close()
+
+    asyncio.run(run())
+    assert [name for name, _ in log] == [0, 1, 2, 3, 4]
+
+
+def test_retry_after_defers_only_that_chat(monkeypatch):
+    queue = _queue(monkeypatch, workers=1)
+    log = []
+    retry_after = TelegramRetryAfter(SendMessage(chat_id=42, text="x"), "Too Many Requests", 0.3)
+
+    async def run():
+        started = time.monotonic()
+        results = await asyncio.gather(
+            queue.send("42", _sender(log, "a1", failures=[retry_after])),
+            queue.send("42", _sender(log, "a2")),
+            queue.send("7", _sender(log, "b1")))
+        await queue.close()
+        return started, results
+
+    started, results = asyncio.run(run())
+    assert results == ["a1", "a2", "b1"]
+    assert [name for name, _ in log] == ["b1", "a1", "a2"]
+    sent_at = dict(log)
+    assert sent_at["b1"] - started < 0.2
+    assert sent_at["a1"] - started >= 0.3
+    assert queue.retried == 1 and queue.failed == 0
+
+
+def test_retry_after_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(script, "TELEGRAM_MAX_RETRIES", 1)
+    queue = _queue(monkeypatch)
+    errors = [TelegramRetryAfter(SendMessage(chat_id=42, text="x"), "Too Many Requests", 0.01) for _ in range(2)]
+
+    async def run():
+        try:
+            await queue.send("42", _sender([], "a", failures=errors))
+        except TelegramRetryAfter:
+            return True
+        finally:
+            await queue.close()
+        return False
+
+    assert asyncio.run(run())
+    assert queue.retried == 1 and queue.failed == 1
+
+
+def test_slow_group_chat_does_not_hold_workers(monkeypatch):
+    """그룹 채팅 버킷을 기다리는 동안에도 다른 채팅의 사용자 응답은 바로 나가야 합니다."""
+    queue = _queue(monkeypatch, workers=1, group_rate=0.5)
+    log = []
+
+    async def run():
+        broadcasts = [asyncio.create_task(queue.send("-100", _sender(log, f"group{i}"))) for i in range(3)]
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        await queue.send("42", _sender(log, "reply"), priority=script.PRIORITY_INTERACTIVE)
+        elapsed = time.monotonic() - started
+        for task in broadcasts:
+            task.cancel()
+        await queue.close(timeout=0)
+        return elapsed
+
+    assert asyncio.run(run()) < 0.5
+    assert [name for name, _ in log] == ["group0", "reply"]
+
+
+def test_middleware_routes_chat_messages_through_the_queue(monkeypatch):
+    queue = _queue(monkeypatch)
+    middleware = script.TelegramQueueMiddleware(queue)
+    requests = []
+
+    async def make_request(bot, method):
+        requests.append((type(method).__name__, script._IN_DELIVERY_WORKER.get()))
+        return "ok"
+
+    async def run():
+        await middleware(make_request, script.bot, SendMessage(chat_id=42, text="안녕하세요"))
+        await middleware(make_request, script.bot, AnswerCallbackQuery(callback_query_id="1"))
+        await queue.close()
+
+    asyncio.run(run())
+    assert requests == [("SendMessage", True), ("AnswerCallbackQuery", False)]
+    assert queue.sent == 1
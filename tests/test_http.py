@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+import script
+
+
+async def _slow_server(delay: float) -> web.AppRunner:
+    async def handler(request):
+        await asyncio.sleep(delay)
+        return web.Response(text="늦은 응답")
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+def test_fetch_without_timeout_uses_session_timeout(monkeypatch):
+    """호출자가 timeout 을 주지 않으면 세션의 HTTP_TIMEOUT 이 적용되어야 합니다."""
+    monkeypatch.setattr(script, "HTTP_TIMEOUT", 0.5)
+    monkeypatch.setattr(script, "HTTP_MAX_RETRIES", 0)
+
+    async def run() -> float:
+        runner = await _slow_server(5)
+        port = runner.addresses[0][1]
+        manager = script.HttpSessionManager()
+        started = time.monotonic()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await manager.fetch(f"http://127.0.0.1:{port}/")
+            return time.monotonic() - started
+        finally:
+            await manager.close()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) < 2
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+import script
+from conftest import FIXTURE_DIR
+
+TEST_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _notices(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return script.parse_school_notices(f.read())
+
+
+def _archive(tmp_path, retention_days: int = 100000) -> tuple:
+    archive = script.NoticeArchive(str(tmp_path / "archive.db"), retention_days=retention_days)
+    return archive, script.SearchIndex(archive)
+
+
+def test_pinned_notice_is_archived_once_across_pages(tmp_path):
+    archive, index = _archive(tmp_path)
+    first_page = _notices(os.path.join(FIXTURE_DIR, "notice_list.html"))
+    second_page = _notices(os.path.join(TEST_FIXTURE_DIR, "notice_list_page2.html"))
+    for notices, category in ((first_page, ""), (second_page, ""), (first_page, "10001")):
+        archive.add_many(notices, category)
+        index.add_many("notices", [script._notice_search_doc(notice) for notice in notices])
+
+    titles = [notice[0] for notice in archive.by_date(9, 10)]
+    assert titles == ["[필독] 2025학년도 2학기 장학금 신청 안내N"]
+    assert len(archive.by_category("10001", limit=100)) == len(first_page)
+    results = [result["title"] for result in index.search("2학기 장학금", limit=100)]
+    assert len(results) == len(set(results))
+
+
+def test_retention_prunes_old_notices_and_content(tmp_path):
+    archive, _ = _archive(tmp_path, retention_days=30)
+    recent = (datetime.now() - timedelta(days=1)).strftime("%Y.%m.%d")
+    old = (datetime.now() - timedelta(days=60)).strftime("%Y.%m.%d")
+    notices = [("최근 공지", "https://www.pknu.ac.kr/main/163?action=view&no=2", "학생처", recent),
+               ("오래된 공지", "https://www.pknu.ac.kr/main/163?action=view&no=1", "학생처", old)]
+    archive.add_many(notices, "10001")
+
+    assert [notice[0] for notice in archive.by_category("10001", limit=10)] == ["최근 공지"]
+    key = script.notice_archive_key(notices[0])
+    archive.store_content(key, {"text": "본문", "images": [], "error": None})
+    archive.conn.execute("UPDATE notice_content SET stored_at = ?", (time.time() - 91 * 24 * 3600,))
+    archive.maybe_prune(force=True)
+    assert archive.get_content(key) is None
+    assert archive.conn.execute("SELECT COUNT(*) FROM notice_archive_categories").fetchone()[0] == 1
+
+
+def test_search_index_drops_pruned_docs_and_rebuilds_from_archive(tmp_path):
+    archive, index = _archive(tmp_path)
+    notices = _notices(os.path.join(FIXTURE_DIR, "notice_list.html"))
+    archive.add_many(notices)
+    assert index.search("장학금")
+    program = {"title": "장학금 설명회", "unique_id": "P1", "href": "https://pknuai.pknu.ac.kr/p1"}
+    index.add_many("programs", [script._program_search_doc(program)])
+
+    archive.conn.execute("DELETE FROM notice_archive")
+    archive.conn.execute("UPDATE search_docs SET updated_at = 0 WHERE source = 'programs'")
+    index.maybe_prune(force=True)
+    assert index.conn.execute("SELECT COUNT(*) FROM search_docs").fetchone()[0] == 0
+    assert index.conn.execute("SELECT COUNT(*) FROM search_postings").fetchone()[0] == 0
+
+    archive.add_many(notices)
+    rebuilt = script.SearchIndex(archive)
+    assert rebuilt.search("장학금")
+
+
+def test_program_seen_again_is_kept_past_retention(tmp_path):
+    archive, index = _archive(tmp_path)
+    program = {"title": "장학금 설명회", "unique_id": "2025-2-A1-B1",
+               "href": "https://pknuai.pknu.ac.kr/web/nonSbjt/programDetail.do?yy=2025&shtm=2&nonsubjcCd=A1&nonsubjcCrsCd=B1"}
+    index.add_many("programs", [script._program_search_doc(program, "본문")])
+    index.conn.execute("UPDATE search_docs SET updated_at = 0")
+
+    index.add_many("programs", [script._program_search_doc(program)])
+    index.maybe_prune(force=True)
+    assert [result["title"] for result in index.search("장학금")] == ["장학금 설명회"]
+
+
+def test_local_search_results_are_sent_as_cards(tmp_path, monkeypatch):
+    archive, index = _archive(tmp_path)
+    notices = _notices(os.path.join(FIXTURE_DIR, "notice_list.html"))
+    archive.add_many(notices)
+    program = {"title": "장학금 설명회", "unique_id": "2025-2-A1-B1",
+               "href": "https://pknuai.pknu.ac.kr/web/nonSbjt/programDetail.do?yy=2025&shtm=2&nonsubjcCd=A1&nonsubjcCrsCd=B1"}
+    index.add_many("programs", [script._program_search_doc(program)])
+    sent = {}
+
+    async def send_notifications(notices, chat_id, priority=script.PRIORITY_INTERACTIVE):
+        sent["notices"] = notices
+
+    async def send_program_search_results(programs, chat_id):
+        sent["programs"] = programs
+
+    async def queue_send(chat_id, send_func, priority=script.PRIORITY_BROADCAST):
+        sent["header"] = True
+
+    monkeypatch.setattr(script, "send_notifications", send_notifications)
+    monkeypatch.setattr(script, "send_program_search_results", send_program_search_results)
+    monkeypatch.setattr(script.delivery_queue, "send", queue_send)
+    results = index.search("장학금")
+    asyncio.run(script.send_local_search_results("장학금", results, 42, 1.0))
+
+    assert sent["header"]
+    assert all(notice in notices for notice in sent["notices"])
+    assert sent["programs"] == [program]
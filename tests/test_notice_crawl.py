@@ -0,0 +1,79 @@
+import asyncio
+import os
+
+import script
+from conftest import FIXTURE_DIR
+
+TEST_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _board_page(numbers: range, page: int) -> str:
+    """실제 게시판처럼 링크에 검색 조건과 pageIndex 가 붙은 일반 공지 목록 페이지를 만듭니다."""
+    rows = "".join(
+        f'<tr><td class="bdlNum">{no - 700000}</td>'
+        f'<td class="bdlTitle"><a href="?action=view&amp;no={no}&amp;cd=&amp;searchType=&amp;searchValue='
+        f'&amp;pageIndex={page}">공지 {no}</a></td>'
+        f'<td class="bdlUser">학생처</td><td class="bdlDate">2025.09.01</td><td class="bdlHit">1</td></tr>'
+        for no in numbers)
+    return f'<table class="bdListTbl"><tbody>{rows}</tbody></table>'
+
+
+def _crawl_board(monkeypatch, pages: list, seen) -> list:
+    async def fake_fetch_url(url):
+        for page, html_content in enumerate(pages[1:], start=2):
+            if url == script.notice_page_url(page):
+                return html_content
+        return None
+
+    monkeypatch.setattr(script, "fetch_url", fake_fetch_url)
+    monkeypatch.setattr(script, "NOTICE_MAX_PAGES", len(pages))
+    monkeypatch.setattr(script, "NOTICE_SEEN_RUN_STOP", 15)
+    return asyncio.run(script.crawl_new_school_notices(seen, pages[0]))
+
+
+def test_notices_pushed_to_the_next_page_are_not_resent(monkeypatch):
+    """새 글이 올라와 2페이지로 밀린 공지는 링크의 pageIndex 가 바뀌어도 이미 본 공지입니다."""
+    first_run = _crawl_board(monkeypatch, [_board_page(range(720010, 720000, -1), 1),
+                                           _board_page(range(720000, 719990, -1), 2)], set())
+    assert len(first_run) == 20
+    seen = {key for key, _ in first_run}
+
+    second_run = _crawl_board(monkeypatch, [_board_page(range(720013, 720003, -1), 1),
+                                            _board_page(range(720003, 719993, -1), 2)], seen)
+    assert sorted(notice[0] for _, notice in second_run) == ["공지 720011", "공지 720012", "공지 720013"]
+
+
+def test_legacy_title_and_link_keys_still_count_as_seen(monkeypatch):
+    page = _board_page(range(720010, 720000, -1), 1)
+    seen = {script.generate_cache_key(title, href) for title, href, _, _ in script.parse_school_notices(page)}
+    assert _crawl_board(monkeypatch, [page], seen) == []
+
+
+def test_crawl_does_not_resend_pinned_notices_from_later_pages(monkeypatch):
+    """2페이지의 상단 고정 공지(pageIndex=2 링크)가 새 공지로 다시 잡히지 않아야 합니다."""
+    first_page = _read(os.path.join(FIXTURE_DIR, "notice_list.html"))
+    second_page = _read(os.path.join(TEST_FIXTURE_DIR, "notice_list_page2.html"))
+    requested = []
+
+    async def fake_fetch_url(url):
+        requested.append(url)
+        return second_page if url == script.notice_page_url(2) else None
+
+    monkeypatch.setattr(script, "fetch_url", fake_fetch_url)
+    monkeypatch.setattr(script, "NOTICE_MAX_PAGES", 2)
+    monkeypatch.setattr(script, "push_seen_changes", lambda: None)
+
+    # 1페이지의 공지는 모두 이미 보냈지만, 연속 기준에 못 미쳐 2페이지까지 확인하는 상황
+    seen = {script.generate_cache_key(title, href) for title, href, _, _ in script.parse_school_notices(first_page)}
+    monkeypatch.setattr(script, "NOTICE_SEEN_RUN_STOP", 20)
+    new_notices = asyncio.run(script.crawl_new_school_notices(seen, first_page))
+
+    assert script.notice_page_url(2) in requested
+    titles = [notice[0] for _, notice in new_notices]
+    assert len(titles) == 5
+    assert not any(title.startswith("[필독]") for title in titles)
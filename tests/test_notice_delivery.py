@@ -0,0 +1,62 @@
+import asyncio
+
+import script
+
+NOTICES = [(f"공지 {i}", f"https://www.pknu.ac.kr/main/163?action=view&no={700 + i}", "학생처", "2025.09.01")
+           for i in range(3)]
+
+
+def _run_check(monkeypatch, tmp_path, fail_prepare: set = (), fail_deliver: set = ()) -> tuple:
+    """
+    준비(추출/요약)는 뒤의 공지일수록 빨리 끝나게 하고, fail_prepare / fail_deliver 에 든 공지는 실패시켜
+    check_for_new_notices 를 한 번 실행합니다. (전송 순서, 기록된 키, 목록 지문 커밋 여부) 를 반환합니다.
+    """
+    store = script.SeenStore(str(tmp_path / "seen.db"))
+    detector = script.ListChangeDetector()
+    delivered = []
+
+    async def fetch(url, **kwargs):
+        return script.HttpResponse(200, url, {}, "<tbody><tr>목록</tr></tbody>")
+
+    async def crawl(seen, first_page_html, backfill=False):
+        return [(f"key-{i}", notice) for i, notice in enumerate(NOTICES)]
+
+    async def prepare(notice, profile_groups, extract_semaphore, summary_semaphore, content=None):
+        index = NOTICES.index(notice)
+        await asyncio.sleep(0.05 * (len(NOTICES) - index))
+        if index in fail_prepare:
+            raise RuntimeError("본문 추출 실패")
+        return {chat_id: {"refined_title": notice[0]} for chat_ids in profile_groups.values() for chat_id in chat_ids}
+
+    async def deliver(notice, summary, chat_id, priority=script.PRIORITY_BROADCAST):
+        delivered.append(notice[0])
+        if NOTICES.index(notice) in fail_deliver:
+            raise RuntimeError("전송 실패")
+
+    monkeypatch.setattr(script, "seen_store", store)
+    monkeypatch.setattr(script, "list_change_detector", detector)
+    monkeypatch.setattr(script, "notice_archive", script.NoticeArchive(str(tmp_path / "archive.db")))
+    monkeypatch.setattr(script.http_manager, "fetch", fetch)
+    monkeypatch.setattr(script, "crawl_new_school_notices", crawl)
+    monkeypatch.setattr(script, "_prepare_notice", prepare)
+    monkeypatch.setattr(script, "deliver_notification", deliver)
+    monkeypatch.setattr(script, "push_seen_changes", lambda: None)
+
+    assert asyncio.run(script.check_for_new_notices("1000")) is True
+    seen = {f"key-{i}" for i in range(len(NOTICES)) if store.contains("notices", f"key-{i}")}
+    return delivered, seen, "notices" in detector._state
+
+
+def test_notices_are_delivered_in_board_order(monkeypatch, tmp_path):
+    delivered, seen, committed = _run_check(monkeypatch, tmp_path)
+    assert delivered == ["공지 0", "공지 1", "공지 2"]
+    assert seen == {"key-0", "key-1", "key-2"}
+    assert committed
+
+
+def test_only_delivered_notices_are_marked_seen(monkeypatch, tmp_path):
+    delivered, seen, committed = _run_check(monkeypatch, tmp_path, fail_prepare={1}, fail_deliver={2})
+    assert delivered == ["공지 0", "공지 2"]
+    assert seen == {"key-0"}
+    # 실패한 공지를 다음 주기에 다시 확인하도록 목록 지문을 기록하지 않습니다.
+    assert not committed
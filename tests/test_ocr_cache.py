@@ -0,0 +1,25 @@
+import script
+
+
+def _cache(tmp_path, max_entries: int = 10) -> script.OcrResultCache:
+    return script.OcrResultCache(str(tmp_path / "ocr_cache.json"), max_entries, max_distance=2)
+
+
+def test_similar_hit_requires_same_size_and_small_distance(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("poster-a", "9월 1일 마감", "ff00ff00ff00ff00", "800x1200")
+    # 같은 크기, 거리 1: 재인코딩된 같은 포스터
+    assert cache.get_similar("ff00ff00ff00ff01", "800x1200") == "9월 1일 마감"
+    # 같은 양식의 다른 포스터(거리 4)나 크기가 다른 이미지는 재사용하지 않습니다.
+    assert cache.get_similar("ff00ff00ff00ff0f", "800x1200") is None
+    assert cache.get_similar("ff00ff00ff00ff00", "800x1100") is None
+
+
+def test_similar_hit_refreshes_lru_position(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.put("reused", "자주 쓰이는 포스터", "0000000000000000", "100x100")
+    cache.put("other", "다른 포스터", "ffffffffffffffff", "100x100")
+    assert cache.get_similar("0000000000000001", "100x100") == "자주 쓰이는 포스터"
+    cache.put("new", "새 포스터", "0f0f0f0f0f0f0f0f", "100x100")
+    assert cache.get_exact("reused") == "자주 쓰이는 포스터"
+    assert cache.get_exact("other") is None
@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import script
+
+
+def _stub_push(monkeypatch) -> list:
+    pushes = []
+    monkeypatch.setattr(script, "push_file_changes", lambda paths, message: pushes.append((sorted(paths), message)))
+    return pushes
+
+
+def test_writes_are_debounced_and_keep_the_latest_content(tmp_path):
+    path = str(tmp_path / "whitelist.json")
+
+    async def run():
+        persister = script.WriteBehindPersister(write_delay=0.1, push_delay=10)
+        for count in range(3):
+            persister.save_json(path, {"users": {"1": count}})
+        await asyncio.sleep(0.05)
+        assert not (tmp_path / "whitelist.json").exists()
+        await asyncio.sleep(0.15)
+
+    asyncio.run(run())
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"users": {"1": 2}}
+
+
+def test_pushes_are_coalesced_into_one_commit(monkeypatch, tmp_path):
+    pushes = _stub_push(monkeypatch)
+    checkpoints = []
+
+    async def run():
+        persister = script.WriteBehindPersister(write_delay=0.01, push_delay=0.1)
+        persister.request_push("whitelist.json", "Add user 1")
+        persister.request_push("seen.db", "Update seen.db", before_push=lambda: checkpoints.append("seen.db"))
+        persister.request_push("whitelist.json", "Add user 2")
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+    assert pushes == [(["seen.db", "whitelist.json"], "Add user 1 (+2 more)")]
+    assert checkpoints == ["seen.db"]
+
+
+def test_flush_writes_then_pushes_pending_changes_immediately(monkeypatch, tmp_path):
+    path = str(tmp_path / "whitelist.json")
+    written_before_push = []
+    monkeypatch.setattr(script, "push_file_changes",
+                        lambda paths, message: written_before_push.append((tmp_path / "whitelist.json").exists()))
+
+    async def run():
+        persister = script.WriteBehindPersister(write_delay=60, push_delay=60)
+        persister.save_json(path, {"users": {}})
+        persister.request_push(path, "Remove user")
+        await persister.flush()
+
+    asyncio.run(run())
+    assert written_before_push == [True]
@@ -0,0 +1,75 @@
+import asyncio
+
+from aiohttp import web
+
+import script
+
+PROGRAM_HTML = "<html><body><div class='program_list'>비교과 목록</div></body></html>"
+LOGIN_HTML = "<html><body><form action='/login/pknuLoginProc.do'></form></body></html>"
+
+
+async def _program_server(valid_session: str) -> web.AppRunner:
+    """JSESSIONID 쿠키가 valid_session 일 때만 목록을 주고, 아니면 로그인 페이지를 주는 서버"""
+    async def handler(request):
+        if request.cookies.get("JSESSIONID") == valid_session:
+            return web.Response(text=PROGRAM_HTML, content_type="text/html")
+        return web.Response(text=LOGIN_HTML, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/web/nonSbjt/program.do", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    # aiohttp 쿠키 저장소는 IP 주소 호스트의 쿠키를 받지 않으므로 localhost 로 접속합니다.
+    await web.TCPSite(runner, "localhost", 0).start()
+    return runner
+
+
+def _run_fastpath(monkeypatch, valid_session: str, exported: list) -> tuple:
+    """exported 의 쿠키를 차례로 내보내는 가짜 브라우저 풀로 HTTP 빠른 경로를 실행합니다."""
+    calls = []
+
+    async def export_cookies(relogin=False):
+        calls.append(relogin)
+        return {"JSESSIONID": exported[len(calls) - 1]}
+
+    def lease():
+        raise AssertionError("HTTP 빠른 경로에서 브라우저를 빌리면 안 됩니다.")
+
+    monkeypatch.setattr(script.browser_pool, "export_cookies", export_cookies)
+    monkeypatch.setattr(script.browser_pool, "lease", lease)
+
+    async def run():
+        runner = await _program_server(valid_session)
+        base_url = f"http://localhost:{runner.addresses[0][1]}"
+        monkeypatch.setattr(script, "PKNUAI_BASE_URL", base_url)
+        session = script.PknuaiHttpSession()
+        try:
+            body = await session.fetch(f"{base_url}/web/nonSbjt/program.do?mId=216")
+            jar = {cookie.key: cookie.value for cookie in session._http.cookie_jar}
+            return body, jar, session._cookies_loaded
+        finally:
+            await session.close()
+            await runner.cleanup()
+
+    return (*asyncio.run(run()), calls)
+
+
+def test_fetch_replays_exported_cookies_over_http(monkeypatch):
+    body, jar, loaded, calls = _run_fastpath(monkeypatch, "valid", ["valid"])
+    assert body == PROGRAM_HTML
+    assert jar == {"JSESSIONID": "valid"}
+    assert loaded is True
+    assert calls == [False]
+
+
+def test_fetch_relogs_in_once_when_session_is_rejected(monkeypatch):
+    body, jar, _, calls = _run_fastpath(monkeypatch, "fresh", ["expired", "fresh"])
+    assert body == PROGRAM_HTML
+    assert jar == {"JSESSIONID": "fresh"}
+    assert calls == [False, True]
+
+
+def test_fetch_gives_up_after_second_rejection(monkeypatch):
+    body, _, _, calls = _run_fastpath(monkeypatch, "never", ["expired", "stale"])
+    assert body is None
+    assert calls == [False, True]
@@ -0,0 +1,42 @@
+import asyncio
+
+import script
+
+PROGRAMS = [{"title": f"프로그램 {i}", "href": f"https://pknuai.test/{i}", "unique_id": str(i)} for i in range(3)]
+
+
+def _collect(timeout: float) -> tuple:
+    async def run():
+        outcome = {}
+        cards = [card async for card in script.stream_program_cards(PROGRAMS, timeout=timeout, outcome=outcome)]
+        return cards, outcome
+    return asyncio.run(run())
+
+
+def test_stream_program_cards_reports_failures_without_timeout(monkeypatch):
+    async def fetch_details(program):
+        return None if program["unique_id"] == "1" else {"내용": program["title"]}
+
+    async def summarize(details, title):
+        return {"refined_title": title, "summary_body": "요약"}
+
+    monkeypatch.setattr(script, "fetch_program_details", fetch_details)
+    monkeypatch.setattr(script, "summarize_program_details", summarize)
+    cards, outcome = _collect(timeout=5)
+    assert len(cards) == 2
+    assert outcome["timed_out"] is False
+
+
+def test_stream_program_cards_reports_deadline(monkeypatch):
+    async def fetch_details(program):
+        await asyncio.sleep(0 if program["unique_id"] == "0" else 5)
+        return {"내용": program["title"]}
+
+    async def summarize(details, title):
+        return {"refined_title": title, "summary_body": "요약"}
+
+    monkeypatch.setattr(script, "fetch_program_details", fetch_details)
+    monkeypatch.setattr(script, "summarize_program_details", summarize)
+    cards, outcome = _collect(timeout=0.3)
+    assert len(cards) == 1
+    assert outcome["timed_out"] is True
@@ -0,0 +1,23 @@
+import pytest
+
+import script
+
+
+@pytest.mark.parametrize("title", [
+    "2026 한국토지주택공사 채용설명회 안내",
+    "SW중심대학 3주차 특강 안내",
+    "2026학년도 홍보대사 모집",
+    "교내 시설 공사 현장실습생 모집",
+])
+def test_valuable_notices_are_not_low_value(title):
+    assert not script.is_low_value_notice(title)
+
+
+@pytest.mark.parametrize("title", [
+    "대연캠퍼스 본관 시설 공사 안내",
+    "정기 전기 점검에 따른 정전 안내",
+    "교내 주차장 이용 안내",
+    "2025학년도 학생 만족도 설문 조사 협조 요청",
+])
+def test_facility_notices_are_low_value(title):
+    assert script.is_low_value_notice(title)
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime
+
+import script
+
+
+def _source(monkeypatch, check=None, office_hours: bool = True) -> "script.PollingSource":
+    monkeypatch.setattr(script, "SCHEDULE_JITTER", 0)
+    monkeypatch.setattr(script, "SCHEDULE_BOOST_INTERVAL", 60)
+    monkeypatch.setattr(script, "SCHEDULE_BOOST_CYCLES", 2)
+    monkeypatch.setattr(script, "is_office_hours", lambda now=None: office_hours)
+
+    async def unchanged():
+        return False
+    return script.PollingSource("테스트", check or unchanged, busy_interval=300, quiet_interval=1800)
+
+
+def test_office_hours_follow_weekday_kst_schedule():
+    assert script.is_office_hours(datetime(2025, 9, 10, 10, tzinfo=script.SCHEDULE_TIMEZONE))      # 수요일 오전
+    assert not script.is_office_hours(datetime(2025, 9, 10, 22, tzinfo=script.SCHEDULE_TIMEZONE))  # 수요일 밤
+    assert not script.is_office_hours(datetime(2025, 9, 13, 10, tzinfo=script.SCHEDULE_TIMEZONE))  # 토요일
+
+
+def test_idle_checks_back_off_towards_the_quiet_interval(monkeypatch):
+    source = _source(monkeypatch)
+    intervals = []
+    for _ in range(12):
+        intervals.append(source.next_interval())
+        asyncio.run(source.run_once())
+    assert intervals[0] == 300
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == min(1800, 300 * 1.25 ** 8)
+    assert _source(monkeypatch, office_hours=False).next_interval() == 1800
+
+
+def test_change_boosts_the_next_checks(monkeypatch):
+    results = iter([True, False, False, False])
+
+    async def check():
+        return next(results)
+
+    source = _source(monkeypatch, check=check)
+    source.idle_streak = 5
+    intervals = []
+    for _ in range(4):
+        asyncio.run(source.run_once())
+        intervals.append(source.next_interval())
+    assert intervals[:2] == [60, 60]
+    assert intervals[2] > 60
+    assert source.last_change is not None
+
+
+def test_overlapping_check_is_skipped(monkeypatch):
+    calls = []
+
+    async def slow_check():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return False
+
+    source = _source(monkeypatch, check=slow_check)
+
+    async def run():
+        return await asyncio.gather(source.run_once(), source.run_once())
+
+    assert asyncio.run(run()) == [False, None]
+    assert calls == [1]
+    assert source.runs == 1
@@ -0,0 +1,70 @@
+import asyncio
+
+import script
+
+
+def test_unbulleted_long_body_is_selected_within_budget(monkeypatch):
+    """글머리 기호 없이 한 덩어리로 이어진 본문도 문장 단위로 선별되어 예산 안에 들어와야 합니다."""
+    monkeypatch.setattr(script, "SUMMARY_INPUT_TOKEN_BUDGET", 300)
+    monkeypatch.setattr(script, "SUMMARY_MAP_REDUCE_THRESHOLD", 100000)
+    filler = " ".join(f"{i}번째 안내 문장은 일반적인 참고 사항을 담고 있습니다." for i in range(200))
+    text = f"국가장학금 2차 신청 기간은 2025. 8. 20 ~ 9. 17 입니다. {filler}"
+    assert len(script._clean_segments(text)[0]) == 1
+
+    prepared = asyncio.run(script.prepare_summary_input(text, "국가장학금 2차 신청 안내"))
+
+    assert prepared
+    assert script.estimate_tokens(prepared) <= 300
+    assert "2025. 8. 20 ~ 9. 17" in prepared
+
+
+def test_truncate_to_tokens_uses_token_budget():
+    text = "가나다라마바사아자차" * 200
+    truncated = script.truncate_to_tokens(text, 50)
+    assert script.estimate_tokens(truncated) <= 51
+    assert text.startswith(truncated)
+
+
+def _long_notice() -> str:
+    lines = [f"{i}번째 안내: 행사 진행 관련 세부 사항과 참고 내용을 안내합니다. 문의는 학생처로 해 주세요." for i in range(300)]
+    return "\n".join(lines + lines[:50])  # 뒤쪽 50줄은 OCR 중복처럼 반복
+
+
+def _map_reduce_limits(monkeypatch) -> None:
+    monkeypatch.setattr(script, "SUMMARY_INPUT_TOKEN_BUDGET", 300)
+    monkeypatch.setattr(script, "SUMMARY_MAP_REDUCE_THRESHOLD", 600)
+    monkeypatch.setattr(script, "SUMMARY_CHUNK_TOKENS", 400)
+    monkeypatch.setattr(script, "SUMMARY_MAP_MAX_CHUNKS", 3)
+
+
+def test_map_reduce_bounds_calls_and_output_tokens(monkeypatch):
+    _map_reduce_limits(monkeypatch)
+    requests = []
+
+    async def fake_completion(label, system_prompt, user_content, **kwargs):
+        requests.append(user_content)
+        return {"points": [f"핵심 사실 {len(requests)}"]}
+
+    monkeypatch.setattr(script, "request_json_completion", fake_completion)
+    text = _long_notice()
+    assert script.estimate_tokens(text) > 10 * 600
+
+    prepared = asyncio.run(script.prepare_summary_input(text, "행사 안내"))
+
+    assert 1 <= len(requests) <= 3
+    assert all(script.estimate_tokens(prompt) <= 400 + 50 for prompt in requests)
+    assert "핵심 사실 1" in prepared
+    assert script.estimate_tokens(prepared) <= 300
+
+
+def test_map_reduce_falls_back_to_source_text_when_map_fails(monkeypatch):
+    _map_reduce_limits(monkeypatch)
+
+    async def failing_completion(label, system_prompt, user_content, **kwargs):
+        raise RuntimeError("API 오류")
+
+    monkeypatch.setattr(script, "request_json_completion", failing_completion)
+    prepared = asyncio.run(script.prepare_summary_input(_long_notice(), "행사 안내"))
+
+    assert "번째 안내" in prepared
+    assert script.estimate_tokens(prepared) <= 300